@@ -42,8 +42,13 @@
   ******************************************************************************************
 '''
 import os
+import random
+import time
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
 from pathlib import Path
-from typing import Any, List, Optional, Dict
+from typing import Any, List, Optional, Dict, Tuple
 import tiktoken
 from openai import OpenAI
 from models import Prompt, Reasoning, Text, Format
@@ -10690,3 +10695,292 @@ class AcademicWriter( Agent ):
 			exception.method = 'ask( self, question: str ) -> str | None'
 			error = ErrorDialog( exception )
 			error.show( )
+
+class ProviderStats( ):
+	'''
+	
+		Purpose:
+		--------
+		Rolling latency and error statistics for one provider/model pair over the
+		last `window` calls.
+		
+	'''
+	window: Optional[ int ]
+	samples: Optional[ deque ]
+	
+	def __init__( self, window: int=50 ):
+		self.window = window
+		self.samples = deque( maxlen=window )
+		self._lock = threading.Lock( )
+	
+	def record( self, seconds: float, ok: bool ) -> None:
+		with self._lock:
+			self.samples.append( (seconds, ok) )
+	
+	@property
+	def calls( self ) -> int:
+		return len( self.samples )
+	
+	@property
+	def latency( self ) -> float | None:
+		'''
+		
+			Median latency of the successful calls in the window, or None before the
+			first success.
+			
+		'''
+		with self._lock:
+			times = sorted( s for s, ok in self.samples if ok )
+		return times[ len( times ) // 2 ] if times else None
+	
+	@property
+	def error_rate( self ) -> float:
+		with self._lock:
+			if not self.samples:
+				return 0.0
+			return sum( 1 for _, ok in self.samples if not ok ) / len( self.samples )
+
+class CircuitBreaker( ):
+	'''
+	
+		Purpose:
+		--------
+		Stops calls to a provider after `threshold` consecutive failures. Once `cooldown`
+		seconds have passed a single trial call is let through (half-open); success closes
+		the circuit, failure opens it again.
+		
+	'''
+	threshold: Optional[ int ]
+	cooldown: Optional[ float ]
+	state: Optional[ str ]
+	failures: Optional[ int ]
+	opened: Optional[ float ]
+	
+	def __init__( self, threshold: int=5, cooldown: float=30.0 ):
+		self.threshold = threshold
+		self.cooldown = cooldown
+		self.state = 'closed'
+		self.failures = 0
+		self.opened = 0.0
+		self._lock = threading.Lock( )
+	
+	def allow( self ) -> bool:
+		with self._lock:
+			if self.state == 'closed':
+				return True
+			if self.state == 'open' and time.monotonic( ) - self.opened >= self.cooldown:
+				self.state = 'half-open'
+				return True
+			return False
+	
+	def success( self ) -> None:
+		with self._lock:
+			self.state = 'closed'
+			self.failures = 0
+	
+	def failure( self ) -> None:
+		with self._lock:
+			self.failures += 1
+			if self.state == 'half-open' or self.failures >= self.threshold:
+				self.state = 'open'
+				self.opened = time.monotonic( )
+
+class Provider( ABC ):
+	'''
+	
+		Purpose:
+		--------
+		Base class for a text-completion backend used by Router. Subclasses implement
+		complete( ), which must raise on failure rather than show an ErrorDialog so the
+		router can fail over.
+		
+	'''
+	name: Optional[ str ]
+	model: Optional[ str ]
+	stats: Optional[ ProviderStats ]
+	breaker: Optional[ CircuitBreaker ]
+	max_output_tokens: Optional[ int ]
+	temperature: Optional[ float ]
+	
+	def __init__( self, model: str, threshold: int=5, cooldown: float=30.0, window: int=50 ):
+		self.name = None
+		self.model = model
+		self.stats = ProviderStats( window )
+		self.breaker = CircuitBreaker( threshold, cooldown )
+		self.max_output_tokens = 10000
+		self.temperature = 0.8
+	
+	@property
+	def key( self ) -> str:
+		return f'{self.name}:{self.model}'
+	
+	@abstractmethod
+	def complete( self, question: str, instructions: str=None ) -> str:
+		raise NotImplementedError
+	
+	def send( self, question: str, instructions: str=None ) -> str:
+		started = time.perf_counter( )
+		try:
+			text = self.complete( question, instructions )
+			if not text:
+				raise RuntimeError( f'{self.key} returned an empty response' )
+		except Exception:
+			self.stats.record( time.perf_counter( ) - started, False )
+			self.breaker.failure( )
+			raise
+		self.stats.record( time.perf_counter( ) - started, True )
+		self.breaker.success( )
+		return text
+
+class OpenAIProvider( Provider ):
+	'''
+	
+		Purpose:
+		--------
+		Sends plain text requests to the OpenAI Responses API.
+		
+	'''
+	client: Optional[ OpenAI ]
+	
+	def __init__( self, model: str='gpt-4.1-mini', **kwargs ):
+		super( ).__init__( model, **kwargs )
+		self.name = 'openai'
+		self.client = OpenAI( api_key=os.getenv( 'OPENAI_API_KEY' ) )
+	
+	def complete( self, question: str, instructions: str=None ) -> str:
+		response = self.client.responses.create( model=self.model, input=question,
+			instructions=instructions, max_output_tokens=self.max_output_tokens )
+		return response.output_text
+
+class GeminiProvider( Provider ):
+	'''
+	
+		Purpose:
+		--------
+		Sends plain text requests through gemini.Chat, so they get the same pre-flight
+		token check and model routing as Chat.generate_text. It calls Chat._generate,
+		which raises on failure, because generate_text shows an ErrorDialog and returns
+		None, which would keep the router from failing over. gemini is imported on first
+		use so agents.py does not pull in its media dependencies.
+		
+	'''
+	chat: Optional[ Any ]
+	
+	def __init__( self, model: str='gemini-2.0-flash', use_ai: bool=False,
+			version: str='v1alpha', **kwargs ):
+		super( ).__init__( model, **kwargs )
+		from .gemini import Chat
+		self.name = 'gemini'
+		self.chat = Chat( model=model, use_ai=use_ai, version=version )
+	
+	def complete( self, question: str, instructions: str=None ) -> str:
+		self.chat.temperature = self.temperature
+		self.chat.max_tokens = self.max_output_tokens
+		self.chat.instructions = instructions
+		return self.chat._generate( question, self.model ).text
+
+class Router( ):
+	'''
+	
+		Purpose:
+		--------
+		Sends a text request to one of several providers. With strategy='failover' the
+		providers are tried in the order given. With strategy='latency' providers with no
+		history are tried first so every backend gets measured; otherwise the first provider
+		is drawn at random with probability inversely proportional to its rolling median
+		latency, penalised by error rate, so slower backends still get a share of traffic
+		and their statistics stay current, and the rest follow in score order. Providers
+		whose circuit is open are skipped until their cooldown expires.
+		
+		Attributes:
+		-----------
+		providers, strategy, penalty, last, errors
+		
+		Methods:
+		--------
+		ask( question, instructions )  : Returns the first successful answer
+		ranked( )                       : Providers in the order they will be tried
+		report( )                       : Per-provider latency, error rate and circuit state
+		
+	'''
+	providers: Optional[ List[ Provider ] ]
+	strategy: Optional[ str ]
+	penalty: Optional[ float ]
+	last: Optional[ str ]
+	errors: Optional[ List[ Tuple[ str, str ] ] ]
+	
+	def __init__( self, providers: List[ Provider ]=None, strategy: str='failover',
+			penalty: float=4.0 ):
+		self.providers = providers if providers is not None else [ OpenAIProvider( ),
+		                                                           GeminiProvider( ) ]
+		self.strategy = strategy
+		self.penalty = penalty
+		self.last = None
+		self.errors = [ ]
+	
+	def ranked( self ) -> List[ Provider ]:
+		if self.strategy != 'latency':
+			return list( self.providers )
+		def score( provider: Provider ) -> float:
+			latency = provider.stats.latency
+			if latency is None:
+				return -1.0 if provider.stats.calls == 0 else float( 'inf' )
+			return latency * (1 + self.penalty * provider.stats.error_rate)
+		order = sorted( self.providers, key=score )
+		scores = [ score( p ) for p in order ]
+		if not scores or scores[ 0 ] < 0:
+			return order
+		weights = [ 1.0 / max( s, 1e-6 ) for s in scores ]
+		if not any( weights ):
+			return order
+		first = random.choices( range( len( order ) ), weights=weights )[ 0 ]
+		return [ order[ first ] ] + order[ :first ] + order[ first + 1: ]
+	
+	def ask( self, question: str, instructions: str=None ) -> str | None:
+		'''
+
+			Purpose:
+			-------
+			Sends the question to the best available provider, failing over to the next
+			one on error.
+
+			Parameters:
+			-----------
+			question: str - The user message.
+			instructions: str - Optional system instructions.
+
+			Returns:
+			---------
+			str - The response text of the first provider that succeeded.
+
+		'''
+		try:
+			throw_if( 'question', question )
+			self.errors = [ ]
+			for provider in self.ranked( ):
+				if not provider.breaker.allow( ):
+					self.errors.append( (provider.key, 'circuit open') )
+					continue
+				try:
+					text = provider.send( question, instructions )
+				except Exception as e:
+					self.errors.append( (provider.key, str( e )) )
+					continue
+				self.last = provider.key
+				return text
+			details = '; '.join( f'{key}: {message}' for key, message in self.errors )
+			raise RuntimeError( f'All providers failed ({details})' )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'agents'
+			exception.cause = 'Router'
+			exception.method = 'ask( self, question: str, instructions: str=None ) -> str | None'
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def report( self ) -> List[ Dict[ str, Any ] ]:
+		return [ { 'provider': p.key,
+		           'calls': p.stats.calls,
+		           'latency': p.stats.latency,
+		           'error_rate': p.stats.error_rate,
+		           'circuit': p.breaker.state } for p in self.providers ]
@@ -10,10 +10,12 @@
 from __future__ import annotations
 
 import config as cfg
+import io
 import os
-import sqlite3
 import tempfile
 import math
+import time
+import wave
 
 import streamlit as st
 from typing import List, Dict, Any, Optional
@@ -464,13 +466,13 @@ elif mode == "Images":
 					img.aspect = aspect
 					img.number = int( n )
 
-					# Images.generate returns a list of PIL images (per wrapper)
-					images = img.generate( prompt=prompt, aspect=aspect )
+					# Encoded bytes from the on-disk cache; reruns do not call the API again
+					images = img.generate_many( prompt=prompt, aspect=aspect, number=int( n ) )
 					if not images:
 						st.warning( "No images returned." )
 					else:
 						for im in images:
-							st.image( im, use_container_width=True )
+							st.image( im.data, use_container_width=True )
 
 					try:
 						_update_token_counters( getattr( img, "usage", None ) or getattr( img, "response", None ) )
@@ -491,7 +493,18 @@ elif mode == "Images":
 		if uploaded_img:
 			tmp_path = save_temp( uploaded_img )
 			st.image( uploaded_img, caption="Uploaded image preview", use_container_width=True )
-			st.info( "Gemini image analysis is not exposed by this wrapper. (Generate-only)" )
+			question = st.text_area( "What should Jeni look for?", key="images_analyze_prompt" )
+			if st.button( "Analyze Image" ) and question:
+				with st.spinner( "Analyzing…" ):
+					vision = Chat( use_ai=False, version=st.session_state.get( "gemini_version", "v1alpha" ) )
+					answer = vision.analyze_image( prompt=question, filepath=tmp_path )
+					st.markdown( answer or "No analysis returned." )
+					m = vision.metrics
+					if m.get( "upload_bytes" ):
+						st.caption( f"Upload {m[ 'original_bytes' ] / 1024:,.0f} KB → "
+						            f"{m[ 'upload_bytes' ] / 1024:,.0f} KB · preprocessing "
+						            f"{m.get( 'preprocess_seconds', 0.0 ):.2f}s · request "
+						            f"{m.get( 'latency_seconds', 0.0 ):.2f}s" )
 
 # ======================================================================================
 # AUDIO MODE
@@ -526,9 +539,14 @@ elif mode == "Audio":
 				if task == "Transcribe":
 					with st.spinner( "Transcribing…" ):
 						try:
-							transcriber.model = st.session_state.get( "audio_model" )
+							transcriber.model = ( st.session_state.get( "audio_model" )
+								or transcriber.model_options[ 0 ] )
 							transcriber.language = language
-							text = transcriber.transcribe( tmp )
+							upload_bar = st.progress( 0.0, text="Uploading…" )
+							text = transcriber.transcribe( tmp, model=transcriber.model,
+								progress=lambda sent, total: upload_bar.progress( sent / total,
+									text="Uploading…" ) )
+							upload_bar.empty( )
 							st.text_area( "Transcript", value=text, height=300 )
 						except Exception as exc:
 							st.error( f"Transcription failed: {exc}" )
@@ -549,9 +567,38 @@ elif mode == "Audio":
 						tts.model = tts_model
 						tts.voice = voice
 						tts.speed = float( speed )
-						audio_bytes = tts.generate( text_in )
-						if audio_bytes:
-							st.audio( audio_bytes, format="audio/wav" )
+						queue = st.container( )
+						playback = { "ends": 0.0 }
+
+						def _play( index: int, filepath: str ) -> None:
+							# Each chunk gets its own player, queued to start when the one before it
+							# ends, so audio already playing is never replaced or restarted.
+							with wave.open( filepath, "rb" ) as wav:
+								rate = wav.getframerate( )
+								start = round( sum( m[ "seconds" ] for m in tts.metrics[ :index ] ) * rate )
+								wav.setpos( start )
+								frames = wav.readframes( wav.getnframes( ) - start )
+							buffer = io.BytesIO( )
+							with wave.open( buffer, "wb" ) as chunk:
+								chunk.setnchannels( 1 )
+								chunk.setsampwidth( 2 )
+								chunk.setframerate( rate )
+								chunk.writeframes( frames )
+							wait = playback[ "ends" ] - time.monotonic( )
+							if wait > 0:
+								time.sleep( wait )
+							queue.audio( buffer.getvalue( ), format="audio/wav", autoplay=True )
+							playback[ "ends" ] = time.monotonic( ) + tts.metrics[ index ][ "seconds" ]
+
+						out_path = os.path.join( tempfile.gettempdir( ), cfg.OUTPUT_FILE_NAME )
+						audio_path = tts.stream_audio( text_in, out_path, voice=voice, on_chunk=_play )
+						if audio_path:
+							with open( audio_path, "rb" ) as f:
+								st.audio( f.read( ), format="audio/wav" )
+							latencies = [ m[ "latency" ] for m in tts.metrics ]
+							st.caption( f"{len( latencies )} chunk(s) · first audio after "
+							            f"{tts.metrics[ 0 ][ 'ready' ]:.2f}s · mean chunk latency "
+							            f"{sum( latencies ) / len( latencies ):.2f}s" )
 						else:
 							st.warning( "No audio returned." )
 					except Exception as exc:
@@ -709,7 +756,7 @@ elif mode == "Files":
 # PROMPT ENGINEERING MODE
 # ======================================================================================
 elif mode == "Prompt Engineering":
-	DB_PATH = "stores/sqlite/datamodels/Data.db"
+	DB_PATH = str( cfg.DB_PATH )
 	TABLE = "Prompts"
 	PAGE_SIZE = 10
 
@@ -726,8 +773,12 @@ elif mode == "Prompt Engineering":
 	# ----------------------------
 	# Helpers
 	# ----------------------------
-	def get_conn( ):
-		return sqlite3.connect( DB_PATH )
+	@st.cache_resource
+	def get_pool( path: str ):
+		from data import ConnectionPool
+		return ConnectionPool( path )
+
+	pool = get_pool( DB_PATH )
 
 	def reset_controls( ):
 		st.session_state.pe_page = 1
@@ -813,13 +864,9 @@ elif mode == "Prompt Engineering":
 	count_query = f"SELECT COUNT(*) FROM {TABLE} {where}"
 
 	try:
-		with get_conn( ) as conn:
-			cur = conn.cursor( )
-			cur.execute( query, params )
-			rows = cur.fetchall( )
-
-			cur.execute( count_query, params )
-			total_rows = cur.fetchone( )[ 0 ]
+		with pool.read( ) as conn:
+			rows = conn.execute( query, params ).fetchall( )
+			total_rows = conn.execute( count_query, params ).fetchone( )[ 0 ]
 	except Exception as exc:
 		st.error( f"SQLite error: {exc}" )
 		rows = [ ]
@@ -881,13 +928,11 @@ elif mode == "Prompt Engineering":
 	selected = None
 	if st.session_state.pe_selected_id:
 		try:
-			with get_conn( ) as conn:
-				cur = conn.cursor( )
-				cur.execute(
+			with pool.read( ) as conn:
+				selected = conn.execute(
 					f"SELECT PromptsId, Name, Text, Version FROM {TABLE} WHERE PromptsId=?",
 					(st.session_state.pe_selected_id,),
-				)
-				selected = cur.fetchone( )
+				).fetchone( )
 		except Exception as exc:
 			st.error( f"SQLite error: {exc}" )
 			selected = None
@@ -903,10 +948,9 @@ elif mode == "Prompt Engineering":
 		with b1:
 			if st.button( "Save Changes" if selected else "Create Prompt" ):
 				try:
-					with get_conn( ) as conn:
-						cur = conn.cursor( )
+					with pool.write( ) as conn:
 						if selected:
-							cur.execute(
+							conn.execute(
 								f"""
 								UPDATE {TABLE}
 								SET Name=?, Text=?, Version=?
@@ -915,14 +959,13 @@ elif mode == "Prompt Engineering":
 								(name, text, int( version ), selected[ 0 ]),
 							)
 						else:
-							cur.execute(
+							conn.execute(
 								f"""
 								INSERT INTO {TABLE} (Name, Text, Version)
 								VALUES (?, ?, ?)
 								""",
 								(name, text, int( version )),
 							)
-						conn.commit( )
 					st.success( "Saved." )
 					st.rerun( )
 				except Exception as exc:
@@ -931,12 +974,11 @@ elif mode == "Prompt Engineering":
 		with b2:
 			if selected and st.button( "Delete" ):
 				try:
-					with get_conn( ) as conn:
+					with pool.write( ) as conn:
 						conn.execute(
 							f"DELETE FROM {TABLE} WHERE PromptsId=?",
 							(selected[ 0 ],),
 						)
-						conn.commit( )
 					reset_controls( )
 					st.success( "Deleted." )
 					st.rerun( )
@@ -983,6 +1025,10 @@ if mode == "Documents":
 
 		st.markdown( "---" )
 		question = st.text_area( "Ask a question about the selected document" )
+		is_pdf = selected_path.lower( ).endswith( ".pdf" )
+		page_select = st.checkbox( "Send only the most relevant pages", value=is_pdf,
+			disabled=not is_pdf )
+		top_k = st.slider( "Pages to send", 1, 20, 5, disabled=not (is_pdf and page_select) )
 		if st.button( "Ask Document" ):
 			if not question:
 				st.warning( "Enter a question before asking." )
@@ -990,7 +1036,20 @@ if mode == "Documents":
 				with st.spinner( "Running document Q&A…" ):
 					try:
 						chat = Chat( use_ai=True, version=st.session_state.get( "gemini_version", "v1alpha" ) )
-						answer = chat.summarize_document( pdf_path=selected_path, prompt=question )
+						if is_pdf and page_select:
+							answer = chat.summarize_pages( prompt=question, filepath=selected_path,
+								top_k=int( top_k ) )
+							m = chat.metrics or { }
+							if m:
+								st.caption( f"Sent pages {m[ 'pages_sent' ]} of {m[ 'pages_total' ]} · "
+								            f"~{m[ 'tokens_saved' ]:,} tokens saved · "
+								            f"{m[ 'latency_seconds' ]:.1f}s" )
+						else:
+							upload_bar = st.progress( 0.0, text="Uploading…" )
+							answer = chat.summarize_document( prompt=question, filepath=selected_path,
+								progress=lambda sent, total: upload_bar.progress( sent / total,
+									text="Uploading…" ) )
+							upload_bar.empty( )
 
 						st.markdown( "**Answer:**" )
 						st.markdown( answer or "No answer returned." )
@@ -53,6 +53,7 @@ GOOGLE_API_KEY = os.getenv( 'GOOGLE_API_KEY' )
 GOOGLE_CSE_ID = os.getenv( 'GOOGLE_CSE_ID' )
 GOOGLE_CLOUD_LOCATION = os.getenv( 'GOOGLE_CLOUD_LOCATION' )
 GOOGLE_CLOUD_PROJECT = os.getenv( 'GOOGLE_CLOUD_PROJECT' )
+GOOGLE_CLOUD_BUCKET = os.getenv( 'GOOGLE_CLOUD_BUCKET' )
 HUGGINGFACE_API_KEY = os.getenv( 'HUGGINGFACE_API_KEY' )
 OPENAI_API_KEY = os.getenv( 'OPENAI_API_KEY' )
 OUTPUT_FILE_NAME = "jeni.wav"
@@ -62,6 +63,26 @@ DEFAULT_MODEL = MODELS[ 0 ]
 SQLALCHEMY_DATABASE_URI = f'sqlite:///' + r'C:\Users\terry\source\repos\Jeni\stores\sqlite\datamodels\Data.db'
 BASE_DIR = Path(__file__).resolve().parent
 FAVICON_PATH = BASE_DIR / 'resources' / 'images' / 'favicon.ico'
+CACHE_DIR = BASE_DIR / 'stores' / 'cache'
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_INLINE_LIMIT = 16 * 1024 * 1024
+PDF_PAGE_TOKENS = 258
+AUDIO_TOKENS_PER_SECOND = 32
+AUDIO_BYTES_PER_SECOND = 16000
+TRANSCRIBE_SAMPLE_RATE = 16000
+UPLOAD_SESSIONS_PATH = CACHE_DIR / 'uploads.json'
+INGEST_MANIFEST_PATH = CACHE_DIR / 'ingest.json'
+CORPUS_DIR = BASE_DIR / 'stores' / 'text'
+CORPUS_INDEX_PATH = CACHE_DIR / 'corpus.db'
+STOPWORDS_PATH = BASE_DIR / 'stores' / 'stopwords.txt'
+IMAGE_CACHE_BYTES = 512 * 1024 * 1024
+DB_PATH = Path( os.getenv( 'JENI_DB_PATH', BASE_DIR / 'stores' / 'sqlite' / 'datamodels' / 'Data.db' ) )
+DB_MMAP_SIZE = 256 * 1024 * 1024
+DB_CACHE_KB = 64 * 1024
+DB_BUSY_TIMEOUT = 5000
+DB_READERS = 8
+ANN_EXACT_LIMIT = 5000
+INSERT_MODELS_DIR = BASE_DIR / 'stores' / 'sqlite' / 'datamodels' / 'INSERT'
 
 def set_environment( ):
 	"""
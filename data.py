@@ -43,27 +43,44 @@
   ******************************************************************************************
   '''
 from __future__ import annotations
-from .boogr import Error, ErrorDialog
+try:
+	from .boogr import Error, ErrorDialog
+except ImportError:
+	from boogr import Error, ErrorDialog
+import atexit
 import chromadb
+import contextlib
 from chromadb import Settings
 import config as cfg
 import fitz
+import glob
+import datetime
+import hashlib
 import os
 import re
 import json
 import numpy as np
 import pandas as pd
+import queue
 import re
 import string
-import spacy
+import tempfile
+import unicodedata
 import openpyxl
 from openai import OpenAI
+from functools import lru_cache
 from pathlib import Path
 import requests
 import sqlite3
+import threading
+import time
+import tracemalloc
+import itertools
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from sqlite3 import Connection, Cursor
 import tiktoken
-from typing import Any, List, Tuple, Optional, Dict
+from typing import Any, Callable, Iterable, Iterator, List, Tuple, Optional, Dict
 
 def throw_if( name: str, value: object ):
 	"""
@@ -77,6 +94,427 @@ def throw_if( name: str, value: object ):
 	if value is None:
 		raise ValueError( f'Argument "{name}" cannot be empty!' )
 
+def normalize( vectors: np.ndarray ) -> np.ndarray:
+	"""
+	
+		Purpose:
+		--------
+		Returns float32 copies of the rows scaled to unit length. Zero rows stay zero.
+		
+	"""
+	matrix = np.array( vectors, dtype=np.float32, ndmin=2 )
+	norms = np.linalg.norm( matrix, axis=1, keepdims=True )
+	norms[ norms == 0 ] = 1.0
+	matrix /= norms
+	return matrix
+
+def top_k( matrix: np.ndarray, queries: np.ndarray, k: int ) -> Tuple[ np.ndarray, np.ndarray ]:
+	"""
+	
+		Purpose:
+		--------
+		Exact inner-product top-k for a batch of queries using one matrix product and
+		argpartition. Both inputs should already be normalized.
+		
+		Returns:
+		--------
+		Tuple[np.ndarray, np.ndarray]: (indices, scores), each (queries, k), best first.
+		
+	"""
+	scores = queries @ matrix.T
+	k = min( k, scores.shape[ 1 ] )
+	if k == 0:
+		empty = np.empty( (len( queries ), 0) )
+		return empty.astype( np.int64 ), empty.astype( np.float32 )
+	part = np.argpartition( -scores, k - 1, axis=1 )[ :, :k ]
+	best = np.take_along_axis( scores, part, axis=1 )
+	order = np.argsort( -best, axis=1 )
+	return np.take_along_axis( part, order, axis=1 ), np.take_along_axis( best, order, axis=1 )
+
+def benchmark_search( sizes: Tuple[ int, ... ]=(10000, 100000, 1000000), dimensions: int=384,
+		k: int=10, queries: int=100, seed: int=0 ) -> List[ Dict[ str, float ] ]:
+	"""
+	
+		Purpose:
+		--------
+		Times exact top-k search on random unit vectors for each corpus size, both one
+		query at a time and as a single batch.
+		
+		Returns:
+		--------
+		List[Dict]: size, single_ms (mean per query) and batch_qps for each size.
+		
+	"""
+	rng = np.random.default_rng( seed )
+	results = [ ]
+	for size in sizes:
+		matrix = normalize( rng.standard_normal( (size, dimensions), dtype=np.float32 ) )
+		probe = normalize( rng.standard_normal( (queries, dimensions), dtype=np.float32 ) )
+		started = time.perf_counter( )
+		for q in probe:
+			top_k( matrix, q[ None, : ], k )
+		single = (time.perf_counter( ) - started) / queries
+		started = time.perf_counter( )
+		top_k( matrix, probe, k )
+		batch = time.perf_counter( ) - started
+		results.append( { 'size': size, 'single_ms': single * 1000,
+		                  'batch_qps': queries / batch } )
+		del matrix
+	return results
+
+def benchmark_ann( size: int=100000, dimensions: int=384, k: int=10, queries: int=200,
+		efs: Tuple[ int, ... ]=(16, 32, 64, 128, 256), M: int=16, ef_construction: int=200,
+		seed: int=0 ) -> Dict[ str, Any ]:
+	"""
+	
+		Purpose:
+		--------
+		Builds an HnswIndex over random unit vectors and reports recall@k and mean query
+		latency for each ef against exact top_k search on the same data.
+		
+		Returns:
+		--------
+		Dict: build_seconds, exact_ms and a list of { ef, recall, ms } rows.
+		
+	"""
+	rng = np.random.default_rng( seed )
+	matrix = normalize( rng.standard_normal( (size, dimensions), dtype=np.float32 ) )
+	probe = normalize( rng.standard_normal( (queries, dimensions), dtype=np.float32 ) )
+	started = time.perf_counter( )
+	store = HnswIndex( dimensions, M=M, ef_construction=ef_construction, capacity=size )
+	store.add( np.arange( size ), matrix )
+	build = time.perf_counter( ) - started
+	started = time.perf_counter( )
+	truth = np.vstack( [ top_k( matrix, q[ None, : ], k )[ 0 ] for q in probe ] )
+	exact = (time.perf_counter( ) - started) / queries
+	rows = [ ]
+	for ef in efs:
+		store.ef = max( ef, k )
+		started = time.perf_counter( )
+		found = np.vstack( [ store.query( q, k )[ 0 ] for q in probe ] )
+		elapsed = (time.perf_counter( ) - started) / queries
+		recall = np.mean( [ len( np.intersect1d( a, b ) ) / k for a, b in zip( truth, found ) ] )
+		rows.append( { 'ef': ef, 'recall': float( recall ), 'ms': elapsed * 1000 } )
+	return { 'build_seconds': build, 'exact_ms': exact * 1000, 'results': rows }
+
+def benchmark_quantized( size: int=100000, dimensions: int=384, k: int=10, queries: int=100,
+		rerank: int=100, subspaces: int=48, seed: int=0 ) -> List[ Dict[ str, Any ] ]:
+	"""
+	
+		Purpose:
+		--------
+		Compares int8 and product quantization against exact top_k on clustered random
+		vectors, reporting memory, recall@k and mean query latency for each mode.
+		
+		Returns:
+		--------
+		List[Dict]: One row per mode with bytes, ratio, recall and ms.
+		
+	"""
+	rng = np.random.default_rng( seed )
+	centers = rng.standard_normal( (256, dimensions), dtype=np.float32 )
+	matrix = centers[ rng.integers( 0, 256, size ) ]
+	matrix += 0.5 * rng.standard_normal( (size, dimensions), dtype=np.float32 )
+	matrix = normalize( matrix )
+	probe = normalize( matrix[ rng.choice( size, queries, replace=False ) ]
+	                   + 0.1 * rng.standard_normal( (queries, dimensions), dtype=np.float32 ) )
+	started = time.perf_counter( )
+	truth = top_k( matrix, probe, k )[ 0 ]
+	rows = [ { 'mode': 'float32', 'bytes': matrix.nbytes, 'ratio': 1.0, 'recall': 1.0,
+	           'ms': 1000 * (time.perf_counter( ) - started) / queries } ]
+	for mode in ('int8', 'pq'):
+		store = QuantizedIndex( mode, subspaces=subspaces, seed=seed )
+		store.train( matrix )
+		store.add( np.arange( size ), matrix, exact=matrix )
+		started = time.perf_counter( )
+		found = store.query( probe, k, rerank )[ 0 ]
+		elapsed = (time.perf_counter( ) - started) / queries
+		recall = np.mean( [ len( np.intersect1d( a, b ) ) / k for a, b in zip( truth, found ) ] )
+		usage = store.memory( )
+		rows.append( { 'mode': mode, 'bytes': usage[ 'bytes' ], 'ratio': usage[ 'ratio' ],
+		               'recall': float( recall ), 'ms': elapsed * 1000 } )
+	return rows
+
+def benchmark_pool( db_path: str, sql: str, params: Tuple=( ),
+		threads: Tuple[ int, ... ]=(1, 2, 4, 8), queries: int=2000 ) -> List[ Dict[ str, float ] ] | None:
+	"""
+	
+		Purpose:
+		--------
+		Measures concurrent read throughput for one query, comparing a single shared
+		connection behind a lock (the old SQLite behaviour) with readers borrowed from a
+		ConnectionPool, at each thread count.
+		
+		Returns:
+		--------
+		List[Dict]: threads, shared_qps, pooled_qps and speedup for each thread count.
+		
+	"""
+	def run( count: int, borrow: Callable[ [ ], Any ], guard: Any ) -> float:
+		def worker( n: int ) -> None:
+			with borrow( ) as connection:
+				for _ in range( n ):
+					with guard:
+						connection.execute( sql, params ).fetchall( )
+		started = time.perf_counter( )
+		with ThreadPoolExecutor( max_workers=count ) as executor:
+			list( executor.map( worker, [ queries // count ] * count ) )
+		return (queries // count) * count / (time.perf_counter( ) - started)
+	
+	results = [ ]
+	pool = ConnectionPool( db_path, readers=max( threads ) )
+	shared = sqlite3.connect( db_path, check_same_thread=False )
+	try:
+		for count in threads:
+			single = run( count, lambda: contextlib.nullcontext( shared ), threading.Lock( ) )
+			pooled = run( count, pool.read, contextlib.nullcontext( ) )
+			results.append( { 'threads': count, 'shared_qps': single, 'pooled_qps': pooled,
+			                  'speedup': pooled / single } )
+		return results
+	finally:
+		shared.close( )
+		pool.close( )
+
+def benchmark_writes( db_path: str, rows: int=20000, batch_size: int=1000 ) -> Dict[ str, float ]:
+	"""
+	
+		Purpose:
+		--------
+		Inserts the same rows three ways into a scratch table: one commit per statement
+		on a plain connection (the old SQLite.insert behaviour), through a WriteQueue
+		from the caller's thread, and as a single explicit transaction unit. Run it
+		against a scratch database file, since the pool switches it to WAL.
+		
+		Returns:
+		--------
+		Dict: rows/s for each path and the number of group commits the queue made.
+		
+	"""
+	values = [ (f'name {i}', 'lorem ipsum ' * 8, i % 7) for i in range( rows ) ]
+	sql = 'INSERT INTO bench_writes (name, text, version) VALUES (?, ?, ?)'
+	connection = sqlite3.connect( db_path )
+	connection.execute( '''CREATE TABLE IF NOT EXISTS bench_writes (id INTEGER PRIMARY KEY,
+		name TEXT, text TEXT, version INTEGER)''' )
+	started = time.perf_counter( )
+	for row in values:
+		connection.execute( sql, row )
+		connection.commit( )
+	results = { 'rows': rows, 'per_statement_rows_s': rows / (time.perf_counter( ) - started) }
+	connection.close( )
+	pool = ConnectionPool( db_path )
+	writes = WriteQueue( pool, batch_size=batch_size )
+	try:
+		started = time.perf_counter( )
+		wait( [ writes.submit( sql, row ) for row in values ] )
+		results[ 'queued_rows_s' ] = rows / (time.perf_counter( ) - started)
+		results[ 'queued_commits' ] = writes.commits
+		started = time.perf_counter( )
+		writes.submit( [ (sql, row) for row in values ] ).result( )
+		results[ 'transaction_rows_s' ] = rows / (time.perf_counter( ) - started)
+		with pool.write( ) as writer:
+			writer.execute( 'DROP TABLE bench_writes' )
+		return results
+	finally:
+		writes.close( )
+		pool.close( )
+
+def file_digest( path: str, block: int=1 << 20 ) -> str:
+	digest = hashlib.sha256( )
+	with open( path, 'rb' ) as file:
+		for data in iter( lambda: file.read( block ), b'' ):
+			digest.update( data )
+	return digest.hexdigest( )
+
+@lru_cache( maxsize=4 )
+def load_stopwords( path: str=None ) -> frozenset:
+	"""
+	
+		Purpose:
+		--------
+		Reads a stopword list written as one quoted, comma-terminated word per line
+		(the format of stores/stopwords.txt) into a lower-case frozenset.
+		
+	"""
+	with open( path or cfg.STOPWORDS_PATH, encoding='utf-8' ) as file:
+		return frozenset( w.lower( ) for w in re.findall( r'"([^"]+)"', file.read( ) ) )
+
+def fts_query( text: str, stopwords: frozenset=None, operator: str='OR' ) -> str:
+	"""
+	
+		Purpose:
+		--------
+		Turns free text into a safe FTS5 MATCH expression: each whitespace-separated
+		piece becomes a quoted phrase of its word characters (so "P.L. 117-58" matches
+		the adjacent tokens "p l" and "117 58"), single-word pieces found in stopwords
+		are dropped, and the pieces are joined with operator.
+		
+	"""
+	phrases = [ ]
+	for piece in text.split( ):
+		words = re.findall( r'\w+', piece )
+		if not words or (stopwords and len( words ) == 1 and words[ 0 ].lower( ) in stopwords):
+			continue
+		phrases.append( '"' + ' '.join( words ) + '"' )
+	return f' {operator} '.join( phrases )
+
+def read_text( path: str ) -> str:
+	with open( path, encoding='utf-8', errors='replace' ) as file:
+		return file.read( )
+
+CONTROL_CHARS = re.compile( r'[\x00-\x08\x0b-\x1f\x7f]' )
+SPACE_RUNS = re.compile( r' [ \t\f\v\u00a0]+|[\t\f\v\u00a0][ \t\f\v\u00a0]*' )
+LINE_EDGES = re.compile( r' *\n *' )
+BLANK_RUNS = re.compile( r'\n{3,}' )
+WORD_TOKENS = re.compile( r"[^\W_]+(?:['.\-][^\W_]+)*" )
+ASCII_TOKENS = re.compile( r"[A-Za-z0-9]+(?:['.\-][A-Za-z0-9]+)*" )
+PUNCTUATION = str.maketrans( { '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"',
+                               '\u2013': '-', '\u2014': '-', '\u2212': '-', '\u00ad': None } )
+
+def clean_text( text: str, form: str='NFKC' ) -> str:
+	"""
+	
+		Purpose:
+		--------
+		Applies Unicode normalization, maps typographic quotes and dashes to ASCII,
+		normalizes line endings, strips control characters and collapses runs of spaces
+		while keeping paragraph breaks.
+		
+	"""
+	if form:
+		text = unicodedata.normalize( form, text )
+	text = text.translate( PUNCTUATION ).replace( '\r\n', '\n' ).replace( '\r', '\n' )
+	text = SPACE_RUNS.sub( ' ', CONTROL_CHARS.sub( '', text ) )
+	return BLANK_RUNS.sub( '\n\n', LINE_EDGES.sub( '\n', text ) ).strip( )
+
+SENTENCE_END = re.compile( r'[.!?;:]["\')\]]*(?=\s)' )
+
+_chunkers: Dict[ Tuple[ int, int, str ], 'TokenChunker' ] = { }
+
+def _prepare_document( path: str, size: int, overlap: int, encoding: str,
+		pipeline: 'TextPipeline' ) -> Tuple[ str, List[ str ], List[ Tuple[ int, int ] ] ]:
+	key = (size, overlap, encoding)
+	if key not in _chunkers:
+		_chunkers[ key ] = TokenChunker( size, overlap, encoding )
+	chunks, offsets = [ ], [ ]
+	for window in _chunkers[ key ].chunk( read_text( path ) ):
+		cleaned = pipeline.clean( window[ 'text' ] )
+		if cleaned:
+			chunks.append( cleaned )
+			offsets.append( (window[ 'start' ], window[ 'end' ]) )
+	return path, chunks, offsets
+
+def _load_sqlite_vec( connection: Connection ) -> None:
+	import sqlite_vec
+	connection.enable_load_extension( True )
+	try:
+		sqlite_vec.load( connection )
+	finally:
+		connection.enable_load_extension( False )
+
+def _sql_statements( script: str ) -> List[ str ]:
+	script = re.sub( r'^\s*PARAMETERS\b[^;]*;', '', script, flags=re.IGNORECASE )
+	script = re.sub( r'\bALike\b', 'LIKE', script, flags=re.IGNORECASE )
+	statements, current = [ ], ''
+	for line in script.splitlines( keepends=True ):
+		current += line
+		if sqlite3.complete_statement( current ):
+			statements.append( current.strip( ) )
+			current = ''
+	if current.strip( ):
+		statements.append( current.strip( ) )
+	return statements
+
+def _identifier( name: str ) -> str:
+	return '"' + str( name ).replace( '"', '""' ) + '"'
+
+def _sheet_columns( header: Tuple ) -> List[ str ]:
+	columns, seen = [ ], { }
+	for i, value in enumerate( header ):
+		name = f'Unnamed: {i}' if value is None else str( value )
+		if name in seen:
+			seen[ name ] += 1
+			name = f'{name}.{seen[ name ]}'
+		seen.setdefault( name, 0 )
+		columns.append( name )
+	return columns
+
+def _column_type( values: List[ Any ] ) -> str:
+	present = [ v for v in values if v is not None ]
+	if not present:
+		return 'TEXT'
+	if all( isinstance( v, (bool, int) ) for v in present ):
+		return 'INTEGER'
+	if all( isinstance( v, (bool, int, float) ) for v in present ):
+		return 'REAL'
+	if all( isinstance( v, (datetime.date, datetime.time) ) for v in present ):
+		return 'TIMESTAMP'
+	return 'TEXT'
+
+def _stage_sheet( path: str, sheet: str, staging: str, chunk_size: int,
+		sample_rows: int ) -> Tuple[ str, str, int ]:
+	"""
+	
+		Purpose:
+		--------
+		Streams one worksheet with openpyxl in read-only mode into a table of the same
+		name in its own staging database. Column types come from the first
+		`sample_rows` rows and rows are written with executemany in `chunk_size`
+		batches inside one transaction, so memory stays bounded by the chunk size.
+		
+		Returns:
+		--------
+		Tuple[str, str, int]: sheet name, CREATE TABLE statement and rows written.
+		
+	"""
+	book = openpyxl.load_workbook( path, read_only=True, data_only=True )
+	try:
+		worksheet = book[ sheet ]
+		worksheet.reset_dimensions( )
+		rows = worksheet.iter_rows( values_only=True )
+		header = next( rows, None )
+		if header is None:
+			return sheet, '', 0
+		columns = _sheet_columns( header )
+		width = len( columns )
+		def padded( source: Iterator[ Tuple ] ) -> Iterator[ Tuple ]:
+			blank = 0
+			for row in source:
+				if all( v is None for v in row ):
+					blank += 1
+					continue
+				for _ in range( blank ):
+					yield (None,) * width
+				blank = 0
+				yield row if len( row ) == width else (tuple( row ) + (None,) * width)[ :width ]
+		rows = padded( rows )
+		sample = list( itertools.islice( rows, sample_rows ) )
+		types = [ _column_type( [ row[ i ] for row in sample ] ) for i in range( width ) ]
+		temporal = { i for i, kind in enumerate( types ) if kind == 'TIMESTAMP' }
+		if temporal:
+			rows = ( tuple( str( v ) if i in temporal and v is not None else v
+			                for i, v in enumerate( row ) ) for row in itertools.chain( sample, rows ) )
+		else:
+			rows = itertools.chain( sample, rows )
+		table = _identifier( sheet )
+		create = (f'CREATE TABLE {table} ('
+		          + ', '.join( f'{_identifier( c )} {t}' for c, t in zip( columns, types ) ) + ')')
+		insert = f"INSERT INTO {table} VALUES ({', '.join( '?' * width )})"
+		connection = sqlite3.connect( staging )
+		try:
+			connection.execute( 'PRAGMA journal_mode=OFF' )
+			connection.execute( 'PRAGMA synchronous=OFF' )
+			connection.execute( create )
+			count = 0
+			with connection:
+				while chunk := list( itertools.islice( rows, chunk_size ) ):
+					connection.executemany( insert, chunk )
+					count += len( chunk )
+			return sheet, create, count
+		finally:
+			connection.close( )
+	finally:
+		book.close( )
+
 class SQLite( ):
 	"""
 	
@@ -85,7 +523,21 @@ class SQLite( ):
 	
 		Methods:
 			- create_table: Creates a df with specified schema.
-			- insert: Inserts a record into a df.
+			- insert: Queues a record insert on the group-commit writer.
+			- transaction: Groups inserts, updates and deletes into one atomic commit.
+			- insert_rows: Bulk inserts or upserts rows from any iterable.
+			- load_datamodels: Runs the INSERT datamodel scripts in one transaction.
+			- insert_many: Inserts text chunks with float32 embedding BLOBs.
+			- migrate_embeddings: Converts JSON text embeddings to float32 BLOBs.
+			- load_matrix: Loads all embeddings as one memory-mapped matrix.
+			- search: Exact top-k cosine search over stored embeddings.
+			- create_vec_index: Builds a sqlite-vec KNN index over stored embeddings.
+			- search_vec: KNN search inside SQLite joined with chunk text.
+			- attach_hnsw: Loads or builds a persistent HNSW index and keeps it in sync.
+			- search_ann: Approximate nearest-neighbour search through the HNSW index.
+			- attach_quantized: Builds an int8 or product-quantized index.
+			- search_quantized: Quantized search with exact re-ranking.
+			- search_hybrid: BM25 and vector search fused with reciprocal rank fusion.
 			- fetch_all: Fetches all rows from a df.
 			- fetch_one: Fetches a single record matching the query.
 			- update: Updates rows that match a given condition.
@@ -94,6 +546,8 @@ class SQLite( ):
 		
 	"""
 	db_path: Optional[ str ]
+	pool: Optional[ 'ConnectionPool' ]
+	writes: Optional[ 'WriteQueue' ]
 	connection: Optional[ Connection ]
 	cursor: Optional[ Cursor ]
 	file_path: Optional[ str ]
@@ -104,19 +558,24 @@ class SQLite( ):
 	columns: Optional[ List[ str ] ]
 	params: Optional[ Tuple ]
 	tables: Optional[ List ]
+	hnsw: Optional[ 'HnswIndex' ]
+	quantized: Optional[ 'QuantizedIndex' ]
 	
-	def __init__( self ):
+	def __init__( self, db_path: str=None ):
 		"""
 			
 			Pupose:
-			Initializes the connection to the SQLite database.
+			Initializes the connection pool for the SQLite database.
 			
 			Args:
-				db_name (str): The name of the database file.
+				db_path (str): Path to the database file, cfg.DB_PATH by default.
 			
 		"""
-		self.db_path = r'stores\sqlite\datamodels\Data.db'
-		self.connection = sqlite3.connect( self.db_path )
+		self.db_path = str( db_path or cfg.DB_PATH )
+		self.pool = ConnectionPool( self.db_path )
+		self.writes = WriteQueue( self.pool )
+		self._batch = threading.local( )
+		self.connection = self.pool.writer
 		self.cursor = self.connection.cursor( )
 		self.file_path = None
 		self.where = None
@@ -129,9 +588,25 @@ class SQLite( ):
 		self.params = ( )
 		self.column_names = [ str ]
 		self.tables = [ ]
+		self._index = None
+		self._index_ids = None
+		self._index_sources = None
+		self._index_count = 0
+		self._index_model = None
+		self._source_codes = { }
+		self._statements = { }
+		self.vec_enabled = None
+		self.vec_model = None
+		self.hnsw = None
+		self.hnsw_model = None
+		self.quantized = None
+		self.quantized_model = None
+		self.timings = { }
 	
 	def __dir__( self ):
 		return [ 'db_path',
+		         'pool',
+		         'writes',
 		         'connection',
 		         'cursor',
 		         'path',
@@ -150,6 +625,21 @@ class SQLite( ):
 		         'delete',
 		         'update',
 		         'insert',
+		         'transaction',
+		         'insert_rows',
+		         'insert_many',
+		         'load_datamodels',
+		         'migrate_embeddings',
+		         'load_matrix',
+		         'search',
+		         'create_vec_index',
+		         'search_vec',
+		         'compare_search',
+		         'attach_hnsw',
+		         'search_ann',
+		         'attach_quantized',
+		         'search_quantized',
+		         'search_hybrid',
 		         'create_table',
 		         'fetch_one',
 		         'fetch_all' ]
@@ -159,24 +649,36 @@ class SQLite( ):
 
 			Purpose:
 			Creates the 'embeddings' table with appropriate schema if it does not already exist.
+			Vectors are stored as little-endian float32 BLOBs with their dimension and the
+			embedding model that produced them. An external-content FTS5 table,
+			embeddings_fts, indexes chunk_text and is kept in sync by triggers.
 
 			Returns:
 			None
 
 		"""
 		try:
-			self.cursor.execute( """
+			with self.pool.write( ):
+				self.cursor.execute( """
              CREATE TABLE IF NOT EXISTS embeddings
              (
                  id          INTEGER PRIMARY KEY AUTOINCREMENT,
                  source_file TEXT    NOT NULL,
                  chunk_index INTEGER NOT NULL,
                  chunk_text  TEXT    NOT NULL,
-                 embedding   TEXT    NOT NULL,
+                 embedding   BLOB    NOT NULL,
+                 dimensions  INTEGER NOT NULL,
+                 model       TEXT,
+                 start_offset INTEGER,
+                 end_offset  INTEGER,
                  created_at  TEXT DEFAULT CURRENT_TIMESTAMP
              )""" )
-			
-			self.connection.commit( )
+				self.cursor.execute( 'CREATE INDEX IF NOT EXISTS idx_embeddings_model '
+				                     'ON embeddings (model)' )
+				self.cursor.execute( 'CREATE INDEX IF NOT EXISTS idx_embeddings_source '
+				                     'ON embeddings (source_file, chunk_index)' )
+				self._create_fts( )
+				self._create_version( )
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'data'
@@ -200,8 +702,8 @@ class SQLite( ):
 		try:
 			throw_if( 'sql', sql )
 			self.sql = sql
-			self.cursor.execute( self.sql )
-			self.connection.commit( )
+			with self.pool.write( ) as connection:
+				connection.execute( self.sql )
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'data'
@@ -210,254 +712,2390 @@ class SQLite( ):
 			error = ErrorDialog( exception )
 			error.show( )
 	
-	def insert( self, table: str, columns: List[ str ], values: Tuple[ Any, ... ] ) -> None:
+	def insert( self, table: str, columns: List[ str ], values: Tuple[ Any, ... ],
+			wait: bool=True ) -> Future | None:
 		"""
 			
 			Purpose:
 			--------
-			Inserts a new record into a df.
+			Inserts a new record through the group-commit writer.
 	
 			Parameter:
 			--------
 			table (str): The name of the df.
 			columns (List[str]): Column names.
 			values (Tuple): Corresponding target_values.
+			wait (bool): Block until committed; False returns as soon as it is queued.
+			
+			Returns:
+			--------
+			Future: Resolves to the rowcount once the row is committed.
 			
 		"""
 		try:
 			throw_if( 'table', table )
 			throw_if( 'columns', columns )
 			throw_if( 'values', values )
-			self.placeholders = ', '.join( '?' for _ in values )
-			col_names = ', '.join( columns )
-			self.sql = f'INSERT INTO {table} ({col_names}) VALUES ({self.placeholders})'
-			self.cursor.execute( self.sql, values )
-			self.connection.commit( )
+			self.sql = self._insert_sql( table, tuple( columns ) )
+			return self._write( self.sql, values, wait )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = ('insert( self, df: str, columns: List[ str ], '
+			                    'target_values: Tuple[ Any, ... ] ) -> None')
+			error = ErrorDialog( exception )
+			error.show( )
+
+	def insert_rows( self, table: str, columns: List[ str ], rows: Iterable[ Tuple ],
+			batch_size: int=5000, conflict: str=None, keys: List[ str ]=None ) -> int | None:
+		"""
+		
+			Purpose:
+			--------
+			Bulk inserts rows from any iterable, including generators, with executemany in
+			batch_size chunks inside one transaction on the writer. The statement text is
+			cached per (table, columns, conflict, keys), so every batch reuses the
+			connection's prepared statement.
+	
+			Parameters:
+			--------
+			table (str): The name of the df.
+			columns (List[str]): Column names, in the order of each row tuple.
+			rows (Iterable[Tuple]): Row values.
+			batch_size (int): Rows per executemany call.
+			conflict (str): None, 'ignore', 'replace', or 'update' to upsert on keys.
+			keys (List[str]): Conflict target columns, required for 'update'.
+			
+			Returns:
+			--------
+			int: Number of rows inserted or changed.
+			
+		"""
+		try:
+			throw_if( 'table', table )
+			throw_if( 'columns', columns )
+			self.sql = self._insert_sql( table, tuple( columns ), conflict, tuple( keys or ( ) ) )
+			self.writes.flush( )
+			rows = iter( rows )
+			with self.pool.write( ) as connection:
+				before = connection.total_changes
+				while chunk := list( itertools.islice( rows, batch_size ) ):
+					connection.executemany( self.sql, chunk )
+				return connection.total_changes - before
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = ('insert_rows( self, table: str, columns: List[ str ], '
+			                    'rows: Iterable[ Tuple ], batch_size: int ) -> int')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def insert_many( self, source_file: str, chunks: List[ str ], vectors: np.ndarray,
+			model: str=None, offsets: List[ Tuple[ int, int ] ]=None ) -> None:
+		"""
+	
+			Purpose:
+			--------
+			Batch inserts multiple chunks and their embeddings into the database in a
+			single transaction. Vectors are written as float32 BLOBs.
+	
+			Parameters:
+			--------
+			source_file (str): Name or path of the source document.
+			chunks (List[str]): List of cleaned text chunks.
+			vectors (np.ndarray): Matrix of embedding vectors.
+			model (str): Name of the embedding model.
+			offsets (List[Tuple[int, int]]): Character span of each chunk in the source.
+	
+			Returns:
+			--------
+				None
+	
+		"""
+		try:
+			throw_if( 'source_file', source_file )
+			throw_if( 'chunks', chunks )
+			throw_if( 'vectors', vectors )
+			matrix = np.ascontiguousarray( vectors, dtype='<f4' )
+			if matrix.ndim != 2 or len( matrix ) != len( chunks ):
+				raise ValueError( 'vectors must be a 2-D array with one row per chunk' )
+			dimensions = matrix.shape[ 1 ]
+			spans = offsets or [ (None, None) ] * len( chunks )
+			records = [ (source_file, i, chunks[ i ], matrix[ i ].tobytes( ), dimensions, model,
+			             spans[ i ][ 0 ], spans[ i ][ 1 ]) for i in range( len( chunks ) ) ]
+			self.sql = ''' INSERT INTO embeddings (source_file, chunk_index, chunk_text,
+					embedding, dimensions, model, start_offset, end_offset)
+					VALUES (?, ?, ?, ?, ?, ?, ?, ?) '''
+			with self.pool.write( ):
+				self.cursor.execute( 'SELECT COALESCE(MAX(id), 0) FROM embeddings' )
+				before = self.cursor.fetchone( )[ 0 ]
+				self.cursor.executemany( self.sql, records )
+				self.cursor.execute( 'SELECT id FROM embeddings WHERE id > ? ORDER BY id',
+					(before,) )
+				ids = [ row[ 0 ] for row in self.cursor.fetchall( ) ]
+				if self._vec_ready( ) and self.vec_model in (None, model):
+					self.cursor.execute( '''INSERT INTO vec_embeddings (rowid, embedding,
+						source_file) SELECT id, embedding, source_file FROM embeddings
+						WHERE id > ?''', (before,) )
+			if self.hnsw is not None and self.hnsw_model in (None, model):
+				self.hnsw.add( ids, matrix )
+			if self.quantized is not None and self.quantized_model in (None, model):
+				self.quantized.add( ids, matrix )
+			self._append_index( ids, source_file, matrix, model )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = ('insert_many( self, source_file: str, chunks: List[ str ], '
+			                    'vectors: np.ndarray, model: str=None, offsets=None ) -> None')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def migrate_embeddings( self, batch_size: int=10000 ) -> int | None:
+		"""
+	
+			Purpose:
+			--------
+			Converts an 'embeddings' table written with JSON text vectors to float32 BLOBs,
+			adding the dimensions, model and offset columns if they are missing. Rows are converted
+			in batches inside one transaction, so the migration is all-or-nothing and can be
+			re-run safely.
+	
+			Parameters:
+			--------
+			batch_size (int): Number of rows decoded per batch.
+	
+			Returns:
+			--------
+			int: Number of rows converted.
+	
+		"""
+		try:
+			converted = 0
+			with self.pool.write( ):
+				self.cursor.execute( 'PRAGMA table_info(embeddings)' )
+				existing = { row[ 1 ] for row in self.cursor.fetchall( ) }
+				if 'dimensions' not in existing:
+					self.cursor.execute( 'ALTER TABLE embeddings ADD COLUMN dimensions INTEGER' )
+				if 'model' not in existing:
+					self.cursor.execute( 'ALTER TABLE embeddings ADD COLUMN model TEXT' )
+				for column in ('start_offset', 'end_offset'):
+					if column not in existing:
+						self.cursor.execute( f'ALTER TABLE embeddings ADD COLUMN {column} INTEGER' )
+				last = 0
+				while True:
+					self.cursor.execute( '''SELECT id, embedding FROM embeddings
+						WHERE id > ? AND typeof(embedding) = 'text' ORDER BY id LIMIT ?''',
+						(last, batch_size) )
+					rows = self.cursor.fetchall( )
+					if not rows:
+						break
+					updates = [ ]
+					for id, text in rows:
+						vector = np.asarray( json.loads( text ), dtype='<f4' )
+						updates.append( (vector.tobytes( ), len( vector ), id) )
+					self.cursor.executemany( '''UPDATE embeddings SET embedding = ?,
+						dimensions = ? WHERE id = ?''', updates )
+					converted += len( updates )
+					last = rows[ -1 ][ 0 ]
+				self._create_fts( )
+				self._create_version( )
+			return converted
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = 'migrate_embeddings( self, batch_size: int=10000 ) -> int'
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def load_matrix( self, model: str=None,
+			refresh: bool=False ) -> Tuple[ np.ndarray, np.ndarray ] | None:
+		"""
+	
+			Purpose:
+			--------
+			Returns every stored embedding as one contiguous (n, d) float32 matrix plus the
+			matching row ids. The matrix is memory-mapped from a sidecar .npy snapshot next
+			to the database. Snapshots are named after the row count, highest id and a
+			version counter that a trigger bumps on every UPDATE of a vector, so any
+			change produces a new file instead of overwriting one that may still be mapped.
+	
+			Parameters:
+			--------
+			model (str): Only load vectors from this embedding model.
+			refresh (bool): Rebuild the snapshot even if it looks current.
+	
+			Returns:
+			--------
+			Tuple[np.ndarray, np.ndarray]: (ids, matrix)
+	
+		"""
+		try:
+			where, params = ('WHERE model = ?', (model,)) if model else ('', ())
+			with self.pool.read( ) as connection:
+				connection.execute( 'BEGIN' )
+				count, highest = connection.execute( f'SELECT COUNT(*), MAX(id) FROM embeddings '
+				                                     f'{where}', params ).fetchone( )
+				try:
+					version = ( connection.execute( "SELECT value FROM embeddings_meta "
+					                                "WHERE key = 'version'" ).fetchone( ) or ( 0, ) )[ 0 ]
+				except sqlite3.OperationalError:
+					version = 0
+				prefix = f'{self._snapshot_stem( model )}.{count}-{highest or 0}-{version}.'
+				found = sorted( glob.glob( glob.escape( prefix ) + '*.ids.npy' ),
+					key=os.path.getmtime )
+				if not refresh and found:
+					ids_path = found[ -1 ]
+					vectors_path = ids_path[ :-len( '.ids.npy' ) ] + '.vectors.npy'
+					if os.path.exists( vectors_path ):
+						return np.load( ids_path ), np.load( vectors_path, mmap_mode='r' )
+				vectors_path, ids_path = self._write_snapshot( connection, where, params, count,
+					f'{prefix}{time.time_ns( )}' )
+			return np.load( ids_path ), np.load( vectors_path, mmap_mode='r' )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = ('load_matrix( self, model: str=None, refresh: bool=False ) '
+			                    '-> Tuple[ np.ndarray, np.ndarray ]')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def search( self, query_vector: np.ndarray, k: int=10, source_filter: str | List[ str ]=None,
+			model: str=None ) -> List[ Dict[ str, Any ] ] | List[ List[ Dict[ str, Any ] ] ] | None:
+		"""
+	
+			Purpose:
+			--------
+			Exact cosine-similarity search over the embeddings table. The normalized matrix
+			is built once from load_matrix and kept in memory; insert_many appends to it and
+			delete drops it. A 2-D query_vector is treated as a batch of queries.
+	
+			Parameters:
+			--------
+			query_vector (np.ndarray): One query vector, or a (queries, d) matrix.
+			k (int): Number of results per query.
+			source_filter (str | List[str]): Only search chunks from these source files.
+			model (str): Only search vectors from this embedding model.
+	
+			Returns:
+			--------
+			List[Dict]: id, score, source_file, chunk_index and chunk_text for each hit,
+			best first. A list of such lists for a batch.
+	
+		"""
+		try:
+			throw_if( 'query_vector', query_vector )
+			batched = np.ndim( query_vector ) == 2
+			hits, scores = self._vector_hits( normalize( query_vector ), k, source_filter, model )
+			details = self._chunk_details( np.unique( hits ).tolist( ) )
+			results = [ [ dict( id=int( i ), score=float( s ), **details[ int( i ) ] )
+			              for i, s in zip( hit_row, score_row ) ]
+			            for hit_row, score_row in zip( hits, scores ) ]
+			return results if batched else results[ 0 ]
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = ('search( self, query_vector: np.ndarray, k: int=10, '
+			                    'source_filter=None, model: str=None ) -> List[ Dict ]')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def search_hybrid( self, query: str, query_vector: np.ndarray, k: int=10,
+			bm25_k: int=50, vector_k: int=50, rrf_k: int=60,
+			source_filter: str | List[ str ]=None, model: str=None ) -> List[ Dict[ str, Any ] ] | None:
+		"""
+	
+			Purpose:
+			--------
+			Hybrid retrieval: BM25 over the embeddings_fts index and exact vector search run
+			in parallel, and their rankings are fused with reciprocal rank fusion,
+			score = sum( 1 / (rrf_k + rank) ). Per-stage timings and candidate counts are
+			left in self.timings.
+	
+			Parameters:
+			--------
+			query (str): Query text for BM25. Words joined by punctuation, such as
+			"117-58" or "069-0548", are matched as phrases.
+			query_vector (np.ndarray): Embedding of the query.
+			k (int): Number of fused results.
+			bm25_k (int): Candidates taken from BM25.
+			vector_k (int): Candidates taken from vector search.
+			rrf_k (int): RRF damping constant.
+			source_filter (str | List[str]): Only search chunks from these source files.
+			model (str): Only search vectors from this embedding model.
+	
+			Returns:
+			--------
+			List[Dict]: Hits as in search( ) with score set to the fused score plus
+			bm25_rank and vector_rank (None when a retriever missed the chunk).
+	
+		"""
+		try:
+			throw_if( 'query', query )
+			throw_if( 'query_vector', query_vector )
+			started = time.perf_counter( )
+			with ThreadPoolExecutor( max_workers=1 ) as pool:
+				lexical = pool.submit( self._bm25_hits, query, bm25_k, source_filter )
+				vector_start = time.perf_counter( )
+				ids, _ = self._vector_hits( normalize( query_vector ), vector_k, source_filter,
+					model )
+				vector_ms = 1000 * (time.perf_counter( ) - vector_start)
+				bm25_ids, bm25_ms = lexical.result( )
+			fusion_start = time.perf_counter( )
+			vector_ids = [ int( i ) for i in ids[ 0 ] ]
+			fused, bm25_rank, vector_rank = { }, { }, { }
+			for ranking, ranks in ((bm25_ids, bm25_rank), (vector_ids, vector_rank)):
+				for rank, id in enumerate( ranking, 1 ):
+					ranks[ id ] = rank
+					fused[ id ] = fused.get( id, 0.0 ) + 1.0 / (rrf_k + rank)
+			best = sorted( fused, key=fused.get, reverse=True )[ :k ]
+			details = self._chunk_details( best )
+			results = [ dict( id=id, score=fused[ id ], bm25_rank=bm25_rank.get( id ),
+			                  vector_rank=vector_rank.get( id ), **details[ id ] )
+			            for id in best if id in details ]
+			fusion_ms = 1000 * (time.perf_counter( ) - fusion_start)
+			self.timings = { 'bm25_ms': bm25_ms, 'vector_ms': vector_ms,
+			                 'fusion_ms': fusion_ms,
+			                 'total_ms': 1000 * (time.perf_counter( ) - started),
+			                 'bm25_hits': len( bm25_ids ), 'vector_hits': len( vector_ids ),
+			                 'overlap': len( bm25_rank.keys( ) & vector_rank.keys( ) ) }
+			return results
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = ('search_hybrid( self, query: str, query_vector: np.ndarray, '
+			                    'k: int=10, ... ) -> List[ Dict ]')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def _vector_hits( self, queries: np.ndarray, k: int, source_filter: str | List[ str ]=None,
+			model: str=None ) -> Tuple[ np.ndarray, np.ndarray ]:
+		vectors, ids, sources = self._search_index( model )
+		if len( ids ) == 0:
+			empty = np.empty( (len( queries ), 0) )
+			return empty.astype( np.int64 ), empty.astype( np.float32 )
+		if queries.shape[ 1 ] != vectors.shape[ 1 ]:
+			raise ValueError( f'Query has {queries.shape[ 1 ]} dimensions, '
+			                  f'index has {vectors.shape[ 1 ]}' )
+		rows = None
+		if source_filter is not None:
+			wanted = [ source_filter ] if isinstance( source_filter, str ) else source_filter
+			codes = [ self._source_codes[ s ] for s in wanted if s in self._source_codes ]
+			rows = np.flatnonzero( np.isin( sources, codes ) )
+			vectors = vectors[ rows ]
+		found, scores = top_k( vectors, queries, k )
+		if rows is not None:
+			found = rows[ found ]
+		return ids[ found ], scores
+	
+	def _bm25_hits( self, query: str, k: int,
+			source_filter: str | List[ str ]=None ) -> Tuple[ List[ int ], float ]:
+		started = time.perf_counter( )
+		expression = fts_query( query )
+		if not expression:
+			return [ ], 0.0
+		wanted = [ source_filter ] if isinstance( source_filter, str ) else source_filter
+		clause = f"AND e.source_file IN ({', '.join( '?' for _ in wanted )})" if wanted else ''
+		sql = f'''SELECT e.id FROM embeddings_fts JOIN embeddings AS e
+			ON e.id = embeddings_fts.rowid WHERE embeddings_fts MATCH ? {clause}
+			ORDER BY bm25(embeddings_fts) LIMIT ?'''
+		with self.pool.read( ) as connection:
+			rows = connection.execute( sql, (expression,) + tuple( wanted or ( ) ) + (k,) )
+			ids = [ row[ 0 ] for row in rows.fetchall( ) ]
+		return ids, 1000 * (time.perf_counter( ) - started)
+	
+	def _create_fts( self ) -> None:
+		self.cursor.execute( "SELECT 1 FROM sqlite_master WHERE name = 'embeddings_fts'" )
+		exists = self.cursor.fetchone( ) is not None
+		self.cursor.execute( '''CREATE VIRTUAL TABLE IF NOT EXISTS embeddings_fts USING fts5(
+			chunk_text, content='embeddings', content_rowid='id' )''' )
+		self.cursor.execute( '''CREATE TRIGGER IF NOT EXISTS embeddings_fts_insert
+			AFTER INSERT ON embeddings BEGIN
+				INSERT INTO embeddings_fts (rowid, chunk_text) VALUES (new.id, new.chunk_text);
+			END''' )
+		self.cursor.execute( '''CREATE TRIGGER IF NOT EXISTS embeddings_fts_delete
+			AFTER DELETE ON embeddings BEGIN
+				INSERT INTO embeddings_fts (embeddings_fts, rowid, chunk_text)
+				VALUES ('delete', old.id, old.chunk_text);
+			END''' )
+		self.cursor.execute( '''CREATE TRIGGER IF NOT EXISTS embeddings_fts_update
+			AFTER UPDATE OF chunk_text ON embeddings BEGIN
+				INSERT INTO embeddings_fts (embeddings_fts, rowid, chunk_text)
+				VALUES ('delete', old.id, old.chunk_text);
+				INSERT INTO embeddings_fts (rowid, chunk_text) VALUES (new.id, new.chunk_text);
+			END''' )
+		if not exists:
+			self.cursor.execute( "INSERT INTO embeddings_fts (embeddings_fts) VALUES ('rebuild')" )
+	
+	def _create_version( self ) -> None:
+		self.cursor.execute( '''CREATE TABLE IF NOT EXISTS embeddings_meta
+			( key TEXT PRIMARY KEY, value INTEGER NOT NULL )''' )
+		self.cursor.execute( '''CREATE TRIGGER IF NOT EXISTS embeddings_version
+			AFTER UPDATE OF embedding, dimensions, model ON embeddings BEGIN
+				INSERT INTO embeddings_meta (key, value) VALUES ('version', 1)
+				ON CONFLICT (key) DO UPDATE SET value = value + 1;
+			END''' )
+	
+	def create_vec_index( self, dimensions: int=None, model: str=None ) -> int | None:
+		"""
+	
+			Purpose:
+			--------
+			Builds a sqlite-vec 'vec_embeddings' vec0 virtual table whose rowids are the ids
+			of the embeddings table, bulk loading every stored vector with one INSERT ...
+			SELECT inside a single transaction. Once it exists insert_many and delete keep
+			it in sync and search_vec queries it.
+	
+			Parameters:
+			--------
+			dimensions (int): Vector width; read from the embeddings table when omitted.
+			model (str): Only index vectors from this embedding model.
+	
+			Returns:
+			--------
+			int: Number of vectors indexed.
+	
+		"""
+		try:
+			self._load_vec( )
+			where, params = ('WHERE model = ?', (model,)) if model else ('', ())
+			if dimensions is None:
+				with self.pool.read( ) as connection:
+					rows = connection.execute( f'SELECT DISTINCT dimensions FROM embeddings {where}',
+						params )
+					found = [ row[ 0 ] for row in rows.fetchall( ) ]
+				if len( found ) != 1:
+					raise ValueError( f'Cannot infer a single dimension from {found}' )
+				dimensions = found[ 0 ]
+			filters = [ 'dimensions = ?' ] + ([ 'model = ?' ] if model else [ ])
+			with self.pool.write( ):
+				self.cursor.execute( 'DROP TABLE IF EXISTS vec_embeddings' )
+				self.cursor.execute( f'''CREATE VIRTUAL TABLE vec_embeddings USING vec0(
+					embedding float[{int( dimensions )}] distance_metric=cosine,
+					source_file text )''' )
+				self.cursor.execute( f'''INSERT INTO vec_embeddings (rowid, embedding, source_file)
+					SELECT id, embedding, source_file FROM embeddings
+					WHERE {' AND '.join( filters )} ORDER BY id''', (dimensions,) + params )
+				count = self.cursor.rowcount
+			self.vec_enabled = True
+			self.vec_model = model
+			return count
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = 'create_vec_index( self, dimensions: int=None, model: str=None ) -> int'
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def search_vec( self, query_vector: np.ndarray, k: int=10,
+			source_filter: str | List[ str ]=None ) -> List[ Dict[ str, Any ] ] | List[ List[ Dict[ str, Any ] ] ] | None:
+		"""
+	
+			Purpose:
+			--------
+			KNN search inside SQLite through the sqlite-vec index. Each query is a single
+			statement that runs the vec0 KNN, filters on source_file and joins the hits back
+			to the chunk text and metadata in the embeddings table. Queries run on a pooled
+			reader. Where sqlite-vec cannot be loaded the exact search( ) answers instead.
+	
+			Parameters:
+			--------
+			query_vector (np.ndarray): One query vector, or a (queries, d) matrix.
+			k (int): Number of results per query.
+			source_filter (str | List[str]): Only search chunks from these source files.
+	
+			Returns:
+			--------
+			List[Dict]: The same shape as search( ).
+	
+		"""
+		try:
+			throw_if( 'query_vector', query_vector )
+			if not self._vec_supported( ):
+				return self.search( query_vector, k, source_filter, model=self.vec_model )
+			if not self._vec_ready( ):
+				raise RuntimeError( 'No sqlite-vec index; call create_vec_index( ) first' )
+			batched = np.ndim( query_vector ) == 2
+			queries = np.array( query_vector, dtype='<f4', ndmin=2 )
+			wanted = [ source_filter ] if isinstance( source_filter, str ) else source_filter
+			clause = ''
+			if wanted:
+				clause = f"AND source_file IN ({', '.join( '?' for _ in wanted )})"
+			sql = f'''SELECT e.id, knn.distance, e.source_file, e.chunk_index, e.chunk_text,
+				e.start_offset, e.end_offset FROM ( SELECT rowid, distance FROM vec_embeddings
+				       WHERE embedding MATCH ? AND k = ? {clause} ) AS knn
+				JOIN embeddings AS e ON e.id = knn.rowid
+				ORDER BY knn.distance'''
+			results = [ ]
+			with self.pool.read( ) as connection:
+				for query in queries:
+					rows = connection.execute( sql, (query.tobytes( ), k) + tuple( wanted or ( ) ) )
+					results.append( [ { 'id': row[ 0 ], 'score': 1.0 - row[ 1 ],
+					                    'source_file': row[ 2 ], 'chunk_index': row[ 3 ],
+					                    'chunk_text': row[ 4 ], 'start_offset': row[ 5 ],
+					                    'end_offset': row[ 6 ] }
+					                  for row in rows.fetchall( ) ] )
+			return results if batched else results[ 0 ]
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = ('search_vec( self, query_vector: np.ndarray, k: int=10, '
+			                    'source_filter=None ) -> List[ Dict ]')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def compare_search( self, queries: np.ndarray, k: int=10,
+			model: str=None ) -> Dict[ str, float ] | None:
+		"""
+	
+			Purpose:
+			--------
+			Runs every query through both search( ) and search_vec( ) and reports the mean
+			latency of each and the recall@k of sqlite-vec against the NumPy results.
+	
+			Parameters:
+			--------
+			queries (np.ndarray): A (queries, d) matrix.
+			k (int): Number of results per query.
+			model (str): Embedding model passed to search( ).
+	
+			Returns:
+			--------
+			Dict: numpy_ms, vec_ms and recall.
+	
+		"""
+		try:
+			throw_if( 'queries', queries )
+			self._load_vec( )
+			queries = np.array( queries, dtype=np.float32, ndmin=2 )
+			self.search( queries[ 0 ], k, model=model )
+			numpy_time, vec_time, overlap = 0.0, 0.0, 0
+			for query in queries:
+				started = time.perf_counter( )
+				exact = { hit[ 'id' ] for hit in self.search( query, k, model=model ) }
+				numpy_time += time.perf_counter( ) - started
+				started = time.perf_counter( )
+				approx = { hit[ 'id' ] for hit in self.search_vec( query, k ) }
+				vec_time += time.perf_counter( ) - started
+				overlap += len( exact & approx ) / max( len( exact ), 1 )
+			return { 'numpy_ms': 1000 * numpy_time / len( queries ),
+			         'vec_ms': 1000 * vec_time / len( queries ),
+			         'recall': overlap / len( queries ) }
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = 'compare_search( self, queries: np.ndarray, k: int=10, model: str=None ) -> Dict'
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def attach_hnsw( self, model: str=None, path: str=None, **params ) -> HnswIndex | None:
+		"""
+	
+			Purpose:
+			--------
+			Loads the HNSW index saved at path, or builds one from the stored embeddings and
+			saves it there, and keeps it in sync with later insert_many and delete calls. A
+			saved index whose size or highest id no longer matches the table is rebuilt. The
+			index is saved again when the database is closed.
+	
+			Parameters:
+			--------
+			model (str): Only index vectors from this embedding model.
+			path (str): Index file; defaults to a sidecar next to the database.
+			params: M, ef_construction and ef passed to HnswIndex when building.
+	
+			Returns:
+			--------
+			HnswIndex: The attached index.
+	
+		"""
+		try:
+			path = path or self._snapshot_stem( model ) + '.hnsw'
+			self.hnsw = None
+			if os.path.exists( path ) and os.path.exists( path + '.json' ):
+				where, values = ('WHERE model = ?', (model,)) if model else ('', ())
+				with self.pool.read( ) as connection:
+					count, highest = connection.execute( f'SELECT COUNT(*), MAX(id) FROM embeddings '
+					                                     f'{where}', values ).fetchone( )
+				loaded = HnswIndex.load( path )
+				if len( loaded ) == count and loaded.highest == (highest or 0):
+					self.hnsw = loaded
+			if self.hnsw is None:
+				self.hnsw = HnswIndex.from_sqlite( self, model, **params )
+				self.hnsw.save( path )
+			self.hnsw_model = model
+			return self.hnsw
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = 'attach_hnsw( self, model: str=None, path: str=None, **params ) -> HnswIndex'
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def search_ann( self, query_vector: np.ndarray, k: int=10,
+			source_filter: str | List[ str ]=None ) -> List[ Dict[ str, Any ] ] | List[ List[ Dict[ str, Any ] ] ] | None:
+		"""
+	
+			Purpose:
+			--------
+			Approximate nearest-neighbour search through the attached HNSW index.
+	
+			Parameters:
+			--------
+			query_vector (np.ndarray): One query vector, or a (queries, d) matrix.
+			k (int): Number of results per query.
+			source_filter (str | List[str]): Only return chunks from these source files.
+	
+			Returns:
+			--------
+			List[Dict]: The same shape as search( ).
+	
+		"""
+		try:
+			throw_if( 'query_vector', query_vector )
+			if self.hnsw is None:
+				raise RuntimeError( 'No HNSW index; call attach_hnsw( ) first' )
+			batched = np.ndim( query_vector ) == 2
+			allowed = None
+			if source_filter is not None:
+				wanted = [ source_filter ] if isinstance( source_filter, str ) else source_filter
+				marks = ', '.join( '?' for _ in wanted )
+				with self.pool.read( ) as connection:
+					rows = connection.execute( f'SELECT id FROM embeddings WHERE source_file IN '
+					                           f'({marks})', wanted )
+					allowed = { row[ 0 ] for row in rows.fetchall( ) }
+			if allowed is not None and len( allowed ) <= cfg.ANN_EXACT_LIMIT:
+				queries = np.array( query_vector, dtype=np.float32, ndmin=2 )
+				hits, scores = self._vector_hits( normalize( queries ), min( k, len( allowed ) ),
+					source_filter, self.hnsw_model )
+			else:
+				hits, scores = self.hnsw.query( query_vector, k, allowed )
+			details = self._chunk_details( np.unique( hits ).tolist( ) )
+			results = [ [ dict( id=int( i ), score=float( s ), **details[ int( i ) ] )
+			              for i, s in zip( hit_row, score_row ) if int( i ) in details ]
+			            for hit_row, score_row in zip( hits, scores ) ]
+			return results if batched else results[ 0 ]
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = ('search_ann( self, query_vector: np.ndarray, k: int=10, '
+			                    'source_filter=None ) -> List[ Dict ]')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def attach_quantized( self, mode: str='int8', model: str=None,
+			**params ) -> QuantizedIndex | None:
+		"""
+	
+			Purpose:
+			--------
+			Builds a QuantizedIndex ('int8' or 'pq') from the stored embeddings and keeps it
+			in sync with later insert_many and delete calls. Re-ranking reads exact vectors
+			from the memory-mapped load_matrix snapshot.
+	
+			Parameters:
+			--------
+			mode (str): 'int8' or 'pq'.
+			model (str): Only index vectors from this embedding model.
+			params: subspaces, iterations, sample and seed passed to QuantizedIndex.
+	
+			Returns:
+			--------
+			QuantizedIndex: The attached index.
+	
+		"""
+		try:
+			ids, matrix = self.load_matrix( model )
+			index = QuantizedIndex( mode, **params )
+			index.train( matrix )
+			index.add( ids, matrix, exact=matrix )
+			self.quantized = index
+			self.quantized_model = model
+			return self.quantized
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = 'attach_quantized( self, mode: str, model: str=None, **params ) -> QuantizedIndex'
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def search_quantized( self, query_vector: np.ndarray, k: int=10,
+			rerank: int=None ) -> List[ Dict[ str, Any ] ] | List[ List[ Dict[ str, Any ] ] ] | None:
+		"""
+	
+			Purpose:
+			--------
+			Searches the attached QuantizedIndex and re-ranks the best `rerank` candidates
+			with exact vectors.
+	
+			Parameters:
+			--------
+			query_vector (np.ndarray): One query vector, or a (queries, d) matrix.
+			k (int): Number of results per query.
+			rerank (int): Candidates re-scored exactly; defaults to 10 * k.
+	
+			Returns:
+			--------
+			List[Dict]: The same shape as search( ).
+	
+		"""
+		try:
+			throw_if( 'query_vector', query_vector )
+			if self.quantized is None:
+				raise RuntimeError( 'No quantized index; call attach_quantized( ) first' )
+			batched = np.ndim( query_vector ) == 2
+			hits, scores = self.quantized.query( query_vector, k, rerank )
+			details = self._chunk_details( np.unique( hits ).tolist( ) )
+			results = [ [ dict( id=int( i ), score=float( s ), **details[ int( i ) ] )
+			              for i, s in zip( hit_row, score_row ) ]
+			            for hit_row, score_row in zip( hits, scores ) ]
+			return results if batched else results[ 0 ]
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = ('search_quantized( self, query_vector: np.ndarray, k: int=10, '
+			                    'rerank: int=None ) -> List[ Dict ]')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	@staticmethod
+	def _vec_supported( ) -> bool:
+		import importlib.util
+		return (hasattr( sqlite3.Connection, 'enable_load_extension' )
+		        and importlib.util.find_spec( 'sqlite_vec' ) is not None)
+	
+	def _load_vec( self ) -> None:
+		if not self._vec_supported( ):
+			raise RuntimeError( 'sqlite-vec unavailable: needs the sqlite_vec package and a Python '
+			                    'sqlite3 build with loadable extension support' )
+		self.pool.extend( _load_sqlite_vec )
+	
+	def _vec_ready( self ) -> bool:
+		if self.vec_enabled is None:
+			with self.pool.read( ) as connection:
+				found = connection.execute( "SELECT 1 FROM sqlite_master "
+				                            "WHERE name = 'vec_embeddings'" ).fetchone( )
+			self.vec_enabled = found is not None and self._vec_supported( )
+			if self.vec_enabled:
+				self._load_vec( )
+		return self.vec_enabled
+	
+	def _search_index( self, model: str=None ) -> Tuple[ np.ndarray, np.ndarray, np.ndarray ]:
+		if self._index is None or self._index_model != model:
+			ids, matrix = self.load_matrix( model )
+			where, params = ('WHERE model = ?', (model,)) if model else ('', ())
+			with self.pool.read( ) as connection:
+				rows = connection.execute( f'SELECT source_file FROM embeddings {where} ORDER BY id',
+					params ).fetchall( )
+			self._source_codes = { }
+			codes = [ self._source_codes.setdefault( row[ 0 ], len( self._source_codes ) )
+			          for row in rows ]
+			self._index = normalize( matrix ) if len( ids ) else np.empty( (0, matrix.shape[ 1 ] ),
+				dtype=np.float32 )
+			self._index_ids = np.asarray( ids, dtype=np.int64 )
+			self._index_sources = np.asarray( codes, dtype=np.int32 )
+			self._index_count = len( ids )
+			self._index_model = model
+		n = self._index_count
+		return self._index[ :n ], self._index_ids[ :n ], self._index_sources[ :n ]
+	
+	def _append_index( self, ids: List[ int ], source_file: str, vectors: np.ndarray,
+			model: str=None ) -> None:
+		if self._index is None or self._index_model not in (None, model):
+			return
+		if self._index_count and self._index.shape[ 1 ] != vectors.shape[ 1 ]:
+			self._index = None
+			return
+		needed = self._index_count + len( ids )
+		if needed > len( self._index ):
+			capacity = max( needed, 2 * len( self._index ) )
+			grown = np.empty( (capacity, vectors.shape[ 1 ]), dtype=np.float32 )
+			if self._index_count:
+				grown[ :self._index_count ] = self._index[ :self._index_count ]
+			self._index = grown
+			self._index_ids = np.resize( self._index_ids, capacity )
+			self._index_sources = np.resize( self._index_sources, capacity )
+		start, code = self._index_count, self._source_codes.setdefault( source_file,
+			len( self._source_codes ) )
+		self._index[ start:needed ] = normalize( vectors )
+		self._index_ids[ start:needed ] = ids
+		self._index_sources[ start:needed ] = code
+		self._index_count = needed
+	
+	def _chunk_details( self, ids: List[ int ] ) -> Dict[ int, Dict[ str, Any ] ]:
+		details = { }
+		with self.pool.read( ) as connection:
+			for start in range( 0, len( ids ), 500 ):
+				batch = ids[ start:start + 500 ]
+				marks = ', '.join( '?' for _ in batch )
+				rows = connection.execute( f'''SELECT id, source_file, chunk_index, chunk_text,
+					start_offset, end_offset FROM embeddings WHERE id IN ({marks})''', batch )
+				for id, source, index, text, start, end in rows.fetchall( ):
+					details[ id ] = { 'source_file': source, 'chunk_index': index,
+					                  'chunk_text': text, 'start_offset': start, 'end_offset': end }
+		return details
+	
+	def _snapshot_stem( self, model: str=None ) -> str:
+		tag = re.sub( r'[^\w.-]+', '_', model ) if model else 'all'
+		return f'{os.path.splitext( self.db_path )[ 0 ]}.{tag}'
+	
+	def _write_snapshot( self, connection: Connection, where: str, params: Tuple, count: int,
+			name: str ) -> Tuple[ str, str ]:
+		vectors_path, ids_path = name + '.vectors.npy', name + '.ids.npy'
+		rows = connection.execute( f'SELECT DISTINCT dimensions FROM embeddings {where}', params )
+		dims = [ row[ 0 ] for row in rows.fetchall( ) ]
+		if len( dims ) > 1:
+			raise ValueError( f'Embeddings have mixed dimensions {dims}; pass a model name' )
+		width = dims[ 0 ] if dims else 0
+		ids = np.empty( count, dtype=np.int64 )
+		partial = vectors_path + '.partial'
+		matrix = np.lib.format.open_memmap( partial, mode='w+', dtype='<f4',
+			shape=(count, width) )
+		rows = connection.execute( f'SELECT id, embedding FROM embeddings {where} ORDER BY id',
+			params )
+		for i, (id, blob) in enumerate( rows ):
+			ids[ i ] = id
+			matrix[ i ] = np.frombuffer( blob, dtype='<f4' )
+		matrix.flush( )
+		del matrix
+		os.replace( partial, vectors_path )
+		with open( ids_path + '.partial', 'wb' ) as file:
+			np.save( file, ids )
+		os.replace( ids_path + '.partial', ids_path )
+		stem = name.rsplit( '.', 2 )[ 0 ]
+		pattern = re.compile( re.escape( stem ) + r'\.\d+-\d+-\d+\.\d+\.(vectors|ids)\.npy$' )
+		for stale in glob.glob( glob.escape( stem ) + '.*.npy' ):
+			if pattern.match( stale ) and stale not in (vectors_path, ids_path):
+				with contextlib.suppress( OSError ):
+					os.remove( stale )
+		return vectors_path, ids_path
+	
+	@contextmanager
+	def transaction( self ) -> Iterator[ 'SQLite' ]:
+		"""
+		
+			Purpose:
+			--------
+			Collects every insert, update and delete made on this thread inside the block
+			and submits them to the writer as one unit, so they commit or roll back
+			together in a single transaction. Nested blocks join the outer one. Deletes
+			from embeddings are not collected and still run immediately.
+			
+			Returns:
+			--------
+			Iterator[SQLite]: This instance; the block waits for the commit on exit.
+			
+		"""
+		if getattr( self._batch, 'statements', None ) is not None:
+			yield self
+			return
+		self._batch.statements = [ ]
+		self._batch.future = Future( )
+		try:
+			yield self
+		except BaseException:
+			self._batch.future.cancel( )
+			raise
+		else:
+			self.writes.submit( self._batch.statements, future=self._batch.future ).result( )
+		finally:
+			self._batch.statements = None
+			self._batch.future = None
+	
+	def _insert_sql( self, table: str, columns: Tuple[ str, ... ], conflict: str=None,
+			keys: Tuple[ str, ... ]=( ) ) -> str:
+		signature = (table, columns, conflict, keys)
+		sql = self._statements.get( signature )
+		if sql is None:
+			if conflict not in ( None, 'ignore', 'replace', 'update' ):
+				raise ValueError( f"conflict must be 'ignore', 'replace' or 'update', not {conflict}" )
+			if conflict == 'update' and not keys:
+				raise ValueError( "conflict='update' requires the key columns" )
+			verb = 'INSERT OR REPLACE' if conflict == 'replace' else 'INSERT'
+			names = ', '.join( _identifier( c ) for c in columns )
+			marks = ', '.join( '?' for _ in columns )
+			sql = f'{verb} INTO {_identifier( table )} ({names}) VALUES ({marks})'
+			if conflict == 'ignore':
+				sql += ' ON CONFLICT DO NOTHING'
+			elif conflict == 'update':
+				updates = [ f'{_identifier( c )} = excluded.{_identifier( c )}'
+				            for c in columns if c not in keys ]
+				action = f"DO UPDATE SET {', '.join( updates )}" if updates else 'DO NOTHING'
+				target = ', '.join( _identifier( k ) for k in keys )
+				sql += f' ON CONFLICT ({target}) {action}'
+			self._statements[ signature ] = sql
+		return sql
+	
+	def _write( self, sql: str, params: Tuple, wait: bool=True ) -> Future:
+		statements = getattr( self._batch, 'statements', None )
+		if statements is not None:
+			statements.append( (sql, params) )
+			return self._batch.future
+		future = self.writes.submit( sql, params )
+		if wait:
+			future.result( )
+		return future
+	
+	def fetch_all( self, table: str ) -> List[ Tuple ] | None:
+		"""
+		
+			Purpose:
+			--------
+			Retrieves all rows from a df.
+	
+			Parameters:
+			--------
+			table (str): The name of the df.
+			
+			Returns:
+			--------
+			List[Tuple]: List of rows.
+			
+		"""
+		try:
+			throw_if( 'table', table )
+			self.sql = f'SELECT * FROM {table}'
+			self.writes.flush( )
+			with self.pool.read( ) as connection:
+				return connection.execute( self.sql ).fetchall( )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = 'fetch_all( self, df: str ) -> List[ Tuple ]'
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def fetch_one( self, table: str, where: str, params: Tuple[ Any, ... ] ) -> Tuple | None:
+		"""
+		
+			Purpose:
+			--------
+			Retrieves a single row matching a WHERE clause.
+	
+			Parameters:
+			--------
+			table (str): Table name.
+			where (str): WHERE clause (excluding 'WHERE').
+			params (Tuple): Parameters for the clause.
+			
+			Returns:
+			--------
+			Optional[Tuple]: The fetched row or None.
+			
+		"""
+		try:
+			throw_if( 'params', params )
+			throw_if( 'where', where )
+			throw_if( 'table', table )
+			self.table_name = table
+			self.where = where
+			self.params = params
+			self.sql = f'SELECT * FROM {self.table_name} WHERE {self.where} LIMIT 1'
+			self.writes.flush( )
+			with self.pool.read( ) as connection:
+				return connection.execute( self.sql, self.params ).fetchone( )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = (
+					'fetch_one( self, df: str, where: str, params: Tuple[ Any, ... ] ) -> '
+					'Optional[ Tuple ]')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def update( self, table: str, pairs: str, where: str, params: Tuple[ Any, ... ],
+			wait: bool=True ) -> Future | None:
+		"""
+		
+			Purpose:
+			--------
+			Updates rows in a df through the group-commit writer.
+	
+			Parameters:
+			--------
+			table (str): Table name.
+			pairs (str): SET clause with placeholders.
+			where (str): WHERE clause with placeholders.
+			params (Tuple): Parameters for both clauses.
+			wait (bool): Block until committed; False returns as soon as it is queued.
+			
+			Returns:
+			--------
+			Future: Resolves to the number of rows updated once committed.
+			
+		"""
+		try:
+			throw_if( 'pairs', pairs )
+			throw_if( 'params', params )
+			throw_if( 'where', where )
+			throw_if( 'table', table )
+			self.table_name = table
+			self.where = where
+			self.params = params
+			self.sql = f'UPDATE {self.table_name} SET {pairs} WHERE {self.where}'
+			return self._write( self.sql, params, wait )
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = (
+					'update( self, df: str, pairs: str, where: str, params: Tuple[ Any, '
+					'... ] ) -> None')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def delete( self, table: str, where: str, params: Tuple[ Any, ... ],
+			wait: bool=True ) -> Future | None:
+		"""
+		
+			Purpose:
+			--------
+			Deletes row matching the given WHERE clause. Deletes from other tables go
+			through the group-commit writer; deletes from embeddings always run
+			synchronously because the vector indexes must be updated with the removed ids.
+	
+			Parameters:
+			--------
+			table (str): Table name.
+			where (str): WHERE clause (excluding 'WHERE').
+			params (Tuple): Parameters for clause.
+			wait (bool): Block until committed; False returns as soon as it is queued.
+			
+			Returns:
+			--------
+			Future: Resolves to the number of rows deleted once committed.
+				
+		"""
+		try:
+			throw_if( 'where', where )
+			throw_if( 'table', table )
+			throw_if( 'params', params )
+			self.table_name = table
+			self.where = where
+			self.params = params
+			self.sql = f"DELETE FROM {self.table_name} WHERE {self.where}"
+			if self.table_name != 'embeddings':
+				return self._write( self.sql, self.params, wait )
+			self.writes.flush( )
+			removed = [ ]
+			with self.pool.write( ) as connection:
+				if self.hnsw is not None or self.quantized is not None:
+					rows = connection.execute( f'SELECT id FROM embeddings WHERE {self.where}',
+						self.params )
+					removed = [ row[ 0 ] for row in rows.fetchall( ) ]
+				count = connection.execute( self.sql, self.params ).rowcount
+				if self._vec_ready( ):
+					connection.execute( '''DELETE FROM vec_embeddings
+						WHERE rowid NOT IN (SELECT id FROM embeddings)''' )
+			self._index = None
+			if removed and self.hnsw is not None:
+				self.hnsw.delete( removed )
+			if removed and self.quantized is not None:
+				self.quantized.delete( removed )
+			future = Future( )
+			future.set_result( count )
+			return future
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = 'delete( self, df: str, where: str, params: Tuple[ Any] )->None'
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def load_datamodels( self, folder: str=None, force: bool=False ) -> Dict[ str, int | str ] | None:
+		"""
+		
+			Purpose:
+			--------
+			Runs every INSERT datamodel script in the folder as one bulk operation: all
+			scripts execute on the writer inside a single transaction with one commit,
+			each under its own savepoint, so a script that SQLite cannot run (for
+			example Access-only PARAMETERS queries or missing source tables) is rolled
+			back and reported without losing the others. Each script is split into
+			statements with sqlite3.complete_statement; an Access PARAMETERS header is
+			dropped and ALike is read as LIKE. The bundled scripts are Access queries (Nz,
+			Switch, DLookUp, linked .accdb tables), so on SQLite most of them fail and are
+			only reported. The scripts are INSERT ... SELECT migrations that duplicate rows
+			when replayed, so each one that succeeds is recorded with its checksum in the
+			datamodel_scripts table and skipped on later calls until its text changes.
+	
+			Parameters:
+			--------
+			folder (str): Directory of .sql scripts, cfg.INSERT_MODELS_DIR by default.
+			force (bool): Re-run scripts that were already applied.
+			
+			Returns:
+			--------
+			Dict[str, int | str]: Rows inserted per script, 'applied' for a script skipped
+			because it already ran, or the error message.
+			
+		"""
+		try:
+			folder = Path( folder or cfg.INSERT_MODELS_DIR )
+			self.writes.flush( )
+			results = { }
+			record = self._insert_sql( 'datamodel_scripts',
+				('name', 'checksum', 'rows', 'applied'), 'replace' )
+			with self.pool.write( ) as connection:
+				if not connection.in_transaction:
+					connection.execute( 'BEGIN' )
+				connection.execute( '''CREATE TABLE IF NOT EXISTS datamodel_scripts
+					(name TEXT PRIMARY KEY, checksum TEXT NOT NULL, rows INTEGER, applied TEXT)''' )
+				applied = dict( connection.execute( 'SELECT name, checksum FROM datamodel_scripts' ) )
+				for script in sorted( folder.glob( '*.sql' ) ):
+					sql = script.read_text( encoding='utf-8', errors='replace' ).strip( )
+					checksum = hashlib.sha256( sql.encode( 'utf-8' ) ).hexdigest( )
+					if not force and applied.get( script.stem ) == checksum:
+						results[ script.stem ] = 'applied'
+						continue
+					connection.execute( 'SAVEPOINT script' )
+					try:
+						before = connection.total_changes
+						for statement in _sql_statements( sql ):
+							connection.execute( statement )
+						results[ script.stem ] = connection.total_changes - before
+						connection.execute( record, (script.stem, checksum, results[ script.stem ],
+							datetime.datetime.now( ).isoformat( timespec='seconds' )) )
+					except sqlite3.Error as e:
+						connection.execute( 'ROLLBACK TO script' )
+						results[ script.stem ] = str( e )
+					connection.execute( 'RELEASE script' )
+			return results
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'data'
+			exception.cause = 'SQLite'
+			exception.method = ('load_datamodels( self, folder: str=None, force: bool=False ) '
+			                    '-> Dict[ str, int ]')
+			error = ErrorDialog( exception )
+			error.show( )
+	
+	def import_excel( self, path: str, chunk_size: int=5000, sample_rows: int=1000,
+			processes: int=None ) -> Dict[ str, int ] | None:
+		"""
+		
+			Purpose:
+			--------
+			Streams every worksheet of an Excel workbook into a df of the same name,
+			replacing any existing one. Sheets are read in parallel with openpyxl in
+			read-only mode into per-sheet staging databases, which are then copied into
+			the main database in chunk_size batches inside one transaction: either every
+			sheet is replaced or, on error, none is. Peak memory depends on chunk_size
+			rather than on the workbook size. All-blank rows between data rows are kept
+			as NULL rows, as pandas does; trailing blank rows are dropped.
+		
+			Parameters:
+			--------
+			path (str): Path to the Excel workbook.
+			chunk_size (int): Rows per executemany batch.
+			sample_rows (int): Rows used to infer column types.
+			processes (int): Worker processes, one sheet each; defaults to the CPU count.
+			
+			Returns:
+			--------
+			Dict[str, int]: Rows imported per sheet.
+			
+		"""
+		try:
+			throw_if( 'path', path )
+			self.file_path = path
+			self.file_name = os.path.basename( self.file_path )
+			book = openpyxl.load_workbook( self.file_path, read_only=True )
+			sheets = book.sheetnames
+			book.close( )
+			workers = min( len( sheets ), processes or os.cpu_count( ) or 1 )
+			with tempfile.TemporaryDirectory( ) as folder:
+				jobs = [ (self.file_path, sheet, os.path.join( folder, f'{i}.db' ), chunk_size,
+				          sample_rows) for i, sheet in enumerate( sheets ) ]
+				if workers > 1:
+					with ProcessPoolExecutor( max_workers=workers ) as executor:
+						staged = list( executor.map( _stage_sheet, *zip( *jobs ) ) )
+				else:
+					staged = [ _stage_sheet( *job ) for job in jobs ]
+				self.writes.flush( )
+				imported = { }
+				with self.pool.write( ) as writer:
+					if not writer.in_transaction:
+						writer.execute( 'BEGIN' )
+					for job, (sheet, create, count) in zip( jobs, staged ):
+						if not create:
+							continue
+						table = _identifier( sheet )
+						writer.execute( f'DROP TABLE IF EXISTS main.{table}' )
+						writer.execute( create )
+						source = sqlite3.connect( job[ 2 ] )
+						try:
+							rows = source.execute( f'SELECT * FROM {table}' )
+							marks = ', '.join( '?' for _ in rows.description )
+							insert = f'INSERT INTO main.{table} VALUES ({marks})'
+							while chunk := rows.fetchmany( chunk_size ):
+								writer.executemany( insert, chunk )
+						finally:
+							source.close( )
+						imported[ sheet ] = count
+			return imported
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'data'
 			exception.cause = 'SQLite'
-			exception.method = ('insert( self, df: str, columns: List[ str ], '
-			                    'target_values: Tuple[ Any, ... ] ) -> None')
+			exception.method = 'import_excel( self, path: str ) -> Dict[ str, int ]'
 			error = ErrorDialog( exception )
 			error.show( )
-
-	def insert_many( self, source_file: str, chunks: List[ str ], vectors: np.ndarray ) -> None:
+	
+	def close( self ) -> None:
 		"""
 	
 			Purpose:
 			--------
-			Batch inserts multiple chunks and their embeddings into the database.
-	
-			Parameters:
-			--------
-			source_file (str): Name or path of the source document.
-			chunks (List[str]): List of cleaned text chunks.
-			vectors (np.ndarray): Matrix of embedding vectors.
-	
-			Returns:
-			--------
-				None
+			Closes the database connection.
 	
 		"""
 		try:
-			records = [ (source_file, i, chunks[ i ], json.dumps( vectors[ i ].tolist( ) ) )
-			            for i in range( len( chunks ) ) ]
-			
-			self.sql = f''' INSERT INTO {self.table_name} ({self.file_name}, chunk_index,
-					chunk_text, embedding) VALUES (?, ?, ?, ?) '''
-			
-			self.cursor.executemany( self.sql, records )
-			self.connection.commit( )
+			if self.writes is not None:
+				self.writes.close( )
+			if self.hnsw is not None and self.hnsw.path:
+				self.hnsw.save( )
+			if self.pool is not None:
+				self.pool.close( )
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'data'
 			exception.cause = 'SQLite'
-			exception.method = 'insert_many'
+			exception.method = 'close( self ) -> None'
 			error = ErrorDialog( exception )
 			error.show( )
+
+class ConnectionPool( ):
+	"""
 	
-	def fetch_all( self, table: str ) -> List[ Tuple ] | None:
+		Purpose:
+		--------
+		Thread-safe access to one SQLite database: reads borrow one of at most `readers`
+		read-only connections, which are returned to the pool when the block ends, and
+		all writes go through a single shared writer connection guarded by a lock. Every
+		connection runs in WAL mode, so readers never block the writer or each other,
+		with synchronous=NORMAL, a memory map, a larger page cache and a busy timeout
+		instead of immediate 'database is locked' errors.
+		
+		Methods:
+			- read: Context manager lending a read-only connection from the pool.
+			- write: Context manager yielding the writer inside a committed transaction.
+			- extend: Runs a loader, such as a SQLite extension, on every connection.
+			- pragmas: Current pragma values on the writer.
+			- close: Closes the writer and every reader.
+		
+	"""
+	db_path: Optional[ str ]
+	mmap_size: Optional[ int ]
+	cache_kb: Optional[ int ]
+	busy_timeout: Optional[ int ]
+	readers: Optional[ int ]
+	writer: Optional[ Connection ]
+	lock: Optional[ threading.RLock ]
+	
+	def __init__( self, db_path: str=None, mmap_size: int=None, cache_kb: int=None,
+			busy_timeout: int=None, readers: int=None ):
+		self.db_path = str( db_path or cfg.DB_PATH )
+		self.mmap_size = cfg.DB_MMAP_SIZE if mmap_size is None else mmap_size
+		self.cache_kb = cfg.DB_CACHE_KB if cache_kb is None else cache_kb
+		self.busy_timeout = cfg.DB_BUSY_TIMEOUT if busy_timeout is None else busy_timeout
+		self.readers = cfg.DB_READERS if readers is None else readers
+		self.lock = threading.RLock( )
+		self._slots = threading.BoundedSemaphore( self.readers )
+		self._idle = queue.LifoQueue( )
+		self._readers = [ ]
+		self._readers_lock = threading.Lock( )
+		self._loaders = [ ]
+		self._loaded = { }
+		self.writer = self._open( )
+		self.writer.execute( 'PRAGMA journal_mode=WAL' )
+	
+	def __dir__( self ):
+		return [ 'db_path',
+		         'mmap_size',
+		         'cache_kb',
+		         'busy_timeout',
+		         'readers',
+		         'writer',
+		         'lock',
+		         'read',
+		         'write',
+		         'extend',
+		         'pragmas',
+		         'close' ]
+	
+	@contextmanager
+	def read( self ) -> Iterator[ Connection ]:
 		"""
 		
 			Purpose:
 			--------
-			Retrieves all rows from a df.
-	
-			Parameters:
-			--------
-			table (str): The name of the df.
+			Lends an idle read-only connection for the duration of the block, opening a new
+			one only while fewer than `readers` exist, and waits for one to be returned
+			otherwise. Any read transaction left open is rolled back on return.
 			
-			Returns:
+		"""
+		self._slots.acquire( )
+		try:
+			try:
+				connection = self._idle.get_nowait( )
+			except queue.Empty:
+				connection = self._open( readonly=True )
+				with self._readers_lock:
+					self._readers.append( connection )
+			self._prepare( connection )
+			try:
+				yield connection
+			finally:
+				if connection.in_transaction:
+					connection.rollback( )
+				self._idle.put( connection )
+		finally:
+			self._slots.release( )
+	
+	@contextmanager
+	def write( self ) -> Iterator[ Connection ]:
+		"""
+		
+			Purpose:
 			--------
-			List[Tuple]: List of rows.
+			Holds the writer lock for the duration of the block and commits on success
+			or rolls back on error.
 			
 		"""
-		try:
-			throw_if( 'table', table )
-			self.sql = f'SELECT * FROM {table}'
-			self.cursor.execute( self.sql )
-			return self.cursor.fetchall( )
-		except Exception as e:
-			exception = Error( e )
-			exception.module = 'data'
-			exception.cause = 'SQLite'
-			exception.method = 'fetch_all( self, df: str ) -> List[ Tuple ]'
-			error = ErrorDialog( exception )
-			error.show( )
+		with self.lock:
+			try:
+				yield self.writer
+				self.writer.commit( )
+			except BaseException:
+				self.writer.rollback( )
+				raise
 	
-	def fetch_one( self, table: str, where: str, params: Tuple[ Any, ... ] ) -> Tuple | None:
+	def extend( self, loader: Callable[ [ Connection ], None ] ) -> None:
 		"""
 		
 			Purpose:
 			--------
-			Retrieves a single row matching a WHERE clause.
+			Registers a loader, such as a SQLite extension, that runs once on the writer now
+			and on every reader before it is next lent out.
+			
+		"""
+		with self._readers_lock:
+			if loader in self._loaders:
+				return
+			self._loaders.append( loader )
+		with self.lock:
+			self._prepare( self.writer )
 	
-			Parameters:
+	def _prepare( self, connection: Connection ) -> None:
+		with self._readers_lock:
+			done = self._loaded.get( connection, 0 )
+			pending = self._loaders[ done: ]
+		for loader in pending:
+			loader( connection )
+		if pending:
+			with self._readers_lock:
+				self._loaded[ connection ] = done + len( pending )
+	
+	def pragmas( self ) -> Dict[ str, Any ]:
+		names = ( 'journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'busy_timeout' )
+		with self.lock:
+			return { name: self.writer.execute( f'PRAGMA {name}' ).fetchone( )[ 0 ]
+			         for name in names }
+	
+	def close( self ) -> None:
+		with self._readers_lock:
+			readers, self._readers = self._readers, [ ]
+			self._idle = queue.LifoQueue( )
+			self._loaded = { }
+		for connection in readers:
+			connection.close( )
+		with self.lock:
+			self.writer.close( )
+	
+	def _open( self, readonly: bool=False ) -> Connection:
+		connection = sqlite3.connect( self.db_path, timeout=self.busy_timeout / 1000,
+			check_same_thread=False )
+		connection.execute( 'PRAGMA synchronous=NORMAL' )
+		connection.execute( f'PRAGMA mmap_size={int( self.mmap_size )}' )
+		connection.execute( f'PRAGMA cache_size={-int( self.cache_kb )}' )
+		connection.execute( f'PRAGMA busy_timeout={int( self.busy_timeout )}' )
+		if readonly:
+			connection.execute( 'PRAGMA query_only=ON' )
+		return connection
+
+class WriteQueue( ):
+	"""
+	
+		Purpose:
+		--------
+		Single-writer group commit for a ConnectionPool. Any thread can submit write
+		statements and get a Future back; a background thread drains the queue and
+		commits everything that arrived within `delay` seconds, up to `batch_size`
+		units, as one transaction. Each unit runs inside its own savepoint, so a failing
+		statement rolls back and fails only its own Future. Anything still queued is
+		committed at interpreter exit.
+		
+		Methods:
+			- submit: Queues one statement, or a list of statements applied atomically.
+			- flush: Blocks until everything submitted so far is committed.
+			- close: Drains the queue and stops the writer thread.
+		
+	"""
+	pool: Optional[ ConnectionPool ]
+	batch_size: Optional[ int ]
+	delay: Optional[ float ]
+	commits: Optional[ int ]
+	
+	def __init__( self, pool: ConnectionPool, batch_size: int=1000, delay: float=0.005 ):
+		self.pool = pool
+		self.batch_size = batch_size
+		self.delay = delay
+		self.commits = 0
+		self._queue = queue.SimpleQueue( )
+		self._pending = 0
+		self._lock = threading.Lock( )
+		self._thread = None
+	
+	def __dir__( self ):
+		return [ 'pool',
+		         'batch_size',
+		         'delay',
+		         'commits',
+		         'submit',
+		         'flush',
+		         'close' ]
+	
+	def submit( self, sql: str | List[ Tuple[ str, Tuple ] ], params: Tuple=( ),
+			future: Future=None ) -> Future:
+		"""
+		
+			Purpose:
 			--------
-			table (str): Table name.
-			where (str): WHERE clause (excluding 'WHERE').
-			params (Tuple): Parameters for the clause.
+			Queues a write. `sql` is either one statement with its params or a list of
+			(sql, params) pairs that commit or fail together.
 			
 			Returns:
 			--------
-			Optional[Tuple]: The fetched row or None.
+			Future: Resolves to the total rowcount once the batch is committed.
 			
 		"""
+		statements = sql if isinstance( sql, list ) else [ (sql, params) ]
+		future = future or Future( )
+		with self._lock:
+			if self._thread is None:
+				self._thread = threading.Thread( target=self._run, name='sqlite-writer',
+					daemon=True )
+				self._thread.start( )
+				atexit.register( self.close )
+			self._pending += 1
+			self._queue.put( (statements, future) )
+		return future
+	
+	def flush( self, timeout: float=None ) -> None:
+		if self._pending:
+			self.submit( [ ] ).result( timeout )
+	
+	def close( self ) -> None:
+		with self._lock:
+			thread, self._thread = self._thread, None
+			if thread is not None:
+				self._queue.put( None )
+		if thread is not None:
+			atexit.unregister( self.close )
+			thread.join( )
+	
+	def _run( self ) -> None:
+		stopping = False
+		while not stopping:
+			unit = self._queue.get( )
+			if unit is None:
+				break
+			batch = [ unit ]
+			deadline = time.monotonic( ) + self.delay
+			while len( batch ) < self.batch_size:
+				try:
+					unit = self._queue.get( timeout=max( deadline - time.monotonic( ), 0 ) )
+				except queue.Empty:
+					break
+				if unit is None:
+					stopping = True
+					break
+				batch.append( unit )
+			self._commit( batch )
+	
+	def _commit( self, batch: List[ Tuple[ List[ Tuple[ str, Tuple ] ], Future ] ] ) -> None:
+		live = [ (statements, future) for statements, future in batch
+		         if future.set_running_or_notify_cancel( ) ]
+		outcomes = [ ]
 		try:
-			throw_if( 'params', params )
-			throw_if( 'where', where )
-			throw_if( 'table', table )
-			self.table_name = table
-			self.where = where
-			self.sql = f'SELECT * FROM {self.table_name} WHERE {self.where} LIMIT 1'
-			self.cursor.execute( self.sql, self.params )
-			return self.cursor.fetchone( )
+			with self.pool.write( ) as connection:
+				if not connection.in_transaction:
+					connection.execute( 'BEGIN' )
+				for statements, future in live:
+					connection.execute( 'SAVEPOINT unit' )
+					try:
+						count = sum( connection.execute( sql, params ).rowcount
+						             for sql, params in statements )
+						connection.execute( 'RELEASE unit' )
+						outcomes.append( (future, count, None) )
+					except Exception as e:
+						connection.execute( 'ROLLBACK TO unit' )
+						connection.execute( 'RELEASE unit' )
+						outcomes.append( (future, None, e) )
+			self.commits += 1
 		except Exception as e:
-			exception = Error( e )
-			exception.module = 'data'
-			exception.cause = 'SQLite'
-			exception.method = (
-					'fetch_one( self, df: str, where: str, params: Tuple[ Any, ... ] ) -> '
-					'Optional[ Tuple ]')
-			error = ErrorDialog( exception )
-			error.show( )
+			outcomes = [ (future, None, e) for _, future in live ]
+		for future, count, error in outcomes:
+			if error is None:
+				future.set_result( count )
+			else:
+				future.set_exception( error )
+		with self._lock:
+			self._pending -= len( batch )
+
+class HnswIndex( ):
+	"""
+	
+		Purpose:
+		--------
+		Persistent HNSW approximate nearest-neighbour index over the embeddings table,
+		backed by hnswlib. Labels are embeddings.id values, so hits join straight back to
+		the chunk rows. M and ef_construction fix graph quality at build time; ef trades
+		recall for latency at query time and can be changed at any point.
+	
+		Methods:
+			- add: Inserts or replaces vectors, growing the index as needed.
+			- delete: Marks ids as deleted; their slots are reused by later inserts.
+			- query: Returns the k nearest ids and cosine similarities.
+			- save / load: Persist the graph and its parameters next to the database.
+			- from_sqlite: Builds an index from SQLite.load_matrix.
+		
+	"""
+	dimensions: Optional[ int ]
+	space: Optional[ str ]
+	M: Optional[ int ]
+	ef_construction: Optional[ int ]
+	capacity: Optional[ int ]
+	deleted: Optional[ int ]
+	highest: Optional[ int ]
+	path: Optional[ str ]
+	
+	def __init__( self, dimensions: int, space: str='cosine', M: int=16,
+			ef_construction: int=200, ef: int=64, capacity: int=10000, path: str=None ):
+		import hnswlib
+		self.dimensions = dimensions
+		self.space = space
+		self.M = M
+		self.ef_construction = ef_construction
+		self.capacity = capacity
+		self.path = path
+		self.deleted = 0
+		self.highest = 0
+		self.index = hnswlib.Index( space=space, dim=dimensions )
+		self.index.init_index( max_elements=capacity, M=M, ef_construction=ef_construction,
+			allow_replace_deleted=True )
+		self.index.set_ef( ef )
+	
+	@property
+	def ef( self ) -> int:
+		return self.index.ef
+	
+	@ef.setter
+	def ef( self, value: int ) -> None:
+		self.index.set_ef( value )
+	
+	def __len__( self ) -> int:
+		return self.index.get_current_count( ) - self.deleted
+	
+	def add( self, ids: List[ int ] | np.ndarray, vectors: np.ndarray ) -> None:
+		vectors = np.asarray( vectors, dtype=np.float32 )
+		before = self.index.get_current_count( )
+		needed = before + len( vectors )
+		if needed > self.capacity:
+			self.capacity = max( needed, 2 * self.capacity )
+			self.index.resize_index( self.capacity )
+		labels = np.asarray( ids, dtype=np.int64 )
+		self.index.add_items( vectors, labels, replace_deleted=True )
+		reused = len( vectors ) - (self.index.get_current_count( ) - before)
+		self.deleted = max( 0, self.deleted - reused )
+		if len( labels ):
+			self.highest = max( self.highest, int( labels.max( ) ) )
+	
+	def delete( self, ids: List[ int ] ) -> None:
+		for id in ids:
+			try:
+				self.index.mark_deleted( int( id ) )
+				self.deleted += 1
+			except RuntimeError:
+				pass
+	
+	def query( self, vectors: np.ndarray, k: int=10,
+			allowed: set=None ) -> Tuple[ np.ndarray, np.ndarray ]:
+		vectors = np.array( vectors, dtype=np.float32, ndmin=2 )
+		k = min( k, len( self ), len( allowed ) if allowed is not None else k )
+		if k == 0:
+			empty = np.empty( (len( vectors ), 0) )
+			return empty.astype( np.int64 ), empty.astype( np.float32 )
+		check = (lambda label: label in allowed) if allowed is not None else None
+		labels, distances = self.index.knn_query( vectors, k=k, filter=check )
+		return labels.astype( np.int64 ), 1.0 - distances
+	
+	def save( self, path: str=None ) -> None:
+		self.path = path or self.path
+		throw_if( 'path', self.path )
+		partial = self.path + '.partial'
+		self.index.save_index( partial )
+		os.replace( partial, self.path )
+		with open( self.path + '.json', 'w', encoding='utf-8' ) as file:
+			json.dump( { 'dimensions': self.dimensions, 'space': self.space, 'M': self.M,
+			             'ef_construction': self.ef_construction, 'ef': self.ef,
+			             'capacity': self.capacity, 'deleted': self.deleted,
+			             'highest': self.highest }, file )
+	
+	@classmethod
+	def load( cls, path: str ) -> 'HnswIndex':
+		with open( path + '.json', encoding='utf-8' ) as file:
+			meta = json.load( file )
+		import hnswlib
+		store = cls.__new__( cls )
+		store.dimensions = meta[ 'dimensions' ]
+		store.space = meta[ 'space' ]
+		store.M = meta[ 'M' ]
+		store.ef_construction = meta[ 'ef_construction' ]
+		store.capacity = meta[ 'capacity' ]
+		store.path = path
+		store.deleted = meta.get( 'deleted', 0 )
+		store.highest = meta.get( 'highest' )
+		store.index = hnswlib.Index( space=store.space, dim=store.dimensions )
+		store.index.load_index( path, max_elements=store.capacity, allow_replace_deleted=True )
+		store.index.set_ef( meta[ 'ef' ] )
+		return store
+	
+	@classmethod
+	def from_sqlite( cls, db: 'SQLite', model: str=None, batch_size: int=50000,
+			**params ) -> 'HnswIndex':
+		ids, matrix = db.load_matrix( model )
+		store = cls( matrix.shape[ 1 ], capacity=max( len( ids ), 1 ), **params )
+		for start in range( 0, len( ids ), batch_size ):
+			store.add( ids[ start:start + batch_size ], matrix[ start:start + batch_size ] )
+		return store
+
+class QuantizedIndex( ):
+	"""
+	
+		Purpose:
+		--------
+		Compressed in-memory copy of the embedding matrix for search. mode='int8' stores
+		each dimension as a signed byte with a per-dimension scale (4x smaller); mode='pq'
+		splits vectors into `subspaces` slices and stores the nearest of 256 k-means
+		centroids for each (d * 4 / subspaces times smaller). Candidates found on the
+		compressed codes are re-ranked against the exact float32 vectors, which stay on
+		disk in the memory-mapped snapshot from SQLite.load_matrix.
+	
+		Methods:
+			- train: Fits int8 scales or PQ codebooks on a sample of vectors.
+			- add: Encodes and appends vectors.
+			- delete: Hides ids from later queries.
+			- query: Approximate scoring followed by exact re-ranking.
+			- memory: Bytes held in memory versus a float32 matrix.
+		
+	"""
+	mode: Optional[ str ]
+	subspaces: Optional[ int ]
+	dimensions: Optional[ int ]
+	ids: Optional[ np.ndarray ]
+	codes: Optional[ np.ndarray ]
+	exact: Optional[ np.ndarray ]
+	
+	def __init__( self, mode: str='int8', subspaces: int=8, iterations: int=20,
+			sample: int=50000, seed: int=0 ):
+		if mode not in ('int8', 'pq'):
+			raise ValueError( f'Unknown quantization mode "{mode}"' )
+		self.mode = mode
+		self.subspaces = subspaces
+		self.iterations = iterations
+		self.sample = sample
+		self.seed = seed
+		self.dimensions = None
+		self.scale = None
+		self.codebooks = None
+		self.ids = np.empty( 0, dtype=np.int64 )
+		self.codes = None
+		self.alive = np.empty( 0, dtype=bool )
+		self.exact = None
+		self.pending = [ ]
+		self._extra = None
+	
+	def train( self, vectors: np.ndarray ) -> None:
+		if len( vectors ) == 0:
+			raise ValueError( 'Cannot train a quantized index without any vectors' )
+		rng = np.random.default_rng( self.seed )
+		rows = rng.choice( len( vectors ), min( self.sample, len( vectors ) ), replace=False )
+		sample = normalize( vectors[ np.sort( rows ) ] )
+		self.dimensions = sample.shape[ 1 ]
+		if self.mode == 'int8':
+			peak = np.abs( sample ).max( axis=0 )
+			self.scale = np.where( peak > 0, peak / 127.0, 1.0 ).astype( np.float32 )
+			self.codes = np.empty( (0, self.dimensions), dtype=np.int8 )
+			return
+		if self.dimensions % self.subspaces:
+			raise ValueError( f'{self.dimensions} dimensions do not split into '
+			                  f'{self.subspaces} subspaces' )
+		width = self.dimensions // self.subspaces
+		centroids = min( 256, len( sample ) )
+		self.codebooks = np.empty( (self.subspaces, centroids, width), dtype=np.float32 )
+		for j in range( self.subspaces ):
+			block = sample[ :, j * width:(j + 1) * width ]
+			means = block[ rng.choice( len( block ), centroids, replace=False ) ].copy( )
+			for _ in range( self.iterations ):
+				nearest = self._nearest( block, means )
+				sums = np.zeros_like( means )
+				np.add.at( sums, nearest, block )
+				counts = np.bincount( nearest, minlength=centroids )[ :, None ]
+				means = np.where( counts > 0, sums / np.maximum( counts, 1 ), means )
+			self.codebooks[ j ] = means
+		self.codes = np.empty( (0, self.subspaces), dtype=np.uint8 )
+	
+	def encode( self, vectors: np.ndarray ) -> np.ndarray:
+		vectors = normalize( vectors )
+		if self.mode == 'int8':
+			return np.clip( np.rint( vectors / self.scale ), -127, 127 ).astype( np.int8 )
+		width = self.dimensions // self.subspaces
+		codes = np.empty( (len( vectors ), self.subspaces), dtype=np.uint8 )
+		for j in range( self.subspaces ):
+			codes[ :, j ] = self._nearest( vectors[ :, j * width:(j + 1) * width ],
+				self.codebooks[ j ] )
+		return codes
+	
+	def add( self, ids: List[ int ] | np.ndarray, vectors: np.ndarray,
+			exact: np.ndarray=None ) -> None:
+		"""
+		
+			Appends vectors. When `exact` is given it replaces the on-disk matrix used for
+			re-ranking and must hold every row added so far in order; otherwise the new
+			float32 rows are kept in memory until the next rebuild.
+			
+		"""
+		encoded = [ self.codes ]
+		for start in range( 0, len( vectors ), 65536 ):
+			chunk = np.asarray( vectors[ start:start + 65536 ], dtype=np.float32 )
+			encoded.append( self.encode( chunk ) )
+			if exact is None:
+				self.pending.append( chunk )
+		self.codes = np.concatenate( encoded )
+		self.ids = np.concatenate( [ self.ids, np.asarray( ids, dtype=np.int64 ) ] )
+		self.alive = np.concatenate( [ self.alive, np.ones( len( ids ), dtype=bool ) ] )
+		if exact is not None:
+			self.exact = exact
+			self.pending = [ ]
+		self._extra = None
+	
+	def delete( self, ids: List[ int ] ) -> None:
+		self.alive[ np.isin( self.ids, ids ) ] = False
+	
+	def query( self, vectors: np.ndarray, k: int=10,
+			rerank: int=None ) -> Tuple[ np.ndarray, np.ndarray ]:
+		queries = normalize( vectors )
+		rerank = max( k, rerank or 10 * k )
+		found, scored = [ ], [ ]
+		for query in queries:
+			approx = self._approximate( query )
+			approx[ ~self.alive ] = -np.inf
+			shortlist = min( rerank, int( self.alive.sum( ) ) )
+			if shortlist == 0:
+				found.append( np.empty( 0, dtype=np.int64 ) )
+				scored.append( np.empty( 0, dtype=np.float32 ) )
+				continue
+			rows = np.sort( np.argpartition( -approx, shortlist - 1 )[ :shortlist ] )
+			scores = normalize( self._exact_rows( rows ) ) @ query
+			order = np.argsort( -scores )[ :k ]
+			found.append( self.ids[ rows[ order ] ] )
+			scored.append( scores[ order ] )
+		return np.array( found ), np.array( scored )
+	
+	def memory( self ) -> Dict[ str, Any ]:
+		held = self.codes.nbytes + self.ids.nbytes + self.alive.nbytes
+		held += self.scale.nbytes if self.scale is not None else self.codebooks.nbytes
+		full = len( self.ids ) * self.dimensions * 4
+		return { 'mode': self.mode, 'count': len( self.ids ), 'bytes': held,
+		         'float32_bytes': full, 'ratio': full / max( held, 1 ) }
+	
+	def _approximate( self, query: np.ndarray ) -> np.ndarray:
+		if len( self.codes ) == 0:
+			return np.empty( 0, dtype=np.float32 )
+		if self.mode == 'int8':
+			weights = query * self.scale
+			return np.concatenate( [ self.codes[ s:s + 65536 ].astype( np.float32 ) @ weights
+			                         for s in range( 0, len( self.codes ), 65536 ) ] )
+		width = self.dimensions // self.subspaces
+		table = np.einsum( 'jcw,jw->jc', self.codebooks, query.reshape( self.subspaces, width ) )
+		return table[ np.arange( self.subspaces ), self.codes ].sum( axis=1 )
+	
+	def _exact_rows( self, rows: np.ndarray ) -> np.ndarray:
+		stored = len( self.exact ) if self.exact is not None else 0
+		parts = [ np.asarray( self.exact[ rows[ rows < stored ] ], dtype=np.float32 ) ] if stored else [ ]
+		if self.pending:
+			if self._extra is None:
+				self._extra = np.vstack( self.pending )
+			parts.append( self._extra[ rows[ rows >= stored ] - stored ] )
+		return np.vstack( parts )
+	
+	@staticmethod
+	def _nearest( block: np.ndarray, means: np.ndarray ) -> np.ndarray:
+		distances = (means * means).sum( axis=1 ) - 2.0 * block @ means.T
+		return distances.argmin( axis=1 )
+
+class TokenChunker( ):
+	"""
+	
+		Purpose:
+		--------
+		Splits documents into windows of `size` tokens that overlap by `overlap` tokens.
+		Each document is encoded once (several at a time with encode_ordinary_batch) and
+		token positions are mapped back to character offsets with a per-vocabulary byte
+		length table, so no per-token Python work is needed. A window's end is pulled back
+		to the last paragraph break, or failing that the last sentence end, found within
+		the final `snap` fraction of the window.
+	
+		Methods:
+			- chunk: Windows for one text as { text, start, end, tokens } dicts.
+			- chunk_many: The same for a list of texts, encoded as one batch.
+		
+	"""
+	size: Optional[ int ]
+	overlap: Optional[ int ]
+	snap: Optional[ float ]
+	threads: Optional[ int ]
+	
+	def __init__( self, size: int=512, overlap: int=64, encoding: str='cl100k_base',
+			snap: float=0.25, threads: int=8 ):
+		if overlap >= size:
+			raise ValueError( 'overlap must be smaller than size' )
+		self.size = size
+		self.overlap = overlap
+		self.snap = snap
+		self.threads = threads
+		self.encoder = tiktoken.get_encoding( encoding ) if isinstance( encoding, str ) else encoding
+		self._lengths = None
+	
+	def chunk( self, text: str ) -> List[ Dict[ str, Any ] ]:
+		return self.chunk_many( [ text ] )[ 0 ]
+	
+	def chunk_many( self, texts: List[ str ] ) -> List[ List[ Dict[ str, Any ] ] ]:
+		batches = self.encoder.encode_ordinary_batch( texts, num_threads=self.threads )
+		return [ self._windows( text, np.asarray( ids, dtype=np.int64 ) )
+		         for text, ids in zip( texts, batches ) ]
+	
+	def _offsets( self, text: str, ids: np.ndarray ) -> np.ndarray:
+		if self._lengths is None:
+			lengths = np.zeros( self.encoder.n_vocab, dtype=np.int64 )
+			for token in range( self.encoder.n_vocab ):
+				try:
+					lengths[ token ] = len( self.encoder.decode_single_token_bytes( token ) )
+				except KeyError:
+					pass
+			self._lengths = lengths
+		raw = np.frombuffer( text.encode( 'utf-8' ), dtype=np.uint8 )
+		chars = np.cumsum( (raw & 0xC0) != 0x80 ) - 1
+		starts = np.cumsum( self._lengths[ ids ] ) - self._lengths[ ids ]
+		return np.append( chars[ starts ], len( text ) )
+	
+	def _windows( self, text: str, ids: np.ndarray ) -> List[ Dict[ str, Any ] ]:
+		if len( ids ) == 0:
+			return [ ]
+		offsets = self._offsets( text, ids )
+		count, reach = len( ids ), max( int( self.size * self.snap ), 1 )
+		windows, start = [ ], 0
+		while start < count:
+			end = min( start + self.size, count )
+			if end < count:
+				low = int( offsets[ max( end - reach, start + 1 ) ] )
+				cut = self._boundary( text, low, int( offsets[ end ] ) )
+				if cut is not None:
+					snapped = int( np.searchsorted( offsets[ :count ], cut, 'left' ) )
+					if snapped > start + self.overlap:
+						end = snapped
+			first, last = int( offsets[ start ] ), int( offsets[ end ] )
+			windows.append( { 'text': text[ first:last ], 'start': first, 'end': last,
+			                  'tokens': end - start } )
+			if end == count:
+				break
+			start = max( end - self.overlap, start + 1 )
+		return windows
+	
+	@staticmethod
+	def _boundary( text: str, low: int, high: int ) -> int | None:
+		region = text[ low:high ]
+		paragraph = region.rfind( '\n\n' )
+		if paragraph > 0:
+			return low + paragraph
+		sentence = None
+		for match in SENTENCE_END.finditer( region ):
+			sentence = match
+		return low + sentence.end( ) if sentence else None
+
+class TextPipeline( ):
+	"""
 	
-	def update( self, table: str, pairs: str, where: str, params: Tuple[ Any, ... ] ) -> None:
+		Purpose:
+		--------
+		Text normalization for indexing and analysis: clean( ) applies clean_text, and
+		tokens( ) lower-cases, splits with a compiled regex, drops words in the
+		stores/stopwords.txt frozenset and optionally lemmatizes. spaCy is imported and
+		its model loaded only the first time lemmatization is requested, and the loaded
+		model is shared by every pipeline in the process.
+	
+		Methods:
+			- clean: Unicode and whitespace normalization that keeps the original words.
+			- tokens: Normalized, stopword-filtered (and lemmatized) tokens.
+			- process: tokens( ) joined with spaces.
+			- benchmark: MB/s for clean and tokens over a set of files.
+		
+	"""
+	form: Optional[ str ]
+	lowercase: Optional[ bool ]
+	stopwords: Optional[ frozenset ]
+	lemmatize: Optional[ bool ]
+	spacy_model: Optional[ str ]
+	_models: Dict[ str, Any ] = { }
+	
+	def __init__( self, form: str='NFKC', lowercase: bool=True, remove_stopwords: bool=True,
+			lemmatize: bool=False, spacy_model: str='en_core_web_sm', stopwords: str=None ):
+		self.form = form
+		self.lowercase = lowercase
+		self.stopwords = load_stopwords( stopwords ) if remove_stopwords else frozenset( )
+		self.lemmatize = lemmatize
+		self.spacy_model = spacy_model
+	
+	def clean( self, text: str ) -> str:
+		return clean_text( text, self.form )
+	
+	def tokens( self, text: str ) -> List[ str ]:
+		text = self.clean( text )
+		if self.lemmatize:
+			return self._lemmas( text )
+		pattern = ASCII_TOKENS if text.isascii( ) else WORD_TOKENS
+		words = pattern.findall( text.lower( ) if self.lowercase else text )
+		if self.stopwords and self.lowercase:
+			words = [ w for w in words if w not in self.stopwords ]
+		elif self.stopwords:
+			words = [ w for w in words if w.lower( ) not in self.stopwords ]
+		return words
+	
+	def process( self, text: str ) -> str:
+		return ' '.join( self.tokens( text ) )
+	
+	def benchmark( self, paths: List[ str ]=None ) -> Dict[ str, float ] | None:
 		"""
 		
 			Purpose:
 			--------
-			Updates rows in a df.
+			Measures throughput of clean( ) and tokens( ) over the given files, or every
+			.txt file under cfg.CORPUS_DIR.
 	
-			Parameters:
+			Returns:
 			--------
-			table (str): Table name.
-			pairs (str): SET clause with placeholders.
-			where (str): WHERE clause with placeholders.
-			params (Tuple): Parameters for both clauses.
+			Dict: megabytes, clean_mb_s, tokens_mb_s and tokens (count).
 			
 		"""
 		try:
-			throw_if( 'pairs', pairs )
-			throw_if( 'params', params )
-			throw_if( 'where', where )
-			throw_if( 'table', table )
-			self.table_name = table
-			self.where = where
-			self.params = params
-			self.sql = f'UPDATE {self.table_name} SET {pairs} WHERE {self.where}'
-			self.cursor.execute( self.sql, params )
-			self.connection.commit( )
+			files = paths or sorted( str( p ) for p in Path( cfg.CORPUS_DIR ).rglob( '*.txt' ) )
+			texts = [ read_text( f ) for f in files ]
+			megabytes = sum( len( t.encode( 'utf-8' ) ) for t in texts ) / 2 ** 20
+			started = time.perf_counter( )
+			for text in texts:
+				self.clean( text )
+			cleaning = time.perf_counter( ) - started
+			started = time.perf_counter( )
+			count = sum( len( self.tokens( text ) ) for text in texts )
+			tokenizing = time.perf_counter( ) - started
+			return { 'megabytes': megabytes, 'clean_mb_s': megabytes / cleaning,
+			         'tokens_mb_s': megabytes / tokenizing, 'tokens': count }
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'data'
-			exception.cause = 'SQLite'
-			exception.method = (
-					'update( self, df: str, pairs: str, where: str, params: Tuple[ Any, '
-					'... ] ) -> None')
+			exception.cause = 'TextPipeline'
+			exception.method = 'benchmark( self, paths: List[ str ]=None ) -> Dict[ str, float ]'
 			error = ErrorDialog( exception )
 			error.show( )
 	
-	def delete( self, table: str, where: str, params: Tuple[ Any, ... ] ) -> None:
+	def _lemmas( self, text: str ) -> List[ str ]:
+		if self.spacy_model not in TextPipeline._models:
+			import spacy
+			TextPipeline._models[ self.spacy_model ] = spacy.load( self.spacy_model,
+				disable=[ 'parser', 'ner' ] )
+		nlp = TextPipeline._models[ self.spacy_model ]
+		nlp.max_length = max( nlp.max_length, len( text ) + 1 )
+		lemmas = [ ]
+		for token in nlp( text ):
+			if token.is_space or token.is_punct:
+				continue
+			lemma = token.lemma_.lower( ) if self.lowercase else token.lemma_
+			if lemma.lower( ) not in self.stopwords:
+				lemmas.append( lemma )
+		return lemmas
+
+class Ingestion( ):
+	"""
+	
+		Purpose:
+		--------
+		Streams text files into the embeddings table: read -> chunk (TokenChunker) ->
+		clean (TextPipeline) run in a process pool, chunks are embedded in concurrent
+		batches, and each document is written with SQLite.insert_many. A JSON manifest
+		of file hashes is updated after every document, so an interrupted or repeated
+		run only processes new or changed files. Changed files have their old chunks
+		deleted first.
+	
+		Methods:
+			- stream: Generator yielding one status dict per file as it is stored.
+			- run: Consumes stream and returns a summary with docs/s and peak memory.
+		
+	"""
+	db: Optional[ SQLite ]
+	model: Optional[ str ]
+	manifest_path: Optional[ str ]
+	manifest: Optional[ Dict[ str, Dict[ str, Any ] ] ]
+	processes: Optional[ int ]
+	batch_size: Optional[ int ]
+	max_workers: Optional[ int ]
+	chunk_size: Optional[ int ]
+	overlap: Optional[ int ]
+	encoding: Optional[ str ]
+	pipeline: Optional[ TextPipeline ]
+	
+	def __init__( self, db: SQLite=None, embed: Callable[ [ List[ str ] ], np.ndarray ]=None,
+			model: str='text-embedding-004', manifest: str=None, processes: int=None,
+			batch_size: int=100, max_workers: int=4, chunk_size: int=512, overlap: int=64,
+			encoding: str='cl100k_base', pipeline: TextPipeline=None ):
+		self.db = db or SQLite( )
+		self.model = model
+		self.embed = embed or self._gemini_embed
+		self.manifest_path = str( manifest or cfg.INGEST_MANIFEST_PATH )
+		self.processes = processes
+		self.batch_size = batch_size
+		self.max_workers = max_workers
+		self.chunk_size = chunk_size
+		self.overlap = overlap
+		self.encoding = encoding
+		self.pipeline = pipeline or TextPipeline( remove_stopwords=False )
+		self.manifest = { }
+		self._embedder = None
+		if os.path.exists( self.manifest_path ):
+			with open( self.manifest_path, encoding='utf-8' ) as file:
+				self.manifest = json.load( file )
+	
+	def stream( self, paths: List[ str ] ) -> Iterator[ Dict[ str, Any ] ]:
+		self.db.create( )
+		pending = [ ]
+		for path in paths:
+			state = self._changed( path )
+			if state is None:
+				yield { 'file': path, 'status': 'skipped' }
+			else:
+				pending.append( (path, state) )
+		states = dict( pending )
+		window = 2 * (self.processes or os.cpu_count( ) or 1)
+		with ProcessPoolExecutor( max_workers=self.processes ) as pool:
+			queue = iter( states )
+			running = { pool.submit( _prepare_document, p, self.chunk_size, self.overlap,
+			                         self.encoding, self.pipeline )
+			            for p in itertools.islice( queue, window ) }
+			while running:
+				done, running = wait( running, return_when=FIRST_COMPLETED )
+				for future in done:
+					path, chunks, offsets = future.result( )
+					yield self._store( path, chunks, offsets, states[ path ] )
+					following = next( queue, None )
+					if following is not None:
+						running.add( pool.submit( _prepare_document, following,
+							self.chunk_size, self.overlap, self.encoding, self.pipeline ) )
+	
+	def run( self, paths: List[ str ] ) -> Dict[ str, Any ]:
 		"""
 		
 			Purpose:
 			--------
-			Deletes row matching the given WHERE clause.
+			Ingests the given files, or every .txt file under a directory.
 	
-			Parameters:
+			Returns:
 			--------
-			table (str): Table name.
-			where (str): WHERE clause (excluding 'WHERE').
-			params (Tuple): Parameters for clause.
-				
+			Dict: files, stored, skipped, chunks, seconds, docs_per_second and
+			peak_memory_mb (Python allocations in this process, via tracemalloc).
+			
 		"""
 		try:
-			throw_if( 'where', where )
-			throw_if( 'table', table )
-			throw_if( 'params', params )
-			self.table_name = table
-			self.where = where
-			self.params = params
-			self.sql = f"DELETE FROM {self.table_name} WHERE {self.where}"
-			self.cursor.execute( self.sql, self.params )
-			self.connection.commit( )
+			throw_if( 'paths', paths )
+			files = [ ]
+			for path in ([ paths ] if isinstance( paths, str ) else paths):
+				if os.path.isdir( path ):
+					files.extend( sorted( str( p ) for p in Path( path ).rglob( '*.txt' ) ) )
+				else:
+					files.append( str( path ) )
+			tracing = tracemalloc.is_tracing( )
+			if not tracing:
+				tracemalloc.start( )
+			started = time.perf_counter( )
+			summary = { 'files': len( files ), 'stored': 0, 'skipped': 0, 'chunks': 0 }
+			for status in self.stream( files ):
+				summary[ status[ 'status' ] ] += 1
+				summary[ 'chunks' ] += status.get( 'chunks', 0 )
+			elapsed = time.perf_counter( ) - started
+			peak = tracemalloc.get_traced_memory( )[ 1 ]
+			if not tracing:
+				tracemalloc.stop( )
+			summary.update( seconds=elapsed, docs_per_second=summary[ 'stored' ] / elapsed,
+				peak_memory_mb=peak / 2 ** 20 )
+			return summary
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'data'
-			exception.cause = 'SQLite'
-			exception.method = 'delete( self, df: str, where: str, params: Tuple[ Any] )->None'
+			exception.cause = 'Ingestion'
+			exception.method = 'run( self, paths: List[ str ] ) -> Dict[ str, Any ]'
 			error = ErrorDialog( exception )
 			error.show( )
 	
-	def import_excel( self, path: str ) -> None:
+	def _changed( self, path: str ) -> Dict[ str, Any ] | None:
+		stat = os.stat( path )
+		entry = self.manifest.get( path )
+		if entry and entry[ 'size' ] == stat.st_size and entry[ 'mtime_ns' ] == stat.st_mtime_ns:
+			return None
+		digest = file_digest( path )
+		state = { 'hash': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns }
+		if entry and entry[ 'hash' ] == digest:
+			self.manifest[ path ] = dict( entry, **state )
+			self._save_manifest( )
+			return None
+		return state
+	
+	def _store( self, path: str, chunks: List[ str ], offsets: List[ Tuple[ int, int ] ],
+			state: Dict[ str, Any ] ) -> Dict[ str, Any ]:
+		if path in self.manifest:
+			self.db.delete( 'embeddings', 'source_file = ?', (path,) )
+		if chunks:
+			vectors = self.embed( chunks )
+			if vectors is None or len( vectors ) != len( chunks ):
+				raise RuntimeError( f'Embedding failed for {path}' )
+			self.db.insert_many( path, chunks, vectors, self.model, offsets )
+			self.db.writes.flush( )
+			with self.db.pool.read( ) as connection:
+				stored = connection.execute( 'SELECT COUNT(*) FROM embeddings WHERE source_file = ?',
+					(path,) ).fetchone( )[ 0 ]
+			if stored != len( chunks ):
+				raise RuntimeError( f'Insert failed for {path}' )
+		self.manifest[ path ] = dict( state, chunks=len( chunks ) )
+		self._save_manifest( )
+		return { 'file': path, 'status': 'stored', 'chunks': len( chunks ) }
+	
+	def _save_manifest( self ) -> None:
+		os.makedirs( os.path.dirname( self.manifest_path ) or '.', exist_ok=True )
+		partial = self.manifest_path + '.partial'
+		with open( partial, 'w', encoding='utf-8' ) as file:
+			json.dump( self.manifest, file, indent=1 )
+		os.replace( partial, self.manifest_path )
+	
+	def _gemini_embed( self, chunks: List[ str ] ) -> np.ndarray | None:
+		if self._embedder is None:
+			from gemini import Embedding
+			self._embedder = Embedding( model=self.model )
+		return self._embedder.generate_many( chunks, self.model, self.batch_size,
+			self.max_workers )
+
+class CorpusIndex( ):
+	"""
+	
+		Purpose:
+		--------
+		SQLite FTS5 full-text index over the text files under stores/text. Each file is
+		split into paragraph-aligned passages whose character offsets are stored with
+		them, so a hit points back into the source file. Text is indexed with the porter
+		stemmer; stores/stopwords.txt is applied to queries, since FTS5 tokenizers cannot
+		drop stopwords without breaking snippets and offsets. update( ) only re-indexes
+		files whose size, mtime and then content hash changed, and drops deleted files.
+	
+		Methods:
+			- update: Incrementally indexes every .txt file under root.
+			- search: Ranked hits with highlighted snippets and file/offset pointers.
+			- close: Closes the index database.
+		
+	"""
+	db_path: Optional[ str ]
+	root: Optional[ str ]
+	passage_chars: Optional[ int ]
+	connection: Optional[ Connection ]
+	stopwords: Optional[ frozenset ]
+	
+	def __init__( self, db_path: str=None, root: str=None, passage_chars: int=2000,
+			stopwords: str=None ):
+		self.db_path = str( db_path or cfg.CORPUS_INDEX_PATH )
+		self.root = str( root or cfg.CORPUS_DIR )
+		self.passage_chars = passage_chars
+		self.stopwords = load_stopwords( stopwords )
+		os.makedirs( os.path.dirname( self.db_path ) or '.', exist_ok=True )
+		self.connection = sqlite3.connect( self.db_path )
+		self.connection.executescript( '''
+			CREATE TABLE IF NOT EXISTS documents
+			(
+				id       INTEGER PRIMARY KEY,
+				path     TEXT UNIQUE NOT NULL,
+				size     INTEGER NOT NULL,
+				mtime_ns INTEGER NOT NULL,
+				hash     TEXT NOT NULL
+			);
+			CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+				text, document_id UNINDEXED, start_offset UNINDEXED, end_offset UNINDEXED,
+				tokenize = 'porter unicode61 remove_diacritics 2' );''' )
+	
+	def update( self ) -> Dict[ str, Any ] | None:
 		"""
 		
 			Purpose:
 			--------
-			Reads all worksheets from an Excel file into pandas DataFrames and
-			stores each as a df in the SQLite database.
-		
-			Parameters:
+			Brings the index in line with the files under root.
+	
+			Returns:
 			--------
-			path (str): Path to the Excel workbook.
+			Dict: files, indexed, unchanged, removed, passages and seconds.
 			
 		"""
 		try:
-			throw_if( 'path', path )
-			self.file_path = path
-			self.file_name = os.path.basename( self.file_path )
-			_excel = pd.ExcelFile( self.file_path )
-			for _sheet in _excel.sheet_names:
-				_df = _excel.parse( _sheet )
-				_df.to_sql( _sheet, self.connection, if_exists='replace', index=False )
+			started = time.perf_counter( )
+			summary = { 'files': 0, 'indexed': 0, 'unchanged': 0, 'removed': 0, 'passages': 0 }
+			known = { path: (id, size, mtime, digest) for id, path, size, mtime, digest in
+			          self.connection.execute( 'SELECT id, path, size, mtime_ns, hash FROM documents' ) }
+			seen = set( )
+			for file in sorted( Path( self.root ).rglob( '*.txt' ) ):
+				path = file.relative_to( self.root ).as_posix( )
+				seen.add( path )
+				summary[ 'files' ] += 1
+				stat = file.stat( )
+				entry = known.get( path )
+				if entry and (entry[ 1 ], entry[ 2 ]) == (stat.st_size, stat.st_mtime_ns):
+					summary[ 'unchanged' ] += 1
+					continue
+				digest = file_digest( str( file ) )
+				with self.connection:
+					if entry and entry[ 3 ] == digest:
+						self.connection.execute( 'UPDATE documents SET size = ?, mtime_ns = ? '
+						                         'WHERE id = ?', (stat.st_size, stat.st_mtime_ns, entry[ 0 ]) )
+						summary[ 'unchanged' ] += 1
+						continue
+					if entry:
+						self.connection.execute( 'DELETE FROM passages WHERE document_id = ?',
+							(entry[ 0 ],) )
+					cursor = self.connection.execute( '''INSERT INTO documents (path, size,
+						mtime_ns, hash) VALUES (?, ?, ?, ?) ON CONFLICT(path) DO UPDATE SET
+						size = excluded.size, mtime_ns = excluded.mtime_ns, hash = excluded.hash
+						RETURNING id''', (path, stat.st_size, stat.st_mtime_ns, digest) )
+					document = cursor.fetchone( )[ 0 ]
+					text = read_text( str( file ) )
+					rows = [ (text[ start:end ], document, start, end)
+					         for start, end in self._passages( text ) ]
+					self.connection.executemany( '''INSERT INTO passages (text, document_id,
+						start_offset, end_offset) VALUES (?, ?, ?, ?)''', rows )
+				summary[ 'indexed' ] += 1
+				summary[ 'passages' ] += len( rows )
+			with self.connection:
+				for path in known.keys( ) - seen:
+					self.connection.execute( 'DELETE FROM passages WHERE document_id = ?',
+						(known[ path ][ 0 ],) )
+					self.connection.execute( 'DELETE FROM documents WHERE id = ?',
+						(known[ path ][ 0 ],) )
+					summary[ 'removed' ] += 1
+				if summary[ 'indexed' ] or summary[ 'removed' ]:
+					self.connection.execute( "INSERT INTO passages (passages) VALUES ('optimize')" )
+			summary[ 'seconds' ] = time.perf_counter( ) - started
+			return summary
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'data'
-			exception.cause = 'SQLite'
-			exception.method = 'import_excel( self, path: str ) -> None'
+			exception.cause = 'CorpusIndex'
+			exception.method = 'update( self ) -> Dict[ str, Any ]'
 			error = ErrorDialog( exception )
 			error.show( )
 	
-	def close( self ) -> None:
+	def search( self, query: str, k: int=10, tokens: int=16,
+			path_filter: str=None ) -> List[ Dict[ str, Any ] ] | None:
 		"""
-	
+		
 			Purpose:
 			--------
-			Closes the database connection.
+			Finds the passages best matching every query term by BM25, falling back to any
+			term when nothing matches them all. Stopwords are dropped from the query.
 	
+			Parameters:
+			--------
+			query (str): Free-text query; punctuation-joined words match as phrases.
+			k (int): Maximum number of hits.
+			tokens (int): Approximate snippet length in tokens.
+			path_filter (str): Only search files whose relative path contains this text.
+	
+			Returns:
+			--------
+			List[Dict]: path, start_offset, end_offset, snippet (matches wrapped in [ ])
+			and score (lower BM25 is better) for each hit.
+			
 		"""
 		try:
-			if self.connection is not None:
-				self.connection.close( )
+			throw_if( 'query', query )
+			clause = 'AND d.path LIKE ?' if path_filter else ''
+			extra = (f'%{path_filter}%',) if path_filter else ( )
+			sql = f'''SELECT d.path, p.start_offset, p.end_offset,
+				snippet(passages, 0, '[', ']', '…', ?), bm25(passages)
+				FROM passages AS p JOIN documents AS d ON d.id = p.document_id
+				WHERE passages MATCH ? {clause} ORDER BY bm25(passages) LIMIT ?'''
+			for operator in ('AND', 'OR'):
+				expression = fts_query( query, self.stopwords, operator )
+				if not expression:
+					return [ ]
+				rows = self.connection.execute( sql, (tokens, expression) + extra + (k,) ).fetchall( )
+				if rows:
+					break
+			return [ { 'path': path, 'start_offset': start, 'end_offset': end,
+			           'snippet': snippet, 'score': score }
+			         for path, start, end, snippet, score in rows ]
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'data'
-			exception.cause = 'SQLite'
-			exception.method = 'close( self ) -> None'
+			exception.cause = 'CorpusIndex'
+			exception.method = 'search( self, query: str, k: int=10, tokens: int=16, path_filter=None ) -> List[ Dict ]'
 			error = ErrorDialog( exception )
 			error.show( )
+	
+	def close( self ) -> None:
+		if self.connection is not None:
+			self.connection.close( )
+			self.connection = None
+	
+	def _passages( self, text: str ) -> Iterator[ Tuple[ int, int ] ]:
+		start = 0
+		while start < len( text ):
+			end = min( start + self.passage_chars, len( text ) )
+			if end < len( text ):
+				brk = text.rfind( '\n\n', start + self.passage_chars // 2, end )
+				if brk < 0:
+					brk = text.rfind( '\n', start + self.passage_chars // 2, end )
+				if brk > start:
+					end = brk
+			yield start, end
+			start = end
 
 class Chroma( ):
 	'''
@@ -769,3 +3407,36 @@ class GoogleSearchTool( ):
 			search = self.client.chat.completions.create( model=model, messages=prompt,
 				tools=tool, tool_choice=choice )
 		return search.choices[ 0 ].message.content
+
+if __name__ == '__main__':
+	import argparse
+	parser = argparse.ArgumentParser( prog='data', description='Jeni data tools' )
+	commands = parser.add_subparsers( dest='command', required=True )
+	ingest = commands.add_parser( 'ingest',
+		help='Chunk, embed and store text files in the embeddings table' )
+	ingest.add_argument( 'paths', nargs='+', help='Text files or directories of .txt files' )
+	ingest.add_argument( '--model', default='text-embedding-004' )
+	ingest.add_argument( '--processes', type=int, default=None, help='Chunking processes' )
+	ingest.add_argument( '--workers', type=int, default=4, help='Concurrent embed requests' )
+	ingest.add_argument( '--batch', type=int, default=100, help='Texts per embed request' )
+	ingest.add_argument( '--manifest', default=None, help='Checkpoint manifest path' )
+	corpus = commands.add_parser( 'index-corpus',
+		help='Build or update the full-text index over stores/text' )
+	corpus.add_argument( '--root', default=None, help='Directory of .txt files' )
+	corpus.add_argument( '--index', default=None, help='Index database path' )
+	find = commands.add_parser( 'search-corpus', help='Full-text search of the corpus index' )
+	find.add_argument( 'query' )
+	find.add_argument( '--k', type=int, default=10 )
+	find.add_argument( '--index', default=None, help='Index database path' )
+	args = parser.parse_args( )
+	if args.command == 'ingest':
+		pipeline = Ingestion( model=args.model, manifest=args.manifest,
+			processes=args.processes, batch_size=args.batch, max_workers=args.workers )
+		print( json.dumps( pipeline.run( args.paths ), indent=2 ) )
+	elif args.command == 'index-corpus':
+		print( json.dumps( CorpusIndex( args.index, args.root ).update( ), indent=2 ) )
+	elif args.command == 'search-corpus':
+		if not os.path.exists( args.index or cfg.CORPUS_INDEX_PATH ):
+			parser.error( 'no corpus index found; run index-corpus first' )
+		for hit in CorpusIndex( args.index ).search( args.query, args.k ):
+			print( f"{hit[ 'path' ]}:{hit[ 'start_offset' ]}  {hit[ 'snippet' ]}" )
@@ -42,10 +42,30 @@
   ******************************************************************************************
 '''
 import os
+import io
+import re
+import csv
+import json
+import hashlib
+import sqlite3
+import threading
+import mmap
+import mimetypes
+import tempfile
+import time
+import wave
 import requests
+import math
+import fitz
+import numpy as np
+import soundfile as sf
 import PIL.Image
+import PIL.ImageOps
+from collections import OrderedDict
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed, wait)
 from pathlib import Path
-from typing import Any, List, Optional, Dict, Union
+from typing import Any, Callable, List, Optional, Dict, Tuple, Union
 from google import genai
 from google.genai import types
 from google.genai.types import (Part, GenerateContentConfig, ImageConfig, FunctionCallingConfig,
@@ -60,6 +80,441 @@ def throw_if( name: str, value: object ):
 	if value is None:
 		raise ValueError( f'Argument "{name}" cannot be empty!' )
 
+def file_part( path: str, mime_type: str, use_ai: bool=False, version: str='v1alpha',
+		progress: Callable[ [ int, int ], None ]=None ) -> Part:
+	'''
+
+		Purpose:
+		--------
+		Builds a content Part for a local file. Small files in Vertex mode are sent inline;
+		everything else is streamed through FileStore's resumable upload so memory stays bounded
+		by the upload chunk size regardless of file size. Upload errors propagate to the caller,
+		which reports them.
+
+		Parameters:
+		-----------
+		path: str - Local filesystem path to the file.
+		mime_type: str - Content type of the file.
+		use_ai: bool - Vertex AI (True) or API Key (False).
+		version: str - API version.
+		progress: Callable[ [ int, int ], None ] - Called with ( bytes_sent, total_bytes ).
+
+		Returns:
+		--------
+		Part - Inline or URI-backed content part.
+
+	'''
+	throw_if( 'path', path )
+	if use_ai and os.path.getsize( path ) <= cfg.UPLOAD_INLINE_LIMIT:
+		with open( path, 'rb' ) as f:
+			return Part.from_bytes( data=f.read( ), mime_type=mime_type )
+	store = FileStore( use_ai=use_ai, version=version )
+	uri = store._upload( path, mime_type=mime_type, progress=progress )
+	return Part.from_uri( file_uri=uri, mime_type=mime_type )
+
+def preprocess_image( path: str, max_edge: int=1536, format: str='WEBP',
+		quality: int=80 ) -> Tuple[ bytes, str ]:
+	'''
+
+		Purpose:
+		--------
+		Shrinks an image for upload. JPEGs are decoded in draft mode at the nearest scale
+		above max_edge, the image is rotated per its EXIF orientation, downsized so its longest
+		edge is at most max_edge, stripped of metadata and re-encoded as WebP or JPEG.
+
+		Parameters:
+		-----------
+		path: str - Local filesystem path to the image.
+		max_edge: int - Longest edge in pixels after resizing.
+		format: str - 'WEBP' or 'JPEG'.
+		quality: int - Encoder quality from 1 to 100.
+
+		Returns:
+		--------
+		Tuple[ bytes, str ] - Encoded image and its mime type.
+
+	'''
+	throw_if( 'path', path )
+	with PIL.Image.open( path ) as source:
+		source.draft( 'RGB', (max_edge, max_edge) )
+		image = PIL.ImageOps.exif_transpose( source )
+		image.thumbnail( (max_edge, max_edge), PIL.Image.LANCZOS )
+		keep_alpha = format.upper( ) == 'WEBP' and image.mode in ('RGBA', 'LA', 'P')
+		image = image.convert( 'RGBA' if keep_alpha else 'RGB' )
+		image.info = { }
+		buffer = io.BytesIO( )
+		image.save( buffer, format=format.upper( ), quality=quality, optimize=True )
+	return buffer.getvalue( ), f'image/{format.lower( )}'
+
+def hash_file( path: str ) -> Tuple[ str, str ]:
+	'''
+
+		Purpose:
+		--------
+		Returns the path and the SHA-256 of the file contents, read in 1 MB blocks.
+
+	'''
+	sha = hashlib.sha256( )
+	with open( path, 'rb' ) as f:
+		for block in iter( lambda: f.read( 1024 * 1024 ), b'' ):
+			sha.update( block )
+	return path, sha.hexdigest( )
+
+def _hash_or_error( path: str ) -> Tuple[ str, str | None, str | None ]:
+	try:
+		return (*hash_file( path ), None)
+	except OSError as e:
+		return path, None, str( e )
+
+class RateLimiter( ):
+	"""
+
+	    Purpose
+	    ___________
+	    Thread-safe token bucket that spaces calls to at most rate per minute while allowing
+	    short bursts of up to burst calls.
+
+	    Attributes:
+	    -----------
+	    rate   : float - Calls allowed per minute
+	    burst  : int - Bucket capacity
+
+	    Methods:
+	    --------
+	    acquire( ) : Blocks until a call is allowed
+
+    """
+	rate: Optional[ float ]
+	burst: Optional[ int ]
+
+	def __init__( self, rate: float=60.0, burst: int=1 ):
+		self.rate = rate
+		self.burst = burst
+		self._tokens = float( burst )
+		self._stamp = time.monotonic( )
+		self._lock = threading.Lock( )
+
+	def acquire( self ) -> None:
+		while True:
+			with self._lock:
+				now = time.monotonic( )
+				self._tokens = min( self.burst, self._tokens + (now - self._stamp) * self.rate / 60.0 )
+				self._stamp = now
+				if self._tokens >= 1.0:
+					self._tokens -= 1.0
+					return
+				wait = (1.0 - self._tokens) * 60.0 / self.rate
+			time.sleep( wait )
+
+class ArtifactCache( ):
+	"""
+
+	    Purpose
+	    ___________
+	    Content-addressed, size-bounded LRU cache of binary artifacts on disk. Blobs are stored
+	    once under the SHA-256 of their content; lookup keys map to lists of blob digests.
+	    Reading a blob refreshes its modification time and the least recently used blobs are
+	    evicted once the total size exceeds max_bytes.
+
+	    Attributes:
+	    -----------
+	    root      : Path - Cache directory
+	    max_bytes : int - Upper bound on the total size of stored blobs
+
+	    Methods:
+	    --------
+	    get( key )        : Returns the blobs stored for a key or None
+	    put( key, blobs ) : Stores blobs for a key and evicts down to max_bytes
+
+    """
+	root: Optional[ Path ]
+	max_bytes: Optional[ int ]
+
+	def __init__( self, name: str, max_bytes: int=None ):
+		self.root = Path( cfg.CACHE_DIR ) / name
+		self.max_bytes = max_bytes or cfg.IMAGE_CACHE_BYTES
+		(self.root / 'blobs').mkdir( parents=True, exist_ok=True )
+		(self.root / 'keys').mkdir( parents=True, exist_ok=True )
+
+	@staticmethod
+	def digest( data: bytes | str ) -> str:
+		if isinstance( data, str ):
+			data = data.encode( 'utf-8' )
+		return hashlib.sha256( data ).hexdigest( )
+
+	def get( self, key: str ) -> Optional[ List[ bytes ] ]:
+		"""
+
+			Purpose:
+			--------
+			Returns the blobs stored for a key, refreshing their recency.
+
+			Parameters:
+			-----------
+			key: str - Lookup key.
+
+			Returns:
+			--------
+			Optional[ List[ bytes ] ] - Stored blobs, or None when missing or evicted.
+
+		"""
+		index = self.root / 'keys' / f'{self.digest( key )}.json'
+		try:
+			digests = json.loads( index.read_text( encoding='utf-8' ) )
+			blobs = [ ]
+			for item in digests:
+				path = self.root / 'blobs' / item
+				blobs.append( path.read_bytes( ) )
+				os.utime( path )
+			return blobs
+		except (OSError, ValueError):
+			return None
+
+	def put( self, key: str, blobs: List[ bytes ] ) -> List[ str ]:
+		"""
+
+			Purpose:
+			--------
+			Stores blobs under their content hash, records them for the key and evicts the
+			least recently used blobs beyond max_bytes.
+
+			Parameters:
+			-----------
+			key: str - Lookup key.
+			blobs: List[ bytes ] - Artifacts to store.
+
+			Returns:
+			--------
+			List[ str ] - Content digests of the stored blobs.
+
+		"""
+		digests = [ ]
+		for blob in blobs:
+			item = self.digest( blob )
+			path = self.root / 'blobs' / item
+			if path.exists( ):
+				os.utime( path )
+			else:
+				temp = path.with_suffix( f'.{threading.get_ident( )}.tmp' )
+				temp.write_bytes( blob )
+				os.replace( temp, path )
+			digests.append( item )
+		index = self.root / 'keys' / f'{self.digest( key )}.json'
+		index.write_text( json.dumps( digests ), encoding='utf-8' )
+		self.evict( )
+		return digests
+
+	def evict( self ) -> None:
+		entries = [ ]
+		for path in (self.root / 'blobs').iterdir( ):
+			if path.suffix == '.tmp':
+				continue
+			stat = path.stat( )
+			entries.append( (stat.st_mtime, stat.st_size, path) )
+		total = sum( size for _, size, _ in entries )
+		for _, size, path in sorted( entries ):
+			if total <= self.max_bytes:
+				break
+			path.unlink( missing_ok=True )
+			total -= size
+
+class LazyImage( ):
+	"""
+
+	    Purpose
+	    ___________
+	    Encoded image bytes that are only decoded into a PIL image when first accessed.
+
+	    Attributes:
+	    -----------
+	    data      : bytes - Encoded image
+	    mime_type : str - Content type of the encoded image
+
+    """
+	data: Optional[ bytes ]
+	mime_type: Optional[ str ]
+
+	def __init__( self, data: bytes, mime_type: str=None ):
+		self.data = data
+		self.mime_type = mime_type or self.sniff( data )
+		self._image = None
+
+	@staticmethod
+	def sniff( data: bytes ) -> str:
+		if data[ :2 ] == b'\xff\xd8':
+			return 'image/jpeg'
+		if data[ :4 ] == b'RIFF' and data[ 8:12 ] == b'WEBP':
+			return 'image/webp'
+		return 'image/png'
+
+	@property
+	def image( self ) -> PIL.Image.Image:
+		"""Decodes the bytes on first access and returns the PIL image."""
+		if self._image is None:
+			self._image = PIL.Image.open( io.BytesIO( self.data ) )
+		return self._image
+
+class TokenCounter( ):
+	"""
+
+	    Purpose
+	    ___________
+	    Pre-flight token accounting for Gemini requests. Local estimates divide the character
+	    count by a per-model characters-per-token ratio that is recalibrated every time an
+	    exact count is taken with count_tokens for that model. Exact counts are cached per
+	    content hash and model, and are only requested when an estimate lands close to the
+	    budget. Inputs that do not fit are routed to a larger-context model, split into
+	    chunks or truncated before any request is sent.
+
+	    Attributes:
+	    -----------
+	    client   : Client - GenAI instance used for exact counts
+	    margin   : float - Relative distance from the budget inside which counts are exact
+	    capacity : int - Number of exact counts kept in the cache
+
+	    Methods:
+	    --------
+	    count( text, model )                      : Exact token count via the API
+	    estimate( text, model )                   : Cached or locally estimated token count
+	    context_limit( model )                    : Input context window of a model
+	    route( tokens, model, options, reserve )   : Smallest model whose window fits tokens
+	    preflight( text, model, options, reserve ) : Fits a prompt to a context window
+
+    """
+	client: Optional[ genai.Client ]
+	margin: Optional[ float ]
+	capacity: Optional[ int ]
+	_ratio: float = 4.0
+	_ratios: Dict[ str, float ] = { }
+	_cache: 'OrderedDict[ str, int ]' = OrderedDict( )
+	_lock: threading.Lock = threading.Lock( )
+
+	def __init__( self, client: genai.Client, margin: float=0.1, capacity: int=4096 ):
+		self.client = client
+		self.margin = margin
+		self.capacity = capacity
+
+	@property
+	def context_options( self ) -> Dict[ str, int ]:
+		"""Returns the input context window of each known model."""
+		return { 'gemini-2.0-flash': 1048576,
+		         'gemini-2.0-flash-lite': 1048576,
+		         'gemini-1.5-pro': 2097152,
+		         'gemini-1.5-flash': 1048576 }
+
+	def context_limit( self, model: str ) -> int:
+		return self.context_options.get( model, 1048576 )
+
+	def route( self, tokens: int, model: str, options: List[ str ]=None,
+			reserve: int=0 ) -> str | None:
+		"""
+
+			Purpose:
+			--------
+			Returns model when tokens plus reserve fit its context window, otherwise the
+			smallest-window model in options that fits, or None when nothing does.
+
+		"""
+		if tokens <= self.context_limit( model ) - reserve:
+			return model
+		fits = sorted( (self.context_limit( m ), m) for m in (options or [ ])
+		               if self.context_limit( m ) - reserve >= tokens )
+		return fits[ 0 ][ 1 ] if fits else None
+
+	def count( self, text: str, model: str ) -> int:
+		"""
+
+			Purpose:
+			--------
+			Counts tokens exactly with the count_tokens API, caches the result and
+			recalibrates the model's local characters-per-token ratio.
+
+		"""
+		key = f'{model}|{hashlib.sha256( text.encode( "utf-8" ) ).hexdigest( )}'
+		with self._lock:
+			if key in self._cache:
+				self._cache.move_to_end( key )
+				return self._cache[ key ]
+		tokens = self.client.models.count_tokens( model=model, contents=text ).total_tokens
+		with self._lock:
+			self._cache[ key ] = tokens
+			while len( self._cache ) > self.capacity:
+				self._cache.popitem( last=False )
+			if tokens > 0 and len( text ) >= 200:
+				ratio = self._ratios.get( model, self._ratio )
+				self._ratios[ model ] = 0.8 * ratio + 0.2 * (len( text ) / tokens)
+		return tokens
+
+	def estimate( self, text: str, model: str=None ) -> int:
+		"""
+
+			Purpose:
+			--------
+			Returns a cached exact count for the text when one exists, otherwise a local
+			estimate from the model's calibrated characters-per-token ratio. No request is
+			made.
+
+		"""
+		if model is not None:
+			key = f'{model}|{hashlib.sha256( text.encode( "utf-8" ) ).hexdigest( )}'
+			with self._lock:
+				if key in self._cache:
+					return self._cache[ key ]
+		return int( len( text ) / self._ratios.get( model, self._ratio ) ) + 1
+
+	def chars_for( self, tokens: int, model: str=None ) -> int:
+		"""Returns the number of characters expected to encode to the given token count."""
+		return int( tokens * self._ratios.get( model, self._ratio ) )
+
+	def preflight( self, text: str, model: str, options: List[ str ]=None, reserve: int=0,
+			strategy: str='route' ) -> Dict[ str, Any ]:
+		"""
+
+			Purpose:
+			--------
+			Checks that text plus reserve output tokens fits the model's context window.
+			When it does not, 'route' switches to the smallest model in options that fits and
+			otherwise falls back to chunking, 'chunk' splits the text at paragraph or sentence
+			boundaries into pieces that fit, and 'truncate' keeps the leading text that fits.
+
+			Parameters:
+			-----------
+			text: str - Prompt text.
+			model: str - Requested model.
+			options: List[ str ] - Models eligible for routing.
+			reserve: int - Tokens kept free for the response.
+			strategy: str - 'route', 'chunk' or 'truncate'.
+
+			Returns:
+			--------
+			Dict[ str, Any ] - model, parts ( list of texts to send ), tokens and action.
+
+		"""
+		budget = self.context_limit( model ) - reserve
+		tokens = self.estimate( text, model )
+		if abs( tokens - budget ) <= self.margin * budget:
+			tokens = self.count( text, model )
+		if tokens <= budget:
+			return { 'model': model, 'parts': [ text ], 'tokens': tokens, 'action': 'none' }
+		if strategy == 'route':
+			routed = self.route( tokens, model, options, reserve )
+			if routed:
+				return { 'model': routed, 'parts': [ text ], 'tokens': tokens,
+				         'action': 'route' }
+		size = max( 1, self.chars_for( budget, model ) )
+		if strategy == 'truncate':
+			return { 'model': model, 'parts': [ text[ :size ] ], 'tokens': budget,
+			         'action': 'truncate' }
+		parts, start = [ ], 0
+		while start < len( text ):
+			end = min( len( text ), start + size )
+			if end < len( text ):
+				cut = max( text.rfind( '\n\n', start, end ), text.rfind( '. ', start, end ) )
+				end = cut + 1 if cut > start + size // 2 else end
+			parts.append( text[ start:end ] )
+			start = end
+		return { 'model': model, 'parts': parts, 'tokens': tokens, 'action': 'chunk' }
+
 class Gemini( ):
 	'''
 
@@ -159,10 +614,13 @@ class FileStore( Gemini ):
 		file_list    : list - Collection of remote File objects
 		response     : any - RAW API response object
 		use_vertex   : bool - Integration flag
+		chunk_size   : int - Bytes sent per resumable upload request
+		max_retries  : int - Consecutive chunk failures tolerated before giving up
 
 		Methods:
 		--------
 		upload( path, name )      : Uploads a local file to Gemini storage
+		upload_resumable( path )  : Streams a local file in chunks with resume and progress
 		retrieve( file_id )       : Fetches metadata for a specific remote file
 		list_files( )             : Lists all files currently in remote storage
 		delete( file_id )         : Removes a file from remote storage
@@ -176,7 +634,9 @@ class FileStore( Gemini ):
 	file_list: Optional[ List[ File ] ]
 	response: Optional[ Any ]
 	use_vertex: Optional[ bool ]
-	
+	chunk_size: Optional[ int ]
+	max_retries: Optional[ int ]
+
 	def __init__( self, use_ai: bool=False, version: str='v1alpha' ):
 		super( ).__init__( )
 		self.use_vertex = use_ai
@@ -190,7 +650,9 @@ class FileStore( Gemini ):
 		self.file_path = None;
 		self.file_list = [ ];
 		self.response = None
-	
+		self.chunk_size = cfg.UPLOAD_CHUNK_SIZE
+		self.max_retries = 5
+
 	def upload( self, path: str, name: str=None ) -> File | None:
 		"""
 		Purpose: Uploads a file from a local path to Gemini's remote temporal storage.
@@ -217,7 +679,174 @@ class FileStore( Gemini ):
 			exception.method = 'upload( self, path: str, name: str ) -> Optional[ File ]'
 			error = ErrorDialog( exception )
 			error.show( )
-	
+
+	def upload_resumable( self, path: str, name: str=None, mime_type: str=None,
+			chunk_size: int=None, progress: Callable[ [ int, int ], None ]=None ) -> str | None:
+		"""
+
+			Purpose:
+			--------
+			Streams a local file to remote storage in fixed-size chunks read from a memory-mapped
+			view, so only one chunk is resident at a time. Upload sessions are persisted to
+			cfg.UPLOAD_SESSIONS_PATH and an interrupted upload resumes from the last offset the
+			server acknowledged. In API-key mode the target is the Gemini Files API; in Vertex
+			mode it is the cfg.GOOGLE_CLOUD_BUCKET bucket.
+
+			Parameters:
+			-----------
+			path: str - Local filesystem path to the file.
+			name: str - Optional display name for the file.
+			mime_type: str - Optional content type; guessed from the extension when omitted.
+			chunk_size: int - Bytes per request, a multiple of 256 KiB.
+			progress: Callable[ [ int, int ], None ] - Called with ( bytes_sent, total_bytes ).
+
+			Returns:
+			--------
+			Optional[ str ] - The remote URI ( files/... or gs://... ) usable with Part.from_uri.
+
+		"""
+		try:
+			return self._upload( path, name, mime_type, chunk_size, progress )
+		except Exception as e:
+			exception = Error( e );
+			exception.module = 'gemini'
+			exception.cause = 'FileStore'
+			exception.method = ('upload_resumable( self, path, name, mime_type, chunk_size, '
+			                    'progress ) -> str')
+			error = ErrorDialog( exception )
+			error.show( )
+
+	def _upload( self, path: str, name: str=None, mime_type: str=None, chunk_size: int=None,
+			progress: Callable[ [ int, int ], None ]=None ) -> str:
+		throw_if( 'path', path )
+		self.file_path = path
+		self.display_name = name or os.path.basename( path )
+		self.mime_type = (mime_type or mimetypes.guess_type( path )[ 0 ]
+		                  or 'application/octet-stream')
+		size = os.path.getsize( path )
+		if size == 0:
+			raise ValueError( f'File "{path}" is empty!' )
+		chunk = chunk_size or self.chunk_size
+		chunk = max( 256 * 1024, chunk - chunk % (256 * 1024) )
+		stat = os.stat( path )
+		key = f'{os.path.abspath( path )}|{size}|{stat.st_mtime_ns}|{self.use_vertex}'
+		sessions = self._load_sessions( )
+		session = sessions.get( key )
+		if session is None:
+			session = self._start_session( size )
+			sessions[ key ] = session
+			self._save_sessions( sessions )
+		offset = self._query_offset( session, size )
+		attempts = 0
+		result = { }
+		with open( path, 'rb' ) as f, mmap.mmap( f.fileno( ), 0, access=mmap.ACCESS_READ ) as mm:
+			if progress is not None:
+				progress( offset, size )
+			while offset < size:
+				end = min( offset + chunk, size )
+				try:
+					result = self._send_chunk( session, mm[ offset:end ], offset, size )
+					offset = end
+					attempts = 0
+				except (requests.ConnectionError, requests.Timeout, requests.HTTPError):
+					attempts += 1
+					if attempts > self.max_retries:
+						raise
+					time.sleep( min( 2 ** attempts, 30 ) )
+					offset = self._query_offset( session, size )
+					continue
+				if progress is not None:
+					progress( offset, size )
+		sessions.pop( key, None )
+		self._save_sessions( sessions )
+		if not self.use_vertex and 'file' not in result:
+			raise RuntimeError( 'Upload session was already finalized; retry the upload.' )
+		if self.use_vertex:
+			return f'gs://{cfg.GOOGLE_CLOUD_BUCKET}/{session[ "object" ]}'
+		self.file_id = result[ 'file' ][ 'name' ]
+		self.response = self.client.files.get( name=self.file_id )
+		return self.response.uri
+
+	def _load_sessions( self ) -> Dict[ str, Dict[ str, str ] ]:
+		path = Path( cfg.UPLOAD_SESSIONS_PATH )
+		if not path.exists( ):
+			return { }
+		try:
+			return json.loads( path.read_text( encoding='utf-8' ) )
+		except ValueError:
+			return { }
+
+	def _save_sessions( self, sessions: Dict[ str, Dict[ str, str ] ] ) -> None:
+		path = Path( cfg.UPLOAD_SESSIONS_PATH )
+		path.parent.mkdir( parents=True, exist_ok=True )
+		path.write_text( json.dumps( sessions, indent=2 ), encoding='utf-8' )
+
+	def _auth_headers( self ) -> Dict[ str, str ]:
+		if not self.use_vertex:
+			return { 'x-goog-api-key': self.api_key }
+		import google.auth
+		import google.auth.transport.requests
+		scopes = [ 'https://www.googleapis.com/auth/cloud-platform' ]
+		credentials, _ = google.auth.default( scopes=scopes )
+		credentials.refresh( google.auth.transport.requests.Request( ) )
+		return { 'Authorization': f'Bearer {credentials.token}' }
+
+	def _start_session( self, size: int ) -> Dict[ str, str ]:
+		headers = self._auth_headers( )
+		if self.use_vertex:
+			throw_if( 'GOOGLE_CLOUD_BUCKET', cfg.GOOGLE_CLOUD_BUCKET )
+			obj = f'uploads/{int( time.time( ) )}-{self.display_name}'
+			url = (f'https://storage.googleapis.com/upload/storage/v1/b/'
+			       f'{cfg.GOOGLE_CLOUD_BUCKET}/o')
+			headers.update( { 'X-Upload-Content-Type': self.mime_type,
+			                  'X-Upload-Content-Length': str( size ) } )
+			response = requests.post( url, headers=headers, timeout=60,
+				params={ 'uploadType': 'resumable', 'name': obj } )
+			response.raise_for_status( )
+			return { 'url': response.headers[ 'Location' ], 'object': obj }
+		url = 'https://generativelanguage.googleapis.com/upload/v1beta/files'
+		headers.update( { 'X-Goog-Upload-Protocol': 'resumable',
+		                  'X-Goog-Upload-Command': 'start',
+		                  'X-Goog-Upload-Header-Content-Length': str( size ),
+		                  'X-Goog-Upload-Header-Content-Type': self.mime_type } )
+		response = requests.post( url, headers=headers, timeout=60,
+			json={ 'file': { 'display_name': self.display_name } } )
+		response.raise_for_status( )
+		return { 'url': response.headers[ 'X-Goog-Upload-URL' ] }
+
+	def _query_offset( self, session: Dict[ str, str ], size: int ) -> int:
+		if self.use_vertex:
+			headers = self._auth_headers( )
+			headers[ 'Content-Range' ] = f'bytes */{size}'
+			response = requests.put( session[ 'url' ], headers=headers, timeout=60 )
+			if response.status_code in (200, 201):
+				return size
+			if response.status_code != 308:
+				response.raise_for_status( )
+			received = response.headers.get( 'Range' )
+			return int( received.split( '-' )[ -1 ] ) + 1 if received else 0
+		headers = self._auth_headers( )
+		headers[ 'X-Goog-Upload-Command' ] = 'query'
+		response = requests.post( session[ 'url' ], headers=headers, timeout=60 )
+		response.raise_for_status( )
+		return int( response.headers.get( 'X-Goog-Upload-Size-Received', 0 ) )
+
+	def _send_chunk( self, session: Dict[ str, str ], data: bytes, offset: int,
+			size: int ) -> Dict[ str, Any ]:
+		headers = self._auth_headers( )
+		last = offset + len( data ) >= size
+		if self.use_vertex:
+			headers[ 'Content-Range' ] = f'bytes {offset}-{offset + len( data ) - 1}/{size}'
+			response = requests.put( session[ 'url' ], headers=headers, data=data, timeout=300 )
+			if response.status_code != 308:
+				response.raise_for_status( )
+			return response.json( ) if last else { }
+		headers[ 'X-Goog-Upload-Offset' ] = str( offset )
+		headers[ 'X-Goog-Upload-Command' ] = 'upload, finalize' if last else 'upload'
+		response = requests.post( session[ 'url' ], headers=headers, data=data, timeout=300 )
+		response.raise_for_status( )
+		return response.json( ) if last else { }
+
 	def retrieve( self, file_id: str ) -> Optional[ File ]:
 		"""
 		Purpose: Retrieves the metadata and state of a previously uploaded file.
@@ -301,12 +930,23 @@ class Chat( Gemini ):
 	    audio_uri           : str - URI of processed audio
 	    file_path           : str - Local path for document processing
 	    response_modalities : list - Allowed output formats
+	    max_edge            : int - Longest image edge sent to the model after preprocessing
+	    image_format        : str - Upload encoding for preprocessed images
+	    image_quality       : int - Encoder quality for preprocessed images
+	    image_cache         : ArtifactCache - Preprocessed images keyed by source content hash
+	    metrics             : dict - Bytes and timings of the last image analysis
+	    tokens              : TokenCounter - Pre-flight token estimator
+	    overflow            : str - Pre-flight strategy for prompts over the context window
+	    preflight           : dict - Outcome of the last pre-flight check
 
 	    Methods:
 	    --------
 	    generate_text( prompt, model )      : Generates text based on prompt
 	    analyze_image( prompt, path, mod )  : Processes image content with text
+	    prepare_image( path )               : Downsizes and re-encodes an image for upload
+	    benchmark_image( prompt, path )     : Upload bytes and latency, raw versus preprocessed
 	    summarize_document( prompt, path )  : Uploads and summarizes documents
+	    summarize_pages( prompt, path, k )  : Answers from the k most relevant PDF pages only
 	    web_search( prompt, model )         : Performs a search-grounded text generation
 	    search_maps( prompt, model )        : Grounds responses using Google Search/Maps context
 
@@ -321,6 +961,14 @@ class Chat( Gemini ):
 	audio_uri: Optional[ str ]
 	file_path: Optional[ str ]
 	response_modalities: Optional[ List[ str ] ]
+	max_edge: Optional[ int ]
+	image_format: Optional[ str ]
+	image_quality: Optional[ int ]
+	image_cache: Optional[ ArtifactCache ]
+	metrics: Optional[ Dict[ str, Any ] ]
+	tokens: Optional[ TokenCounter ]
+	overflow: Optional[ str ]
+	preflight: Optional[ Dict[ str, Any ] ]
 	
 	def __init__( self, n: int=1, model: str = 'gemini-2.0-flash', version: str='v1alpha',
 			use_ai: bool=False, temperature: float=0.8, top_p: float=0.9,
@@ -353,6 +1001,14 @@ class Chat( Gemini ):
 		self.image_uri = None;
 		self.audio_uri = None;
 		self.file_path = None
+		self.max_edge = 1536
+		self.image_format = 'WEBP'
+		self.image_quality = 80
+		self.image_cache = ArtifactCache( 'preprocessed' )
+		self.metrics = { }
+		self.tokens = TokenCounter( self.client )
+		self.overflow = 'route'
+		self.preflight = { }
 	
 	@property
 	def model_options( self ) -> List[ str ] | None:
@@ -388,6 +1044,9 @@ class Chat( Gemini ):
 			Purpose:
 			--------
 			Generates a text completion based on the provided prompt and configuration.
+			The prompt is checked against the model's context window first; an oversized
+			prompt is routed to a larger-context model from model_options or, failing that,
+			truncated before the request is sent, instead of being rejected by the API.
 			
 			Parameters:
 			-----------
@@ -400,16 +1059,7 @@ class Chat( Gemini ):
 			
 		"""
 		try:
-			throw_if( 'prompt', prompt )
-			self.contents = prompt;
-			self.model = model
-			self.content_config = GenerateContentConfig( temperature=self.temperature,
-				top_p=self.top_p, max_output_tokens=self.max_tokens,
-				candidate_count=self.candidate_count, system_instruction=self.instructions,
-				frequency_penalty=self.frequency_penalty, presence_penalty=self.presence_penalty )
-			self.content_response = self.client.models.generate_content( model=self.model,
-				contents=self.contents, config=self.content_config )
-			return self.content_response
+			return self._generate( prompt, model )
 		except Exception as e:
 			exception = Error( e );
 			exception.module = 'gemini'
@@ -418,6 +1068,23 @@ class Chat( Gemini ):
 			error = ErrorDialog( exception )
 			error.show( )
 	
+	def _generate( self, prompt: str, model: str ) -> GenerateContentResponse:
+		throw_if( 'prompt', prompt )
+		self.preflight = self.tokens.preflight( prompt, model, self.model_options,
+			self.max_tokens, self.overflow )
+		if self.preflight[ 'action' ] == 'chunk':
+			self.preflight = self.tokens.preflight( prompt, model, reserve=self.max_tokens,
+				strategy='truncate' )
+		self.contents = self.preflight[ 'parts' ][ 0 ];
+		self.model = self.preflight[ 'model' ]
+		self.content_config = GenerateContentConfig( temperature=self.temperature,
+			top_p=self.top_p, max_output_tokens=self.max_tokens,
+			candidate_count=self.candidate_count, system_instruction=self.instructions,
+			frequency_penalty=self.frequency_penalty, presence_penalty=self.presence_penalty )
+		self.content_response = self.client.models.generate_content( model=self.model,
+			contents=self.contents, config=self.content_config )
+		return self.content_response
+	
 	def web_search( self, prompt: str, model: str='gemini-2.0-flash' ) -> Optional[ str ]:
 		"""
 		
@@ -487,18 +1154,23 @@ class Chat( Gemini ):
 			error = ErrorDialog( exception )
 			error.show( )
 	
-	def analyze_image( self, prompt: str, filepath: str, model: str='gemini-2.0-flash' ) -> str | None:
+	def analyze_image( self, prompt: str, filepath: str, model: str='gemini-2.0-flash',
+			preprocess: bool=True ) -> str | None:
 		"""
 			
 			Purpose:
 			--------
-			Analyzes the content of a local image file using multimodal Gemini.
+			Analyzes the content of a local image file using multimodal Gemini. By default the
+			image is first shrunk with preprocess_image; the result is cached by the hash of
+			the source bytes and the preprocessing settings. Original and uploaded byte counts,
+			preprocessing time and request latency are recorded in self.metrics.
 			
 			Parameters:
 			-----------
 			prompt: str - Question or instruction for the analysis.
 			filepath: str - Local filesystem path to the image.
 			model: str - The multimodal Gemini model identifier.
+			preprocess: bool - Downsize and re-encode before upload.
 			
 			Returns:
 			--------
@@ -511,32 +1183,137 @@ class Chat( Gemini ):
 			self.prompt = prompt
 			self.file_path = filepath
 			self.model = model
-			img = PIL.Image.open( self.file_path )
+			self.metrics = { 'original_bytes': os.path.getsize( self.file_path ) }
+			if preprocess:
+				image = self.prepare_image( self.file_path )
+			else:
+				image = PIL.Image.open( self.file_path )
+				self.metrics[ 'upload_bytes' ] = self.metrics[ 'original_bytes' ]
 			self.content_config = GenerateContentConfig( temperature=self.temperature,
 				top_p=self.top_p, max_output_tokens=self.max_tokens )
+			started = time.perf_counter( )
 			response = self.client.models.generate_content( model=self.model,
-				contents=[ img,  self.prompt ], config=self.content_config )
+				contents=[ image,  self.prompt ], config=self.content_config )
+			self.metrics[ 'latency_seconds' ] = time.perf_counter( ) - started
 			return response.text
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'gemini'
 			exception.cause = 'Chat'
-			exception.method = 'analyze_image( self, prompt, filepath, model ) -> str'
+			exception.method = 'analyze_image( self, prompt, filepath, model, preprocess ) -> str'
+			error = ErrorDialog( exception )
+			error.show( )
+
+	def prepare_image( self, filepath: str ) -> Part:
+		"""
+
+			Purpose:
+			--------
+			Returns the preprocessed image as an inline Part, reusing the cached encoding when
+			the same source bytes were prepared with the same settings before.
+
+			Parameters:
+			-----------
+			filepath: str - Local filesystem path to the image.
+
+			Returns:
+			--------
+			Part - Inline image part.
+
+		"""
+		started = time.perf_counter( )
+		sha = hashlib.sha256( )
+		with open( filepath, 'rb' ) as f:
+			for block in iter( lambda: f.read( 1024 * 1024 ), b'' ):
+				sha.update( block )
+		key = f'{sha.hexdigest( )}|{self.max_edge}|{self.image_format}|{self.image_quality}'
+		cached = self.image_cache.get( key )
+		if cached:
+			data, mime_type = cached[ 0 ], LazyImage.sniff( cached[ 0 ] )
+		else:
+			data, mime_type = preprocess_image( filepath, self.max_edge, self.image_format,
+				self.image_quality )
+			self.image_cache.put( key, [ data ] )
+		self.metrics.update( { 'upload_bytes': len( data ),
+		                       'cached': bool( cached ),
+		                       'preprocess_seconds': time.perf_counter( ) - started } )
+		return Part.from_bytes( data=data, mime_type=mime_type )
+	
+	def benchmark_image( self, prompt: str, filepath: str, model: str='gemini-2.0-flash',
+			runs: int=3 ) -> Dict[ str, float ] | None:
+		"""
+
+			Purpose:
+			--------
+			Sends the same image analysis request with the original file and with the
+			preprocessed image, alternating runs times, and reports the upload bytes and
+			median request latency of each.
+
+			Parameters:
+			-----------
+			prompt: str - Question or instruction for the analysis.
+			filepath: str - Local filesystem path to the image.
+			model: str - The multimodal Gemini model identifier.
+			runs: int - Requests per variant.
+
+			Returns:
+			--------
+			Dict[ str, float ] - raw_bytes, upload_bytes, raw_latency_seconds, latency_seconds,
+			preprocess_seconds and speedup.
+
+		"""
+		try:
+			throw_if( 'prompt', prompt )
+			throw_if( 'filepath', filepath )
+			self.metrics = { }
+			self.content_config = GenerateContentConfig( temperature=self.temperature,
+				top_p=self.top_p, max_output_tokens=self.max_tokens )
+			started = time.perf_counter( )
+			image = self.prepare_image( filepath )
+			preprocess = time.perf_counter( ) - started
+			raw, processed = [ ], [ ]
+			for _ in range( max( 1, runs ) ):
+				for contents, times in (( PIL.Image.open( filepath ), raw ), ( image, processed )):
+					started = time.perf_counter( )
+					self.client.models.generate_content( model=model, contents=[ contents, prompt ],
+						config=self.content_config )
+					times.append( time.perf_counter( ) - started )
+			raw_latency = sorted( raw )[ len( raw ) // 2 ]
+			latency = sorted( processed )[ len( processed ) // 2 ]
+			return { 'raw_bytes': os.path.getsize( filepath ),
+			         'upload_bytes': self.metrics[ 'upload_bytes' ],
+			         'raw_latency_seconds': raw_latency,
+			         'latency_seconds': latency,
+			         'preprocess_seconds': preprocess,
+			         'speedup': raw_latency / (latency + preprocess) }
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'gemini'
+			exception.cause = 'Chat'
+			exception.method = ('benchmark_image( self, prompt, filepath, model, runs ) '
+			                    '-> Dict[ str, float ]')
 			error = ErrorDialog( exception )
 			error.show( )
 	
-	def summarize_document( self, prompt: str, filepath: str, model: str='gemini-2.0-flash' ) -> str | None:
+	def summarize_document( self, prompt: str, filepath: str, model: str='gemini-2.0-flash',
+			progress: Callable[ [ int, int ], None ]=None ) -> str | None:
 		"""
 			
 			Purpose:
 			-------
-			Uploads and summarizes a PDF or text document.
+			Uploads and summarizes a PDF or text document. Its size is checked against the
+			model's context window before anything is uploaded, at PDF_PAGE_TOKENS per page for
+			a PDF or by the text of any other file; a document that is too large is routed to
+			a larger-context model from model_options, and one that fits no model is rejected
+			without an upload.
 			
 			Parameters:
 			-----------
 			prompt: str - Summarization instructions.
 			filepath: str - Path to the document file.
 			model: str - The model identifier for processing.
+			progress: Callable[ [ int, int ], None ] - Optional upload progress callback.
+			
 			Returns:
 			--------
 			Optional[ str ] - The document summary or None on failure.
@@ -549,24 +1326,138 @@ class Chat( Gemini ):
 			self.file_path = filepath
 			self.model = model
 			self.content_config = GenerateContentConfig( temperature=self.temperature )
-			if self.use_vertex:
-				with open( self.file_path, 'rb' ) as f:
-					doc_part = Part.from_bytes( data=f.read( ), mime_type="application/pdf" )
-				response = self.client.models.generate_content( model=self.model,
-					contents=[ doc_part, self.prompt ], config=self.content_config )
-			else:
-				uploaded_file = self.client.files.upload( path=self.file_path )
-				response = self.client.models.generate_content( model=self.model,
-					contents=[ uploaded_file, self.prompt ], config=self.content_config )
+			mime_type = mimetypes.guess_type( self.file_path )[ 0 ] or 'application/pdf'
+			self.preflight = self._preflight_document( self.file_path, mime_type )
+			self.model = self.preflight[ 'model' ]
+			doc_part = file_part( self.file_path, mime_type, self.use_vertex, self.api_version,
+				progress )
+			response = self.client.models.generate_content( model=self.model,
+				contents=[ doc_part, self.prompt ], config=self.content_config )
+			return response.text
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'gemini'
+			exception.cause = 'Chat'
+			exception.method = 'summarize_document( self, prompt, filepath, model ) -> str'
+			error = ErrorDialog( exception )
+			error.show( )
+
+	def _preflight_document( self, path: str, mime_type: str ) -> Dict[ str, Any ]:
+		if mime_type == 'application/pdf':
+			with fitz.open( path ) as doc:
+				pages = doc.page_count
+			text = self.prompt
+		else:
+			with open( path, 'r', encoding='utf-8', errors='replace' ) as f:
+				text = f'{f.read( )}\n{self.prompt}'
+			pages = 0
+		reserve = self.max_tokens + pages * cfg.PDF_PAGE_TOKENS
+		check = self.tokens.preflight( text, self.model, self.model_options, reserve )
+		if check[ 'action' ] not in ('none', 'route'):
+			raise ValueError( f'{path} needs about {check[ "tokens" ] + reserve} tokens, more '
+			                  'than any model in model_options accepts' )
+		return check
+
+	def summarize_pages( self, prompt: str, filepath: str, model: str='gemini-2.0-flash',
+			top_k: int=5, as_text: bool=False ) -> str | None:
+		"""
+
+			Purpose:
+			-------
+			Answers a question about a PDF using only its most relevant pages. Page text is
+			extracted locally with PyMuPDF, every page is scored against the prompt with BM25,
+			and the top_k pages are sent, in document order, either as a trimmed PDF or as
+			page-labelled text. Page counts, bytes, estimated tokens and latency for the full
+			and trimmed documents are recorded in self.metrics. Pages with no matching terms are
+			dropped unless nothing matches at all.
+
+			Parameters:
+			-----------
+			prompt: str - Question or instructions.
+			filepath: str - Path to the PDF.
+			model: str - The model identifier for processing.
+			top_k: int - Number of pages to send.
+			as_text: bool - Send extracted text instead of a trimmed PDF.
+
+			Returns:
+			--------
+			Optional[ str ] - The answer or None on failure.
+
+		"""
+		try:
+			throw_if( 'prompt', prompt )
+			throw_if( 'filepath', filepath )
+			self.prompt = prompt
+			self.file_path = filepath
+			self.model = model
+			started = time.perf_counter( )
+			with fitz.open( self.file_path ) as doc:
+				texts = [ page.get_text( ) for page in doc ]
+				scores = self._bm25( prompt, texts )
+				ranked = sorted( range( len( texts ) ), key=lambda i: scores[ i ], reverse=True )
+				pages = sorted( i for i in ranked[ :top_k ] if scores[ i ] > 0 ) or sorted( ranked[ :top_k ] )
+				if as_text:
+					body = '\n\n'.join( f'[Page {p + 1}]\n{texts[ p ]}' for p in pages )
+					part = Part.from_text( text=body )
+					sent_bytes = len( body.encode( 'utf-8' ) )
+				else:
+					with fitz.open( ) as trimmed:
+						for p in pages:
+							trimmed.insert_pdf( doc, from_page=p, to_page=p )
+						data = trimmed.tobytes( garbage=3, deflate=True )
+					part = Part.from_bytes( data=data, mime_type='application/pdf' )
+					sent_bytes = len( data )
+			selected = time.perf_counter( )
+			self.content_config = GenerateContentConfig( temperature=self.temperature )
+			response = self.client.models.generate_content( model=self.model,
+				contents=[ part, self.prompt ], config=self.content_config )
+			full_tokens = sum( self.tokens.estimate( t, self.model ) for t in texts )
+			sent_tokens = sum( self.tokens.estimate( texts[ p ], self.model ) for p in pages )
+			self.metrics = { 'pages_total': len( texts ),
+			                 'pages_sent': [ p + 1 for p in pages ],
+			                 'bytes_total': os.path.getsize( self.file_path ),
+			                 'bytes_sent': sent_bytes,
+			                 'tokens_total': full_tokens,
+			                 'tokens_sent': sent_tokens,
+			                 'tokens_saved': full_tokens - sent_tokens,
+			                 'selection_seconds': selected - started,
+			                 'latency_seconds': time.perf_counter( ) - selected }
 			return response.text
 		except Exception as e:
 			exception = Error( e )
 			exception.module = 'gemini'
 			exception.cause = 'Chat'
-			exception.method = 'summarize_document( self, prompt, filepath, model ) -> str'
+			exception.method = ('summarize_pages( self, prompt, filepath, model, top_k, as_text ) '
+			                    '-> str')
 			error = ErrorDialog( exception )
 			error.show( )
 
+	@staticmethod
+	def _bm25( query: str, documents: List[ str ], k1: float=1.5, b: float=0.75 ) -> List[ float ]:
+		tokenize = lambda text: re.findall( r'[a-z0-9]+', text.lower( ) )
+		docs = [ tokenize( d ) for d in documents ]
+		terms = set( tokenize( query ) )
+		if not docs or not terms:
+			return [ 0.0 ] * len( docs )
+		average = sum( len( d ) for d in docs ) / len( docs ) or 1.0
+		frequencies = [ { } for _ in docs ]
+		for counts, words in zip( frequencies, docs ):
+			for word in words:
+				if word in terms:
+					counts[ word ] = counts.get( word, 0 ) + 1
+		scores = [ 0.0 ] * len( docs )
+		for term in terms:
+			df = sum( 1 for counts in frequencies if term in counts )
+			if df == 0:
+				continue
+			idf = math.log( 1 + (len( docs ) - df + 0.5) / (df + 0.5) )
+			for i, counts in enumerate( frequencies ):
+				tf = counts.get( term, 0 )
+				if tf:
+					norm = k1 * (1 - b + b * len( docs[ i ] ) / average)
+					scores[ i ] += idf * tf * (k1 + 1) / (tf + norm)
+		return scores
+
 class Embedding( Gemini ):
 	'''
 
@@ -593,6 +1484,7 @@ class Embedding( Gemini ):
 		Methods:
 		--------
 		generate( text, model ) : Creates an embedding vector for input text
+		generate_many( texts, model ) : Embeds texts in concurrent batches
 
 	'''
 	client: Optional[ genai.Client ]
@@ -674,6 +1566,50 @@ class Embedding( Gemini ):
 			exception.method = 'generate( self, text, model ) -> List[ float ]'
 			error = ErrorDialog( exception )
 			error.show( )
+	
+	def generate_many( self, texts: List[ str ], model: str='text-embedding-004',
+			batch_size: int=100, max_workers: int=4 ) -> np.ndarray | None:
+		"""
+			
+			Purpose:
+			---------
+			Embeds many texts by sending batch_size texts per request, with up to
+			max_workers requests in flight at once.
+			
+			Parameters:
+			-----------
+			texts: List[ str ] - Input strings.
+			model: str - Embedding model identifier.
+			batch_size: int - Texts per embed_content request.
+			max_workers: int - Concurrent requests.
+			
+			Returns:
+			--------
+			np.ndarray - A (len( texts ), dimensions) float32 matrix in input order.
+		
+		"""
+		try:
+			throw_if( 'texts', texts )
+			self.model = model
+			self.embedding_config = EmbedContentConfig( task_type=self.task_type )
+			batches = [ texts[ i:i + batch_size ] for i in range( 0, len( texts ), batch_size ) ]
+			def embed( batch: List[ str ] ) -> List[ List[ float ] ]:
+				response = self.client.models.embed_content( model=self.model, contents=batch,
+					config=self.embedding_config )
+				return [ e.values for e in response.embeddings ]
+			with ThreadPoolExecutor( max_workers=max_workers ) as pool:
+				rows = [ row for batch in pool.map( embed, batches ) for row in batch ]
+			self.embedding = np.asarray( rows, dtype=np.float32 )
+			self.dimensions = self.embedding.shape[ 1 ]
+			return self.embedding
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'gemini'
+			exception.cause = 'Embedding'
+			exception.method = ('generate_many( self, texts, model, batch_size, max_workers ) '
+			                    '-> np.ndarray')
+			error = ErrorDialog( exception )
+			error.show( )
 
 class TTS( Gemini ):
 	"""
@@ -692,10 +1628,14 @@ class TTS( Gemini ):
 	    response_format : str - Audio format
 	    input_text      : str - Original text
 	    use_vertex      : bool - Integration flag
+	    chunk_chars     : int - Maximum characters per streamed synthesis request
+	    max_workers     : int - Concurrent synthesis requests
+	    metrics         : list - Per-chunk latency of the last streamed synthesis
 
 	    Methods:
 	    --------
 	    create_audio( text, path, format, speed, voice ) : Saves multimodal audio to file
+	    stream_audio( text, path, voice, on_chunk )      : Writes a growing WAV chunk by chunk
 
     """
 	speed: Optional[ float ]
@@ -706,6 +1646,9 @@ class TTS( Gemini ):
 	response_format: Optional[ str ]
 	input_text: Optional[ str ]
 	use_vertex: Optional[ bool ]
+	chunk_chars: Optional[ int ]
+	max_workers: Optional[ int ]
+	metrics: Optional[ List[ Dict[ str, Any ] ] ]
 	
 	def __init__( self, n: int=1, model: str='gemini-2.0-flash', version: str='v1alpha',
 			use_ai: bool=False, temperature: float=0.8, top_p: float=0.9, frequency: float=0.0,
@@ -730,6 +1673,9 @@ class TTS( Gemini ):
 		self.audio_path = None
 		self.input_text = None
 		self.content_config = None
+		self.chunk_chars = 400
+		self.max_workers = 4
+		self.metrics = [ ]
 	
 	@property
 	def model_options( self ) -> List[ str ] | None:
@@ -795,6 +1741,110 @@ class TTS( Gemini ):
 			error = ErrorDialog( exception )
 			error.show( )
 
+	def stream_audio( self, text: str, filepath: str, voice: str='Puck', max_workers: int=None,
+			on_chunk: Callable[ [ int, str ], None ]=None ) -> Optional[ str ]:
+		"""
+
+			Purpose:
+			--------
+			Splits text at sentence boundaries, synthesizes the chunks concurrently and appends
+			each one, in order, to a 16-bit mono WAV at cfg.SAMPLE_RATE as soon as it and every
+			chunk before it are ready. The WAV header is rewritten after each append, so the
+			file is playable while later chunks are still being synthesized.
+
+			Parameters:
+			-----------
+			text: str - Input text string.
+			filepath: str - Target local WAV path.
+			voice: str - Persona name.
+			max_workers: int - Concurrent synthesis requests.
+			on_chunk: Callable[ [ int, str ], None ] - Called with ( index, filepath ) after
+			each chunk is written.
+
+			Returns:
+			--------
+			Optional[ str ] - Local path to the created file or None.
+
+		"""
+		try:
+			throw_if( 'text', text )
+			throw_if( 'filepath', filepath )
+			self.input_text = text
+			self.audio_path = filepath
+			self.voice = voice
+			self.response_format = 'WAV'
+			self.max_workers = max_workers or self.max_workers
+			speech = types.SpeechConfig( voice_config=types.VoiceConfig(
+				prebuilt_voice_config=types.PrebuiltVoiceConfig( voice_name=self.voice ) ) )
+			self.content_config = GenerateContentConfig( response_modalities=[ 'AUDIO' ],
+				temperature=self.temperature, speech_config=speech )
+			chunks = self._split_sentences( self.input_text, self.chunk_chars )
+			self.metrics = [ ]
+			started = time.perf_counter( )
+			with ThreadPoolExecutor( max_workers=self.max_workers ) as pool, \
+					wave.open( self.audio_path, 'wb' ) as wav:
+				wav.setnchannels( 1 )
+				wav.setsampwidth( 2 )
+				wav.setframerate( cfg.SAMPLE_RATE )
+				futures = [ pool.submit( self._synthesize, chunk ) for chunk in chunks ]
+				for index, future in enumerate( futures ):
+					samples, latency = future.result( )
+					wav.writeframes( samples.tobytes( ) )
+					self.metrics.append( { 'index': index,
+					                       'chars': len( chunks[ index ] ),
+					                       'latency': latency,
+					                       'seconds': len( samples ) / cfg.SAMPLE_RATE,
+					                       'ready': time.perf_counter( ) - started } )
+					if on_chunk is not None:
+						on_chunk( index, self.audio_path )
+			return self.audio_path
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'gemini'
+			exception.cause = 'TTS'
+			exception.method = ('stream_audio( self, text, filepath, voice, max_workers, '
+			                    'on_chunk ) -> str')
+			error = ErrorDialog( exception )
+			error.show( )
+
+	@staticmethod
+	def _split_sentences( text: str, limit: int ) -> List[ str ]:
+		sentences = re.split( r'(?<=[.!?])\s+|\n{2,}', text.strip( ) )
+		chunks, current = [ ], ''
+		for sentence in (s.strip( ) for s in sentences):
+			if not sentence:
+				continue
+			if current and len( current ) + len( sentence ) + 1 > limit:
+				chunks.append( current )
+				current = sentence
+			else:
+				current = f'{current} {sentence}'.strip( )
+		if current:
+			chunks.append( current )
+		return chunks
+
+	def _synthesize( self, chunk: str ) -> Tuple[ np.ndarray, float ]:
+		begin = time.perf_counter( )
+		response = self.client.models.generate_content( model=self.model,
+			contents=f'Read the following aloud: {chunk}', config=self.content_config )
+		latency = time.perf_counter( ) - begin
+		blob = next( p.inline_data for p in response.candidates[ 0 ].content.parts
+		             if p.inline_data )
+		mime = (blob.mime_type or '').lower( )
+		if 'l16' in mime or 'pcm' in mime:
+			match = re.search( r'rate=(\d+)', mime )
+			rate = int( match.group( 1 ) ) if match else 24000
+			audio = np.frombuffer( blob.data, dtype='<i2' ).astype( np.float32 ) / 32768.0
+		else:
+			audio, rate = sf.read( io.BytesIO( blob.data ), dtype='float32', always_2d=True )
+			audio = audio.mean( axis=1 )
+		if rate != cfg.SAMPLE_RATE and len( audio ) > 0:
+			count = int( round( len( audio ) * cfg.SAMPLE_RATE / rate ) )
+			audio = np.interp( np.linspace( 0, len( audio ) - 1, count ),
+				np.arange( len( audio ) ), audio )
+		samples = np.clip( audio * 32767.0, -32768, 32767 ).astype( '<i2' )
+		return samples, latency
+
 class Transcription( Gemini ):
 	"""
 
@@ -804,20 +1854,31 @@ class Transcription( Gemini ):
 
 	    Attributes:
 	    -----------
-	    client     : Client - GenAI instance
-	    transcript : str - Text result
-	    file_path  : str - Path to audio file
-	    use_vertex : bool - Integration flag
+	    client          : Client - GenAI instance
+	    transcript      : str - Text result
+	    file_path       : str - Path to audio file
+	    use_vertex      : bool - Integration flag
+	    segment_seconds : float - Target length of a long-audio segment
+	    overlap_seconds : float - Audio shared by adjacent segments
+	    max_workers     : int - Concurrent segment requests
+	    segments        : list - Per-segment start, end, text and latency
+	    tokens          : TokenCounter - Pre-flight context window checks
 
 	    Methods:
 	    --------
-	    transcribe( path, model ) : Transcribes local audio file to text
+	    transcribe( path, model )      : Transcribes local audio file to text
+	    transcribe_long( path, model ) : Transcribes long audio in concurrent silence-split segments
 
     """
 	client: Optional[ genai.Client ]
 	transcript: Optional[ str ]
 	file_path: Optional[ str ]
 	use_vertex: Optional[ bool ]
+	segment_seconds: Optional[ float ]
+	overlap_seconds: Optional[ float ]
+	max_workers: Optional[ int ]
+	segments: Optional[ List[ Dict[ str, Any ] ] ]
+	tokens: Optional[ TokenCounter ]
 	
 	def __init__( self, n: int=1, model: str='gemini-2.0-flash', version: str='v1alpha',
 			use_ai: bool=False, temperature: float=0.8, top_p: float=0.9, frequency: float=0.0,
@@ -838,6 +1899,11 @@ class Transcription( Gemini ):
 		self.transcript = None
 		self.file_path = None
 		self.content_config = None
+		self.segment_seconds = 120.0
+		self.overlap_seconds = 2.0
+		self.max_workers = 4
+		self.segments = [ ]
+		self.tokens = TokenCounter( self.client )
 	
 	@property
 	def model_options( self ) -> List[ str ] | None:
@@ -855,17 +1921,22 @@ class Transcription( Gemini ):
 		         'German',
 		         'Chinese' ]
 	
-	def transcribe( self, path: str, model: str='gemini-2.0-flash' ) -> Optional[ str ]:
+	def transcribe( self, path: str, model: str='gemini-2.0-flash',
+			progress: Callable[ [ int, int ], None ]=None ) -> Optional[ str ]:
 		"""
 			
 			Purpose:
 			---------
-			Transcribes an audio file into text using multimodal GenAI.
+			Transcribes an audio file into text using multimodal GenAI. The audio's token
+			cost is estimated from its duration before the upload; a recording that fits no
+			model in model_options is rejected without uploading it ( use transcribe_long ).
 			
 			Parameters:
 			-----------
 			path: str - Local path to the source audio.
 			model: str - Specific GenAI model ID.
+			progress: Callable[ [ int, int ], None ] - Optional upload progress callback.
+			
 			Returns:
 			--------
 			Optional[ str ] - Verbatim text transcript.
@@ -876,17 +1947,22 @@ class Transcription( Gemini ):
 			self.file_path = path
 			self.model = model
 			self.content_config = GenerateContentConfig( temperature=self.temperature )
-			if self.use_vertex:
-				with open( self.file_path, 'rb' ) as f:
-					audio_part = Part.from_bytes( data=f.read( ), mime_type="audio/mpeg" )
-				response = self.client.models.generate_content( model=self.model,
-					contents=[ audio_part,"Provide a verbatim transcription." ],
-					config=self.content_config )
-			else:
-				uploaded_file = self.client.files.upload( path=self.file_path )
-				response = self.client.models.generate_content( model=self.model,
-					contents=[ uploaded_file, "Provide a verbatim transcription." ],
-					config=self.content_config )
+			mime_type = mimetypes.guess_type( self.file_path )[ 0 ] or 'audio/mpeg'
+			try:
+				seconds = sf.info( self.file_path ).duration
+			except RuntimeError:
+				seconds = os.path.getsize( self.file_path ) / cfg.AUDIO_BYTES_PER_SECOND
+			tokens = math.ceil( seconds * cfg.AUDIO_TOKENS_PER_SECOND )
+			routed = self.tokens.route( tokens, self.model, self.model_options, self.max_tokens )
+			if routed is None:
+				raise ValueError( f'{self.file_path} needs about {tokens} tokens of audio, more '
+				                  'than any model in model_options accepts; use transcribe_long' )
+			self.model = routed
+			audio_part = file_part( self.file_path, mime_type, self.use_vertex, self.api_version,
+				progress )
+			response = self.client.models.generate_content( model=self.model,
+				contents=[ audio_part, "Provide a verbatim transcription." ],
+				config=self.content_config )
 			self.transcript = response.text
 			return self.transcript
 		except Exception as e:
@@ -897,6 +1973,249 @@ class Transcription( Gemini ):
 			error = ErrorDialog( ex )
 			error.show( )
 
+	def transcribe_long( self, path: str, model: str='gemini-2.0-flash', max_workers: int=None,
+			segment_seconds: float=None, overlap_seconds: float=None ) -> Optional[ str ]:
+		"""
+
+			Purpose:
+			---------
+			Transcribes a long recording by splitting it at the quietest point near every
+			segment boundary, transcribing the segments concurrently and stitching the text
+			back together in order. Adjacent segments share a short overlap so no words are
+			lost at a cut; words repeated across the seam are removed when stitching.
+			Only the audio around a boundary and the segment being encoded are held in memory.
+
+			Parameters:
+			-----------
+			path: str - Local path to the source audio ( any format soundfile can read ).
+			model: str - Specific GenAI model ID.
+			max_workers: int - Concurrent segment requests.
+			segment_seconds: float - Target segment length.
+			overlap_seconds: float - Audio shared by adjacent segments.
+
+			Returns:
+			--------
+			Optional[ str ] - Transcript with one [HH:MM:SS] timestamped paragraph per segment.
+
+		"""
+		try:
+			throw_if( 'path', path )
+			self.file_path = path
+			self.model = model
+			self.max_workers = max_workers or self.max_workers
+			self.segment_seconds = segment_seconds or self.segment_seconds
+			self.overlap_seconds = self.overlap_seconds if overlap_seconds is None else overlap_seconds
+			self.content_config = GenerateContentConfig( temperature=self.temperature )
+			info = sf.info( self.file_path )
+			bounds = self._split_points( info.samplerate, info.frames )
+			windows = [ (bounds[ i ], bounds[ i + 1 ]) for i in range( len( bounds ) - 1 ) ]
+			with ThreadPoolExecutor( max_workers=self.max_workers ) as pool:
+				futures = [ pool.submit( self._transcribe_segment, i, start, end, info.samplerate )
+				            for i, (start, end) in enumerate( windows ) ]
+				self.segments = [ f.result( ) for f in futures ]
+			paragraphs = [ ]
+			previous = ''
+			for segment in self.segments:
+				text = self._trim_overlap( previous, segment[ 'text' ] )
+				previous = segment[ 'text' ]
+				stamp = self._timestamp( segment[ 'start' ] )
+				paragraphs.append( f'[{stamp}] {text}'.rstrip( ) )
+			self.transcript = '\n\n'.join( paragraphs )
+			return self.transcript
+		except Exception as e:
+			ex = Error( e )
+			ex.module = 'gemini'
+			ex.cause = 'Transcription'
+			ex.method = ('transcribe_long( self, path, model, max_workers, segment_seconds, '
+			             'overlap_seconds ) -> str')
+			error = ErrorDialog( ex )
+			error.show( )
+
+	def _split_points( self, rate: int, frames: int ) -> List[ int ]:
+		segment = int( self.segment_seconds * rate )
+		search = min( int( 10 * rate ), segment // 4 )
+		block = max( 1, int( 0.05 * rate ) )
+		bounds = [ 0 ]
+		target = segment
+		while target < frames - segment // 4:
+			lo, hi = max( bounds[ -1 ] + block, target - search ), min( frames, target + search )
+			audio, _ = sf.read( self.file_path, start=lo, stop=hi, dtype='float32',
+				always_2d=True )
+			mono = audio.mean( axis=1 )
+			count = len( mono ) // block
+			if count == 0:
+				cut = target
+			else:
+				blocks = mono[ : count * block ].reshape( count, block )
+				rms = np.sqrt( np.mean( blocks * blocks, axis=1 ) )
+				cut = lo + int( np.argmin( rms ) ) * block + block // 2
+			bounds.append( cut )
+			target = cut + segment
+		bounds.append( frames )
+		return bounds
+
+	def _transcribe_segment( self, index: int, start: int, end: int,
+			rate: int ) -> Dict[ str, Any ]:
+		overlap = int( self.overlap_seconds * rate )
+		audio, _ = sf.read( self.file_path, start=max( 0, start - overlap ), stop=end,
+			dtype='float32', always_2d=True )
+		target = cfg.TRANSCRIBE_SAMPLE_RATE
+		buffer = io.BytesIO( )
+		sf.write( buffer, self._resample( audio.mean( axis=1 ), rate, target ), target,
+			format='WAV', subtype='PCM_16' )
+		data = buffer.getvalue( )
+		begin = time.perf_counter( )
+		if len( data ) <= cfg.UPLOAD_INLINE_LIMIT:
+			part = Part.from_bytes( data=data, mime_type='audio/wav' )
+		else:
+			with tempfile.NamedTemporaryFile( suffix='.wav', delete=False ) as f:
+				f.write( data )
+			try:
+				part = file_part( f.name, 'audio/wav', self.use_vertex, self.api_version )
+			finally:
+				os.remove( f.name )
+		response = self.client.models.generate_content( model=self.model,
+			contents=[ part, 'Provide a verbatim transcription. Return only the spoken words.' ],
+			config=self.content_config )
+		return { 'index': index,
+		         'start': start / rate,
+		         'end': end / rate,
+		         'text': (response.text or '').strip( ),
+		         'latency': time.perf_counter( ) - begin }
+
+	@staticmethod
+	def _resample( audio: np.ndarray, rate: int, target: int ) -> np.ndarray:
+		if rate == target or len( audio ) == 0:
+			return audio
+		width = int( round( rate / target ) )
+		if width > 1:
+			audio = np.convolve( audio, np.full( width, 1.0 / width, dtype=np.float32 ), mode='same' )
+		count = max( 1, int( round( len( audio ) * target / rate ) ) )
+		positions = np.arange( count ) * (rate / target)
+		return np.interp( positions, np.arange( len( audio ) ), audio ).astype( np.float32 )
+
+	@staticmethod
+	def _trim_overlap( previous: str, current: str, window: int=40, minimum: int=3 ) -> str:
+		words = current.split( )
+		if not previous or not words:
+			return current
+		def norm( w ):
+			return re.sub( r'[^\w]', '', w.lower( ) )
+		tail = [ norm( w ) for w in previous.split( )[ -window: ] ]
+		head = [ norm( w ) for w in words[ : window ] ]
+		for size in range( min( len( tail ), len( head ) ), minimum - 1, -1 ):
+			if tail[ -size: ] == head[ : size ]:
+				return ' '.join( words[ size: ] )
+		return current
+
+	@staticmethod
+	def _timestamp( seconds: float ) -> str:
+		seconds = int( seconds )
+		return f'{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}'
+
+class TranslationMemory( ):
+	"""
+
+	    Purpose
+	    ___________
+	    Persistent translation memory backed by a SQLite file. Entries are keyed by the SHA-256
+	    of the source text together with the source language, target language and model, so a
+	    segment that has been translated once is never sent to the API again.
+
+	    Attributes:
+	    -----------
+	    db_path    : str - Location of the memory database
+	    connection : Connection - Shared SQLite connection
+	    lock       : Lock - Serializes access across worker threads
+
+	    Methods:
+	    --------
+	    lookup( texts, source, target, model ) : Returns cached translations by source text
+	    store( pairs, source, target, model )  : Saves ( text, translation ) pairs
+
+    """
+	db_path: Optional[ str ]
+	connection: Optional[ sqlite3.Connection ]
+	lock: Optional[ threading.Lock ]
+
+	def __init__( self, path: str=None ):
+		self.db_path = str( path or Path( cfg.CACHE_DIR ) / 'translations.db' )
+		Path( self.db_path ).parent.mkdir( parents=True, exist_ok=True )
+		self.connection = sqlite3.connect( self.db_path, check_same_thread=False )
+		self.lock = threading.Lock( )
+		self.connection.execute( """
+			CREATE TABLE IF NOT EXISTS memory
+			(
+				text_hash   TEXT NOT NULL,
+				source      TEXT NOT NULL,
+				target      TEXT NOT NULL,
+				model       TEXT NOT NULL,
+				translation TEXT NOT NULL,
+				created_at  TEXT DEFAULT CURRENT_TIMESTAMP,
+				PRIMARY KEY ( text_hash, source, target, model )
+			)""" )
+		self.connection.commit( )
+
+	@staticmethod
+	def digest( text: str ) -> str:
+		return hashlib.sha256( text.encode( 'utf-8' ) ).hexdigest( )
+
+	def lookup( self, texts: List[ str ], source: str, target: str,
+			model: str ) -> Dict[ str, str ]:
+		"""
+
+			Purpose:
+			--------
+			Returns the cached translations for the given texts.
+
+			Parameters:
+			-----------
+			texts: List[ str ] - Source segments.
+			source: str - Source language.
+			target: str - Target language.
+			model: str - Model identifier.
+
+			Returns:
+			--------
+			Dict[ str, str ] - Source text mapped to translation for every hit.
+
+		"""
+		hashes = { self.digest( t ): t for t in texts }
+		found = { }
+		keys = list( hashes )
+		with self.lock:
+			for i in range( 0, len( keys ), 500 ):
+				batch = keys[ i: i + 500 ]
+				marks = ', '.join( '?' for _ in batch )
+				rows = self.connection.execute(
+					f'SELECT text_hash, translation FROM memory WHERE source=? AND target=? '
+					f'AND model=? AND text_hash IN ({marks})', (source, target, model, *batch) )
+				for text_hash, translation in rows:
+					found[ hashes[ text_hash ] ] = translation
+		return found
+
+	def store( self, pairs: List[ Tuple[ str, str ] ], source: str, target: str,
+			model: str ) -> None:
+		"""
+
+			Purpose:
+			--------
+			Saves translated segments in a single transaction.
+
+			Parameters:
+			-----------
+			pairs: List[ Tuple[ str, str ] ] - ( source text, translation ) pairs.
+			source: str - Source language.
+			target: str - Target language.
+			model: str - Model identifier.
+
+		"""
+		rows = [ (self.digest( t ), source, target, model, tr) for t, tr in pairs ]
+		with self.lock:
+			self.connection.executemany( 'INSERT OR REPLACE INTO memory (text_hash, source, '
+			                             'target, model, translation) VALUES (?, ?, ?, ?, ?)', rows )
+			self.connection.commit( )
+
 class Translation( Gemini ):
 	"""
 
@@ -910,16 +2229,28 @@ class Translation( Gemini ):
 	    target_language : str - Destination language
 	    source_language : str - Source language
 	    use_vertex      : bool - Cloud integration flag
+	    memory          : TranslationMemory - Persistent cache of translated segments
+	    batch_chars     : int - Maximum source characters packed into one request
+	    max_workers     : int - Concurrent batch requests
+	    failed          : list - Segments left untranslated by the last document run
+	    tokens          : TokenCounter - Token estimator used to size batches
 
 	    Methods:
 	    --------
-	    translate( text, target, source ) : Translates text strings
+	    translate( text, target, source )          : Translates text strings
+	    translate_many( texts, target, source )    : Translates many segments in batched requests
+	    translate_document( path, target, source ) : Translates a document preserving structure
 
     """
 	client: Optional[ genai.Client ]
 	target_language: Optional[ str ]
 	source_language: Optional[ str ]
 	use_vertex: Optional[ bool ]
+	memory: Optional[ TranslationMemory ]
+	batch_chars: Optional[ int ]
+	max_workers: Optional[ int ]
+	failed: Optional[ List[ str ] ]
+	tokens: Optional[ TokenCounter ]
 	
 	def __init__( self, n: int=1, model: str='gemini-2.0-flash', version: str='v1alpha',
 			use_ai: bool=False, temperature: float=0.8, top_p: float=0.9,
@@ -941,6 +2272,11 @@ class Translation( Gemini ):
 		self.target_language = None
 		self.source_language = None
 		self.content_config = None
+		self.memory = TranslationMemory( )
+		self.batch_chars = 8000
+		self.max_workers = 4
+		self.failed = [ ]
+		self.tokens = TokenCounter( self.client )
 	
 	@property
 	def model_options( self ) -> List[ str ] | None:
@@ -993,6 +2329,188 @@ class Translation( Gemini ):
 			error = ErrorDialog( exception )
 			error.show( )
 
+	def translate_many( self, texts: List[ str ], target: str,
+			source: str='Auto' ) -> Optional[ List[ str ] ]:
+		"""
+
+			Purpose:
+			-------
+			Translates a list of segments. Segments already in the translation memory are
+			returned without a request; the rest are de-duplicated, packed into JSON batches of
+			at most batch_chars source characters, translated concurrently and saved to memory.
+
+			Parameters:
+			-----------
+			texts: List[ str ] - Segments to translate.
+			target: str - Target language.
+			source: str - Source language.
+
+			Returns:
+			--------
+			Optional[ List[ str ] ] - Translations in the same order as texts.
+
+		"""
+		try:
+			throw_if( 'texts', texts )
+			self.target_language = target
+			self.source_language = source
+			found, failed = self._run_batches( texts, self.batch_chars )
+			if failed:
+				raise RuntimeError( f'{len( failed )} segment(s) were not translated; '
+				                    f'completed segments are saved, so a retry resumes.' )
+			return [ found.get( t, t ) for t in texts ]
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'gemini'
+			exception.cause = 'Translation'
+			exception.method = 'translate_many( self, texts, target, source ) -> List[ str ]'
+			error = ErrorDialog( exception )
+			error.show( )
+
+	def translate_document( self, path: str, target: str, source: str='Auto',
+			output: str=None, budget_tokens: int=None ) -> Optional[ str ]:
+		"""
+
+			Purpose:
+			-------
+			Translates a whole document. The text is split into headings and paragraphs,
+			section numbering such as "SEC. 101.", "(a)" or "2.3" is set aside so it is kept
+			verbatim, and the paragraph bodies are translated concurrently in batches that stay
+			within budget_tokens of source text per request. The translation is reassembled in
+			document order. Every finished batch is saved to the translation memory, so after a
+			partial failure the untranslated paragraphs are left in the source language, listed
+			in self.failed, and calling again only sends those.
+
+			Parameters:
+			-----------
+			path: str - Path to a UTF-8 text document.
+			target: str - Target language.
+			source: str - Source language.
+			output: str - Optional path the translation is written to.
+			budget_tokens: int - Source tokens per request; defaults to half of max_tokens and
+			is converted to characters with the calibrated TokenCounter ratio.
+
+			Returns:
+			--------
+			Optional[ str ] - The translated document.
+
+		"""
+		try:
+			throw_if( 'path', path )
+			self.target_language = target
+			self.source_language = source
+			with open( path, 'r', encoding='utf-8', errors='replace' ) as f:
+				segments = self._segment_document( f.read( ) )
+			budget = budget_tokens or max( 256, self.max_tokens // 2 )
+			bodies = [ body for _, body, _ in segments ]
+			found, self.failed = self._run_batches( bodies,
+				self.tokens.chars_for( budget, self.model ) )
+			blocks = [ ]
+			for prefix, body, _ in segments:
+				text = found.get( body, body )
+				blocks.append( f'{prefix} {text}'.strip( ) if prefix else text )
+			document = '\n\n'.join( blocks ) + '\n'
+			if output is not None:
+				with open( output, 'w', encoding='utf-8' ) as f:
+					f.write( document )
+			return document
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'gemini'
+			exception.cause = 'Translation'
+			exception.method = ('translate_document( self, path, target, source, output, '
+			                    'budget_tokens ) -> str')
+			error = ErrorDialog( exception )
+			error.show( )
+
+	@staticmethod
+	def _segment_document( text: str ) -> List[ Tuple[ str, str, bool ] ]:
+		numbering = re.compile( r'^\s*((?:SEC(?:TION)?\.?|Sec(?:tion)?\.?|§+|TITLE|Title|CHAPTER|'
+		                        r'Chapter|SUBPART|Subpart|PART|Part|ARTICLE|Article)'
+		                        r'\s*(?:\d[\w.-]*|[IVXLC]+)\b\.?|\(?\d{1,3}(?:\.\d+)*[.)]|'
+		                        r'\([a-zA-Z]{1,4}\)|[IVXLC]{1,6}\.)\s+' )
+		segments, lines, prefix = [ ], [ ], ''
+		def flush( ):
+			if lines:
+				segments.append( (prefix, ' '.join( lines ), False) )
+		for raw in text.splitlines( ):
+			line = raw.strip( )
+			if not line:
+				flush( )
+				lines, prefix = [ ], ''
+				continue
+			letters = [ c for c in line if c.isalpha( ) ]
+			heading = (len( line ) <= 80 and len( letters ) > 2
+			           and sum( c.isupper( ) for c in letters ) / len( letters ) > 0.8)
+			match = numbering.match( line )
+			if heading or match:
+				flush( )
+				lines, prefix = [ ], ''
+				if match:
+					prefix = match.group( 1 )
+					line = line[ match.end( ): ]
+				if heading:
+					segments.append( (prefix, line, True) )
+					prefix = ''
+					continue
+			lines.append( line )
+		flush( )
+		return [ seg for seg in segments if seg[ 1 ] or seg[ 0 ] ]
+
+	def _run_batches( self, texts: List[ str ],
+			batch_chars: int ) -> Tuple[ Dict[ str, str ], List[ str ] ]:
+		source, target = self.source_language, self.target_language
+		unique = list( dict.fromkeys( t for t in texts if t and t.strip( ) ) )
+		found = self.memory.lookup( unique, source, target, self.model )
+		batches, current, size = [ ], [ ], 0
+		for text in (t for t in unique if t not in found):
+			if current and size + len( text ) > batch_chars:
+				batches.append( current )
+				current, size = [ ], 0
+			current.append( text )
+			size += len( text )
+		if current:
+			batches.append( current )
+		failed = [ ]
+		with ThreadPoolExecutor( max_workers=self.max_workers ) as pool:
+			futures = { pool.submit( self._translate_batch, b ): b for b in batches }
+			for future in as_completed( futures ):
+				try:
+					result = future.result( )
+				except Exception:
+					failed.extend( futures[ future ] )
+					continue
+				self.memory.store( list( result.items( ) ), source, target, self.model )
+				found.update( result )
+		return found, failed
+
+	def _translate_batch( self, batch: List[ str ] ) -> Dict[ str, str ]:
+		schema = { 'type': 'ARRAY',
+		           'items': { 'type': 'OBJECT',
+		                      'properties': { 'id': { 'type': 'INTEGER' },
+		                                      'text': { 'type': 'STRING' } },
+		                      'required': [ 'id', 'text' ] } }
+		config = GenerateContentConfig( temperature=self.temperature,
+			response_mime_type='application/json', response_schema=schema )
+		payload = json.dumps( [ { 'id': i, 'text': t } for i, t in enumerate( batch ) ],
+			ensure_ascii=False )
+		prompt = (f'Translate the "text" of every item from {self.source_language} to '
+		          f'{self.target_language}. Keep each "id" unchanged, return one item per input '
+		          f'item, and preserve line breaks, numbering and markup.\n{payload}')
+		response = self.client.models.generate_content( model=self.model, contents=prompt,
+			config=config )
+		items = { item[ 'id' ]: item[ 'text' ] for item in json.loads( response.text )
+		          if isinstance( item.get( 'id' ), int ) and 0 <= item[ 'id' ] < len( batch ) }
+		missing = [ batch[ i ] for i in range( len( batch ) ) if i not in items ]
+		if missing and len( batch ) > 1:
+			retried = { }
+			for text in missing:
+				retried.update( self._translate_batch( [ text ] ) )
+			return { **{ batch[ i ]: t for i, t in items.items( ) }, **retried }
+		if missing:
+			raise ValueError( 'Translation response omitted a segment.' )
+		return { batch[ i ]: t for i, t in items.items( ) }
+
 class Images( Gemini ):
 	"""
 
@@ -1005,15 +2523,20 @@ class Images( Gemini ):
 	    client       : Client - GenAI instance
 	    aspect_ratio : str - W:H ratio
 	    use_vertex   : bool - Integration flag
+	    cache        : ArtifactCache - On-disk cache of generated images
+	    max_workers  : int - Concurrent generation requests
 
 	    Methods:
 	    --------
-	    generate( prompt, aspect ) : Generates Imagen asset
+	    generate( prompt, aspect )                : Generates Imagen asset
+	    generate_many( prompt, aspect, n, seed )  : Generates cached, lazily decoded images
 
     """
 	client: Optional[ genai.Client ]
 	aspect_ratio: Optional[ str ]
 	use_vertex: Optional[ bool ]
+	cache: Optional[ ArtifactCache ]
+	max_workers: Optional[ int ]
 	
 	def __init__( self, n: int=1, model: str='imagen-3.0-generate-001', version: str='v1alpha',
 			use_ai: bool=False, temperature: float=0.8, top_p: float=0.9,
@@ -1034,6 +2557,8 @@ class Images( Gemini ):
 			http_options=HttpOptions( api_version=self.api_version ) )
 		self.aspect_ratio = '1:1'
 		self.genimg_config = None
+		self.cache = ArtifactCache( 'images' )
+		self.max_workers = 4
 	
 	@property
 	def model_options( self ) -> List[ str ] | None:
@@ -1081,4 +2606,268 @@ class Images( Gemini ):
 			exception.cause = 'Images'
 			exception.method = 'generate( self, prompt, aspect ) -> Image'
 			error = ErrorDialog( exception )
-			error.show( )
\ No newline at end of file
+			error.show( )
+
+	def generate_many( self, prompt: str, aspect: str='1:1', number: int=None,
+			seed: int=None ) -> Optional[ List[ LazyImage ] ]:
+		"""
+
+			Purpose:
+			Generates several images for one prompt. Each image is looked up in the on-disk
+			cache by ( prompt, model, aspect, seed, index ) first; the missing ones are
+			requested concurrently, one image per request, and stored as encoded bytes.
+			Nothing is decoded until LazyImage.image is read.
+
+			Parameters:
+			-----------
+			prompt: str - Image description.
+			aspect: str - Aspect ratio.
+			number: int - Number of images; defaults to self.number.
+			seed: int - Optional base seed; image i uses seed + i.
+
+			Returns:
+			--------
+			Optional[ List[ LazyImage ] ] - Encoded images in index order.
+
+		"""
+		try:
+			throw_if( 'prompt', prompt )
+			self.prompt = prompt
+			self.aspect_ratio = aspect
+			self.number = number or self.number
+			keys = [ json.dumps( [ self.prompt, self.model, self.aspect_ratio, seed, i ] )
+			         for i in range( self.number ) ]
+			results: List[ Optional[ LazyImage ] ] = [ None ] * self.number
+			missing = [ ]
+			for i, key in enumerate( keys ):
+				cached = self.cache.get( key )
+				if cached:
+					results[ i ] = LazyImage( cached[ 0 ] )
+				else:
+					missing.append( i )
+			with ThreadPoolExecutor( max_workers=self.max_workers ) as pool:
+				futures = { pool.submit( self._generate_one, None if seed is None else seed + i ): i
+				            for i in missing }
+				for future in as_completed( futures ):
+					i = futures[ future ]
+					data, mime_type = future.result( )
+					self.cache.put( keys[ i ], [ data ] )
+					results[ i ] = LazyImage( data, mime_type )
+			return [ image for image in results if image is not None ]
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'gemini'
+			exception.cause = 'Images'
+			exception.method = ('generate_many( self, prompt, aspect, number, seed ) -> '
+			                    'List[ LazyImage ]')
+			error = ErrorDialog( exception )
+			error.show( )
+
+	def _generate_one( self, seed: Optional[ int ] ) -> Tuple[ bytes, str ]:
+		options = { 'aspect_ratio': self.aspect_ratio, 'number_of_images': 1 }
+		if seed is not None:
+			options.update( { 'seed': seed, 'add_watermark': False } )
+		response = self.client.models.generate_images( model=self.model, prompt=self.prompt,
+			config=GenerateImagesConfig( **options ) )
+		image = response.generated_images[ 0 ].image
+		return image.image_bytes, image.mime_type
+
+class BatchAnalysis( ):
+	"""
+
+	    Purpose
+	    ___________
+	    Runs one image analysis prompt over every image in a directory tree. Files are hashed
+	    and preprocessed in a process pool, analyses run concurrently on a thread pool under a
+	    requests-per-minute limit, and each result is written to SQLite or CSV as soon as it
+	    arrives. At most 2 * max_workers images are being preprocessed or analyzed at once, so
+	    only that many preprocessed images are held in memory. Files whose content hash is already in the output are skipped, so a run that
+	    crashed resumes where it stopped.
+
+	    Attributes:
+	    -----------
+	    chat        : Chat - Client and preprocessing settings used for the analyses
+	    model       : str - Model identifier
+	    max_workers : int - Concurrent analysis requests
+	    processes   : int - Worker processes for hashing and preprocessing
+	    limiter     : RateLimiter - Request pacing
+	    extensions  : tuple - Image file extensions to include
+	    summary     : dict - Counts and timing of the last run
+
+	    Methods:
+	    --------
+	    run( prompt, folder, output ) : Analyzes every new image and records the results
+
+    """
+	chat: Optional[ Chat ]
+	model: Optional[ str ]
+	max_workers: Optional[ int ]
+	processes: Optional[ int ]
+	limiter: Optional[ RateLimiter ]
+	extensions: Optional[ Tuple[ str, ... ] ]
+	summary: Optional[ Dict[ str, Any ] ]
+
+	def __init__( self, model: str='gemini-2.0-flash', use_ai: bool=False,
+			version: str='v1alpha', max_workers: int=8, processes: int=None,
+			rate: float=60.0 ):
+		self.chat = Chat( model=model, use_ai=use_ai, version=version )
+		self.model = model
+		self.max_workers = max_workers
+		self.processes = processes
+		self.limiter = RateLimiter( rate=rate, burst=max_workers )
+		self.extensions = ('.png', '.jpg', '.jpeg', '.webp', '.gif', '.bmp', '.tif', '.tiff')
+		self.summary = { }
+
+	def run( self, prompt: str, folder: str, output: str ) -> Optional[ Dict[ str, Any ] ]:
+		"""
+
+			Purpose:
+			--------
+			Analyzes every image under folder that is not yet recorded in output.
+
+			Parameters:
+			-----------
+			prompt: str - Question or instruction applied to every image.
+			folder: str - Directory to walk.
+			output: str - Results file; a .csv extension writes CSV, anything else SQLite.
+
+			Returns:
+			--------
+			Optional[ Dict[ str, Any ] ] - Counts of found, skipped, analyzed and failed files.
+
+		"""
+		try:
+			throw_if( 'prompt', prompt )
+			throw_if( 'folder', folder )
+			throw_if( 'output', output )
+			started = time.perf_counter( )
+			paths = [ os.path.join( root, name ) for root, _, names in os.walk( folder )
+			          for name in sorted( names ) if name.lower( ).endswith( self.extensions ) ]
+			writer = self._open_output( output )
+			try:
+				done = writer[ 'done' ]
+				self.summary = { 'found': len( paths ), 'skipped': 0, 'analyzed': 0, 'failed': 0 }
+				settings = (self.chat.max_edge, self.chat.image_format, self.chat.image_quality)
+				with ProcessPoolExecutor( max_workers=self.processes ) as procs, \
+						ThreadPoolExecutor( max_workers=self.max_workers ) as threads:
+					hashes = { }
+					for path, digest, error in procs.map( _hash_or_error, paths, chunksize=16 ):
+						if error is None:
+							hashes[ path ] = digest
+						else:
+							self._record_failure( path, error )
+					todo = [ ]
+					for path in hashes:
+						if hashes[ path ] in done:
+							self.summary[ 'skipped' ] += 1
+							continue
+						done.add( hashes[ path ] )
+						todo.append( path )
+					todo = iter( todo )
+					limit = 2 * self.max_workers
+					inflight = { }
+					def refill( ):
+						while len( inflight ) < limit:
+							path = next( todo, None )
+							if path is None:
+								return
+							task = procs.submit( preprocess_image, path, *settings )
+							inflight[ task ] = ('prepare', path)
+					refill( )
+					while inflight:
+						finished, _ = wait( inflight, return_when=FIRST_COMPLETED )
+						for future in finished:
+							kind, path = inflight.pop( future )
+							try:
+								result = future.result( )
+							except Exception as e:
+								self._record_failure( path, e )
+								continue
+							if kind == 'prepare':
+								task = threads.submit( self._analyze, prompt, *result )
+								inflight[ task ] = ('analyze', path)
+							else:
+								writer[ 'write' ]( hashes[ path ], path, prompt, result )
+								self.summary[ 'analyzed' ] += 1
+						refill( )
+			finally:
+				writer[ 'close' ]( )
+			self.summary[ 'seconds' ] = time.perf_counter( ) - started
+			return self.summary
+		except Exception as e:
+			exception = Error( e )
+			exception.module = 'gemini'
+			exception.cause = 'BatchAnalysis'
+			exception.method = 'run( self, prompt, folder, output ) -> Dict[ str, Any ]'
+			error = ErrorDialog( exception )
+			error.show( )
+
+	def _analyze( self, prompt: str, data: bytes, mime_type: str ) -> str:
+		self.limiter.acquire( )
+		config = GenerateContentConfig( temperature=self.chat.temperature,
+			top_p=self.chat.top_p, max_output_tokens=self.chat.max_tokens )
+		response = self.chat.client.models.generate_content( model=self.model,
+			contents=[ Part.from_bytes( data=data, mime_type=mime_type ), prompt ],
+			config=config )
+		return response.text or ''
+
+	def _record_failure( self, path: str, error: Exception | str ) -> None:
+		self.summary[ 'failed' ] += 1
+		self.summary.setdefault( 'errors', { } )[ path ] = str( error )
+
+	def _open_output( self, output: str ) -> Dict[ str, Any ]:
+		columns = [ 'content_hash', 'path', 'prompt', 'model', 'response', 'created_at' ]
+		if output.lower( ).endswith( '.csv' ):
+			done = set( )
+			exists = os.path.exists( output )
+			if exists:
+				with open( output, 'r', newline='', encoding='utf-8' ) as f:
+					done = { row[ 'content_hash' ] for row in csv.DictReader( f ) }
+			handle = open( output, 'a', newline='', encoding='utf-8' )
+			rows = csv.writer( handle )
+			if not exists:
+				rows.writerow( columns )
+			def write( digest, path, prompt, text ):
+				rows.writerow( [ digest, path, prompt, self.model, text,
+				                 time.strftime( '%Y-%m-%d %H:%M:%S' ) ] )
+				handle.flush( )
+			return { 'done': done, 'write': write, 'close': handle.close }
+		connection = sqlite3.connect( output )
+		connection.execute( """
+			CREATE TABLE IF NOT EXISTS image_analyses
+			(
+				content_hash TEXT PRIMARY KEY,
+				path         TEXT NOT NULL,
+				prompt       TEXT NOT NULL,
+				model        TEXT NOT NULL,
+				response     TEXT,
+				created_at   TEXT DEFAULT CURRENT_TIMESTAMP
+			)""" )
+		done = { row[ 0 ] for row in connection.execute( 'SELECT content_hash FROM image_analyses' ) }
+		def write( digest, path, prompt, text ):
+			connection.execute( 'INSERT OR REPLACE INTO image_analyses (content_hash, path, prompt, '
+			                    'model, response) VALUES (?, ?, ?, ?, ?)',
+				(digest, path, prompt, self.model, text) )
+			connection.commit( )
+		return { 'done': done, 'write': write, 'close': connection.close }
+
+if __name__ == '__main__':
+	import argparse
+	parser = argparse.ArgumentParser( prog='gemini', description='Jeni Gemini batch tools' )
+	commands = parser.add_subparsers( dest='command', required=True )
+	images = commands.add_parser( 'analyze-images',
+		help='Analyze every image in a folder and record the results' )
+	images.add_argument( 'folder', help='Directory of images to analyze' )
+	images.add_argument( 'prompt', help='Question or instruction applied to every image' )
+	images.add_argument( '--output', default='image_analyses.db',
+		help='Results file (.csv for CSV, anything else for SQLite)' )
+	images.add_argument( '--model', default='gemini-2.0-flash' )
+	images.add_argument( '--workers', type=int, default=8, help='Concurrent requests' )
+	images.add_argument( '--processes', type=int, default=None, help='Preprocessing processes' )
+	images.add_argument( '--rate', type=float, default=60.0, help='Requests per minute' )
+	images.add_argument( '--vertex', action='store_true', help='Use Vertex AI' )
+	args = parser.parse_args( )
+	if args.command == 'analyze-images':
+		batch = BatchAnalysis( model=args.model, use_ai=args.vertex, max_workers=args.workers,
+			processes=args.processes, rate=args.rate )
+		print( json.dumps( batch.run( args.prompt, args.folder, args.output ), indent=2 ) )